@@ -0,0 +1,253 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Ability Registry Module
+
+Name: Devane, Lemanuel
+
+This module maps each character class to its special ability. An ability
+joins its data from data/abilities.txt (name, cooldown, effects) with a
+registered action function (the damage or healing formula), so a class's
+ability is built once and looked up by class instead of being worked out
+from the class name on every cast. New classes add their
+abilities here with register_ability; combat_system needs no changes.
+"""
+
+import random
+import game_data
+from custom_exceptions import MissingDataFileError
+
+ABILITY_TARGETS = ["enemy", "self"]
+
+# Action functions by ability id: (action, target, uses_rng)
+actions = {}
+
+# Abilities added in code with register_ability, by lowercase class name
+class_abilities = {}
+
+# Ability data from data/abilities.txt, loaded on first use
+ability_data = None
+
+# Built Ability objects by lowercase class name (None until first use)
+registry = None
+
+# Bumped whenever the registry changes, so abilities cached on typed characters can be checked
+generation = 0
+
+# ============================================================================
+# ABILITIES
+# ============================================================================
+
+class Ability:
+    """
+    A class's special ability, ready to use
+
+    The action is called as action(character, target, rng) and returns a
+    message; target is the enemy, or the character itself for "self"
+    abilities. uses_rng tells simulations whether the action draws random
+    numbers.
+    """
+
+    __slots__ = ("ability_id", "character_class", "name", "cooldown", "effects",
+                 "action", "target", "uses_rng", "generation")
+
+    def __init__(self, data, action, target="enemy", uses_rng=False, generation=0):
+        """
+        Build an ability from its data and action
+
+        Args:
+            data: Ability dictionary (see game_data.load_abilities)
+            action: Callable (character, target, rng) -> message
+            target: "enemy" or "self"
+            uses_rng: True if the action draws from the battle's rng
+            generation: Registry generation the ability was built in
+        """
+        self.ability_id = data["ability_id"]
+        self.character_class = data["class"]
+        self.name = data["name"]
+        self.cooldown = data["cooldown"]
+        self.effects = data["effects"]
+        self.action = action
+        self.target = target
+        self.uses_rng = uses_rng
+        self.generation = generation
+
+    def __repr__(self):
+        return f"Ability({self.ability_id!r}, {self.character_class!r}, cooldown={self.cooldown})"
+
+    def use(self, character, enemy, rng=None):
+        """
+        Run the ability's action (cooldowns and effects are handled by the caller)
+
+        Returns: String describing what happened
+        """
+        target = character if self.target == "self" else enemy
+        return self.action(character, target, rng)
+
+# ============================================================================
+# REGISTRATION
+# ============================================================================
+
+def register_action(ability_id, action, target="enemy", uses_rng=False):
+    """
+    Register the function that runs an ability id from data/abilities.txt
+
+    Args:
+        ability_id: Ability id, as in the ABILITY_ID field
+        action: Callable (character, target, rng) -> message
+        target: "enemy" or "self"
+        uses_rng: True if the action draws from the battle's rng
+
+    Raises: ValueError if target is not recognized
+    """
+    if target not in ABILITY_TARGETS:
+        raise ValueError(f"Unknown ability target '{target}'. Must be one of: {', '.join(ABILITY_TARGETS)}")
+    actions[ability_id] = (action, target, uses_rng)
+    invalidate()
+
+def register_ability(character_class, ability_id, name, action, cooldown=game_data.DEFAULT_ABILITY_COOLDOWN,
+                     effects=None, target="enemy", uses_rng=False):
+    """
+    Give a class a special ability without an entry in data/abilities.txt
+
+    Abilities registered here take precedence over the data file's entry
+    for the same class.
+
+    Args:
+        character_class: Class name (any case)
+        ability_id: Unique ability id
+        name: Display name
+        action: Callable (character, target, rng) -> message
+        cooldown: Turns before the ability can be used again
+        effects: List of effect dictionaries (see game_data.parse_effect)
+        target: "enemy" or "self"
+        uses_rng: True if the action draws from the battle's rng
+
+    Raises: InvalidDataFormatError if the ability data is invalid
+    """
+    data = {"ability_id": ability_id, "class": character_class, "name": name,
+            "cooldown": cooldown, "effects": list(effects or [])}
+    game_data.validate_ability_data(data)
+    register_action(ability_id, action, target, uses_rng)
+    class_abilities[character_class.lower()] = data
+
+def set_ability_data(abilities):
+    """
+    Replace the ability data, e.g. with a rebalanced file
+
+    Args:
+        abilities: Result of game_data.load_abilities
+    """
+    global ability_data
+    ability_data = abilities
+    invalidate()
+
+def invalidate():
+    """Drop the built registry so it is rebuilt (and cached abilities refreshed) on next use"""
+    global registry, generation
+    registry = None
+    generation += 1
+
+# ============================================================================
+# LOOKUP
+# ============================================================================
+
+def get_ability_data():
+    """
+    Get the ability data, loading data/abilities.txt on first use
+
+    Falls back to game_data.DEFAULT_ABILITIES if the file is missing.
+
+    Returns: Dictionary {ability_id: ability}
+    """
+    global ability_data
+    if ability_data is None:
+        try:
+            ability_data = game_data.load_abilities()
+        except MissingDataFileError:
+            ability_data = game_data.DEFAULT_ABILITIES
+    return ability_data
+
+def get_registry():
+    """
+    Get every class's ability, building the registry on first use
+
+    Data entries whose ability id has no registered action are left out.
+
+    Returns: Dictionary {lowercase class name: Ability}
+    """
+    global registry
+    if registry is None:
+        built = {}
+        for data in list(get_ability_data().values()) + list(class_abilities.values()):
+            action = actions.get(data["ability_id"])
+            if action is not None:
+                built[data["class"].lower()] = Ability(data, *action, generation=generation)
+        registry = built
+    return registry
+
+def get_ability(character_class):
+    """
+    Get a class's special ability
+
+    Returns: Ability, or None if the class has no ability
+    """
+    return get_registry().get(str(character_class).lower())
+
+def resolve_ability(character):
+    """
+    Get a character's special ability
+
+    Plain character dictionaries are looked up in the registry, which is
+    already keyed by class, so they stay JSON-serializable. Typed characters
+    (character_manager.Character) cache the ability in their 'ability' slot,
+    refreshed after the registry changes.
+
+    Returns: Ability, or None if the character's class has no ability
+    """
+    if isinstance(character, dict):
+        return get_ability(character["class"])
+    ability = character.get("ability")
+    if ability is None or ability.generation != generation:
+        ability = get_ability(character["class"])
+        character["ability"] = ability
+    return ability
+
+# ============================================================================
+# BUILT-IN ABILITIES
+# ============================================================================
+
+def warrior_power_strike(character, enemy, rng=None):
+    """Warrior special ability"""
+    damage = max(character['strength'] * 2 - (enemy['strength'] // 4), 1)
+    enemy['health'] = max(enemy['health'] - damage, 0)
+    return f"{character['name']} used Power Strike and dealt {damage} damage to {enemy['name']}!"
+
+def mage_fireball(character, enemy, rng=None):
+    """Mage special ability"""
+    damage = max(character['magic'] * 2 - (enemy['strength'] // 4), 1)
+    enemy['health'] = max(enemy['health'] - damage, 0)
+    return f"{character['name']} cast Fireball and dealt {damage} damage to {enemy['name']}!"
+
+def rogue_critical_strike(character, enemy, rng=None):
+    """Rogue special ability"""
+    if rng is None:
+        rng = random
+    if rng.random() < 0.5:
+        damage = max(character['strength'] * 3 - (enemy['strength'] // 4), 1)
+        enemy['health'] = max(enemy['health'] - damage, 0)
+        return f"{character['name']} landed a Critical Strike and dealt {damage} damage to {enemy['name']}!"
+    else:
+        return f"{character['name']} missed the Critical Strike!"
+
+def cleric_heal(character, target=None, rng=None):
+    """Cleric special ability"""
+    if target is None:
+        target = character
+    heal_amount = min(30, target['max_health'] - target['health'])
+    target['health'] += heal_amount
+    return f"{character['name']} healed for {heal_amount} HP!"
+
+register_action("power_strike", warrior_power_strike)
+register_action("fireball", mage_fireball)
+register_action("critical_strike", rogue_critical_strike, uses_rng=True)
+register_action("heal", cleric_heal, target="self")
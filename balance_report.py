@@ -0,0 +1,206 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Balance Report Module
+
+Name: Devane, Lemanuel
+
+This module builds the combat balance report: every class against every
+enemy type at every level from 1 to N, simulated with battle_simulator and
+written out as CSV or JSON. Each cell is cached under a hash of the stats
+it depends on (the class's progression and ability, the enemy's stats and
+AI table, and the simulation settings), so after a stats edit only the
+cells that edit touches are simulated again.
+"""
+
+import os
+import csv
+import json
+import hashlib
+import ability_registry
+import battle_simulator
+import character_manager
+import combat_system
+import enemy_ai
+
+# Bump when the combat rules or the report's figures change, so old cached cells are ignored
+REPORT_VERSION = 1
+
+DEFAULT_CACHE_FILE = os.path.join("data", "balance_cache.json")
+
+# Columns of the report, in CSV order
+REPORT_FIELDS = ["class", "enemy", "level", "battles", "win_rate", "mean_turns",
+                 "hp_remaining", "hp_remaining_pct", "xp_per_turn"]
+
+# ============================================================================
+# CELL HASHES
+# ============================================================================
+
+def cell_inputs(character_class, enemy_type, level, battles, seed, policy):
+    """
+    Everything a report cell's result depends on
+
+    Returns: JSON-serializable dictionary
+    """
+    ability = ability_registry.get_ability(character_class)
+    enemy = combat_system.get_enemy_catalog()["templates"][enemy_type.lower()]
+    strategy = enemy.get("strategy")
+    return {
+        "version": REPORT_VERSION,
+        "class": character_manager.get_class_progression(character_class),
+        "ability": None if ability is None else {
+            "ability_id": ability.ability_id, "cooldown": ability.cooldown, "effects": ability.effects},
+        "enemy": enemy,
+        "enemy_policy": None if strategy is None else list(enemy_ai.get_policy_tables()[strategy]),
+        "level": level, "battles": battles, "seed": seed, "policy": policy}
+
+def cell_hash(character_class, enemy_type, level, battles, seed, policy):
+    """
+    Content hash of a report cell's inputs (see cell_inputs)
+
+    Returns: Hex digest string
+    """
+    inputs = cell_inputs(character_class, enemy_type, level, battles, seed, policy)
+    text = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def load_cache(filename=DEFAULT_CACHE_FILE):
+    """
+    Load cached report cells
+
+    A missing or unreadable cache is treated as empty (every cell is
+    simulated again).
+
+    Returns: Dictionary {cell hash: row}
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def save_cache(cache, filename=DEFAULT_CACHE_FILE):
+    """Write cached report cells (replacing the file in one step)"""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_name = filename + ".tmp"
+    with open(temp_name, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(temp_name, filename)
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def report_row(character_class, enemy_type, level, stats):
+    """
+    Turn a simulator aggregate into a report row
+
+    Returns: Dictionary with the REPORT_FIELDS keys
+    """
+    max_health = battle_simulator.build_character(character_class, level)["max_health"]
+    return {"class": character_class, "enemy": enemy_type, "level": level,
+            "battles": stats["battles"],
+            "win_rate": round(stats["win_rate"], 4),
+            "mean_turns": round(stats["mean_turns"], 3),
+            "hp_remaining": round(stats["mean_health_left"], 2),
+            "hp_remaining_pct": round(stats["mean_health_left"] / max_health, 4) if max_health else 0.0,
+            "xp_per_turn": round(stats["xp_per_turn"], 3)}
+
+def build_report(classes=None, enemy_types=None, max_level=10, battles=1000, seed=0, policy="special",
+                 workers=None, cache_file=DEFAULT_CACHE_FILE):
+    """
+    Simulate the class x enemy x level grid, reusing cached cells
+
+    Args:
+        classes: Class names (default: every class in the progression tables)
+        enemy_types: Enemy ids (default: every enemy in the catalog)
+        max_level: Highest character level (levels 1 to max_level)
+        battles: Battles per cell
+        seed: Simulation seed (same seed and stats, same report)
+        policy: Name from battle_simulator.SIMULATION_POLICIES
+        workers: Worker processes (None = one per CPU, 0 = run in this process)
+        cache_file: Cache of finished cells (None to always simulate)
+
+    Returns: Dictionary with 'rows' (one per cell, in grid order),
+             'simulated' and 'cached' (cell counts)
+    Raises: ValueError if max_level < 1 or policy is not recognized
+    """
+    if max_level < 1:
+        raise ValueError(f"max_level must be at least 1, got {max_level}")
+    if policy not in battle_simulator.SIMULATION_POLICIES:
+        raise ValueError(f"Unknown policy '{policy}'. "
+                         f"Must be one of: {', '.join(battle_simulator.SIMULATION_POLICIES)}")
+    if classes is None:
+        classes = list(character_manager.get_progression_tables())
+    if enemy_types is None:
+        enemy_types = list(combat_system.get_enemy_catalog()["templates"])
+
+    cells = [(character_class, enemy_type, level)
+             for character_class in classes
+             for enemy_type in enemy_types
+             for level in range(1, max_level + 1)]
+    hashes = {cell: cell_hash(*cell, battles, seed, policy) for cell in cells}
+    cache = load_cache(cache_file) if cache_file else {}
+
+    missing = [cell for cell in cells if hashes[cell] not in cache]
+    if missing:
+        results = battle_simulator.simulate(missing, battles, seed, policy, workers)
+        for cell, stats in results.items():
+            cache[hashes[cell]] = report_row(*cell, stats)
+        if cache_file:
+            save_cache(cache, cache_file)
+
+    return {"rows": [cache[hashes[cell]] for cell in cells],
+            "simulated": len(missing), "cached": len(cells) - len(missing)}
+
+def write_csv(rows, filename):
+    """Write report rows as CSV with a REPORT_FIELDS header"""
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_json(rows, filename):
+    """Write report rows as a JSON list"""
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=1)
+
+def write_report(rows, filename):
+    """
+    Write report rows, as CSV or JSON depending on the file extension
+
+    Raises: ValueError if the extension is not .csv or .json
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        write_csv(rows, filename)
+    elif extension == ".json":
+        write_json(rows, filename)
+    else:
+        raise ValueError(f"Unknown report format '{extension}'. Must be .csv or .json")
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+
+    print("=== BALANCE REPORT TEST ===")
+
+    for run in ["first", "second"]:
+        start = time.perf_counter()
+        report = build_report(max_level=5, battles=500, seed=42)
+        elapsed = time.perf_counter() - start
+        print(f"{run} run: {report['simulated']} cells simulated, {report['cached']} cached, {elapsed:.2f}s")
+    write_report(report["rows"], "balance_report.csv")
+    for row in report["rows"][:5]:
+        print(f"{row['class']:8} vs {row['enemy']:6} L{row['level']}: win {row['win_rate']:.1%}, "
+              f"turns {row['mean_turns']:.1f}, HP left {row['hp_remaining_pct']:.0%}, "
+              f"XP/turn {row['xp_per_turn']:.2f}")
@@ -0,0 +1,360 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Resolver Module
+
+Name: Devane, Lemanuel
+
+This module resolves whole batches of battles at once from arrays of stats.
+Basic-attack battles are deterministic, so their outcome is computed in closed
+form; battles with special abilities step all fights forward one turn at a
+time together. Results match SimpleBattle with attack_policy or
+special_when_ready_policy (status effects from data/abilities.txt and enemy
+AI strategies are not modelled; enemies always attack).
+"""
+
+import random
+import ability_registry
+import game_data
+
+# NumPy is optional: with it, batches are vectorized; without it each battle
+# is resolved in a loop using the same rules
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Winner codes in resolver results
+PLAYER_WON = 1
+ENEMY_WON = -1
+UNRESOLVED = 0
+
+# Ability actions the resolver can model, by class code (no ability is code -1)
+ABILITY_ACTIONS = [ability_registry.warrior_power_strike, ability_registry.mage_fireball,
+                   ability_registry.rogue_critical_strike, ability_registry.cleric_heal]
+WARRIOR, MAGE, ROGUE, CLERIC = range(4)
+
+# Turn limit for ability battles (a healer against a weak enemy can run long)
+MAX_TURNS = 10000
+
+# ============================================================================
+# SINGLE BATTLES
+# ============================================================================
+
+def attack_damage(attacker_strength, defender_strength):
+    """
+    Basic attack damage, as in SimpleBattle.calculate_damage
+
+    Returns: attacker_strength - defender_strength // 4, minimum 1
+    """
+    return max(attacker_strength - defender_strength // 4, 1)
+
+def resolve_attack_battle(character_health, character_strength, enemy_health, enemy_strength,
+                          xp_reward=0, gold_reward=0):
+    """
+    Resolve one basic-attack battle without stepping through turns
+
+    The player strikes first each turn, so the player wins if they need no
+    more hits than the enemy does.
+
+    Returns: Tuple of (winner, turns, character_health, enemy_health, xp_gained, gold_gained)
+             A character who starts dead loses in 0 turns.
+    """
+    if character_health <= 0:
+        return ENEMY_WON, 0, character_health, enemy_health, 0, 0
+
+    player_damage = attack_damage(character_strength, enemy_strength)
+    enemy_damage = attack_damage(enemy_strength, character_strength)
+    player_hits = max(-(-enemy_health // player_damage), 1)
+    enemy_hits = max(-(-character_health // enemy_damage), 1)
+
+    if player_hits <= enemy_hits:
+        return (PLAYER_WON, player_hits, character_health - (player_hits - 1) * enemy_damage, 0,
+                xp_reward, gold_reward)
+    return ENEMY_WON, enemy_hits, 0, enemy_health - enemy_hits * player_damage, 0, 0
+
+def resolve_ability_battle(class_code, character_health, character_max_health, character_strength,
+                           character_magic, enemy_health, enemy_strength, xp_reward=0, gold_reward=0,
+                           cooldown=game_data.DEFAULT_ABILITY_COOLDOWN, rng=None, max_turns=MAX_TURNS):
+    """
+    Resolve one battle where the player uses their special ability whenever ready
+
+    Args:
+        class_code: Index into ABILITY_ACTIONS, or -1 for no ability
+        cooldown: Ability cooldown in turns
+        rng: random.Random for the Rogue's critical strike (default: new unseeded one)
+
+    Returns: Same tuple as resolve_attack_battle; winner is UNRESOLVED if
+             max_turns pass without a winner
+    """
+    if character_health <= 0:
+        return ENEMY_WON, 0, character_health, enemy_health, 0, 0
+    if rng is None:
+        rng = random.Random()
+
+    player_damage = attack_damage(character_strength, enemy_strength)
+    enemy_damage = attack_damage(enemy_strength, character_strength)
+    defense = enemy_strength // 4
+    period = max(cooldown, 1)
+
+    for turn in range(1, max_turns + 1):
+        # The ability is used on turn 1 and again each time its cooldown runs out
+        if (turn - 1) % period == 0:
+            if class_code == WARRIOR:
+                enemy_health -= max(character_strength * 2 - defense, 1)
+            elif class_code == MAGE:
+                enemy_health -= max(character_magic * 2 - defense, 1)
+            elif class_code == ROGUE:
+                if rng.random() < 0.5:
+                    enemy_health -= max(character_strength * 3 - defense, 1)
+            elif class_code == CLERIC:
+                character_health += min(30, character_max_health - character_health)
+        else:
+            enemy_health -= player_damage
+
+        if enemy_health <= 0:
+            return PLAYER_WON, turn, character_health, 0, xp_reward, gold_reward
+
+        character_health -= enemy_damage
+        if character_health <= 0:
+            return ENEMY_WON, turn, 0, enemy_health, 0, 0
+
+    return UNRESOLVED, max_turns, character_health, enemy_health, 0, 0
+
+# ============================================================================
+# BATCH RESOLUTION
+# ============================================================================
+
+def class_codes(classes):
+    """
+    Convert class names to class codes, using each class's registered ability
+
+    Returns: List of indexes into ABILITY_ACTIONS (-1 for classes without an ability)
+    Raises: ValueError if a class's ability has an action the resolver cannot model
+    """
+    codes = {}
+    for character_class in classes:
+        if character_class not in codes:
+            codes[character_class] = ability_codes([ability_registry.get_ability(character_class)])[0]
+    return [codes[character_class] for character_class in classes]
+
+def ability_codes(abilities):
+    """
+    Convert abilities (or None) to class codes
+
+    Returns: List of indexes into ABILITY_ACTIONS (-1 for None)
+    Raises: ValueError if an ability has an action the resolver cannot model
+    """
+    codes = []
+    for ability in abilities:
+        if ability is None:
+            codes.append(-1)
+        elif ability.action in ABILITY_ACTIONS:
+            codes.append(ABILITY_ACTIONS.index(ability.action))
+        else:
+            raise ValueError(f"Cannot resolve ability '{ability.ability_id}': its action has no batch formula")
+    return codes
+
+def resolve_attack_battles(character_health, character_strength, enemy_health, enemy_strength,
+                           xp_reward=0, gold_reward=0):
+    """
+    Resolve many basic-attack battles at once
+
+    Arguments are equal-length arrays (or scalars, which are broadcast), one
+    entry per battle.
+
+    Returns: Dictionary of arrays: winner, turns, character_health,
+             enemy_health, xp_gained, gold_gained
+    """
+    if np is None:
+        return batch_loop(resolve_attack_battle, character_health, character_strength,
+                          enemy_health, enemy_strength, xp_reward, gold_reward)
+
+    character_health, character_strength, enemy_health, enemy_strength, xp_reward, gold_reward = \
+        np.broadcast_arrays(*[np.asarray(values, dtype=np.int64) for values in
+                              (character_health, character_strength, enemy_health, enemy_strength,
+                               xp_reward, gold_reward)])
+
+    player_damage = np.maximum(character_strength - enemy_strength // 4, 1)
+    enemy_damage = np.maximum(enemy_strength - character_strength // 4, 1)
+    player_hits = np.maximum(-(-enemy_health // player_damage), 1)
+    enemy_hits = np.maximum(-(-character_health // enemy_damage), 1)
+
+    alive = character_health > 0
+    won = alive & (player_hits <= enemy_hits)
+    return {
+        "winner": np.where(won, PLAYER_WON, ENEMY_WON),
+        "turns": np.where(won, player_hits, np.where(alive, enemy_hits, 0)),
+        "character_health": np.where(won, character_health - (player_hits - 1) * enemy_damage,
+                                     np.where(alive, 0, character_health)),
+        "enemy_health": np.where(won, 0, np.where(alive, enemy_health - enemy_hits * player_damage,
+                                                  enemy_health)),
+        "xp_gained": np.where(won, xp_reward, 0),
+        "gold_gained": np.where(won, gold_reward, 0),
+    }
+
+def resolve_ability_battles(class_code, character_health, character_max_health, character_strength,
+                            character_magic, enemy_health, enemy_strength, xp_reward=0, gold_reward=0,
+                            cooldown=game_data.DEFAULT_ABILITY_COOLDOWN, rng=None, max_turns=MAX_TURNS):
+    """
+    Resolve many special-ability battles at once, one turn at a time
+
+    Every battle still running advances together, so the work per turn is a
+    handful of array operations regardless of the number of battles.
+
+    Args:
+        class_code: Array of class codes (see class_codes)
+        cooldown: Ability cooldowns in turns
+        rng: NumPy Generator for the Rogue's critical strike (random.Random
+             without NumPy; default: new unseeded generator)
+        Other arguments: arrays or scalars, one entry per battle
+
+    Returns: Same dictionary as resolve_attack_battles; winner is UNRESOLVED
+             for battles still running after max_turns
+    """
+    if np is None:
+        if rng is None:
+            rng = random.Random()
+        return batch_loop(lambda *stats: resolve_ability_battle(*stats, rng=rng, max_turns=max_turns),
+                          class_code, character_health, character_max_health, character_strength,
+                          character_magic, enemy_health, enemy_strength, xp_reward, gold_reward, cooldown)
+    if rng is None:
+        rng = np.random.default_rng()
+
+    arrays = np.broadcast_arrays(*[np.asarray(values, dtype=np.int64) for values in
+                                   (class_code, character_health, character_max_health,
+                                    character_strength, character_magic, enemy_health,
+                                    enemy_strength, xp_reward, gold_reward, cooldown)])
+    (class_code, character_health, character_max_health, character_strength, character_magic,
+     enemy_health, enemy_strength, xp_reward, gold_reward, cooldown) = [values.copy() for values in arrays]
+    count = len(class_code)
+
+    defense = enemy_strength // 4
+    player_damage = np.maximum(character_strength - defense, 1)
+    enemy_damage = np.maximum(enemy_strength - character_strength // 4, 1)
+    # Damage dealt on ability turns (the Rogue's is only dealt on a hit)
+    ability_damage = np.select(
+        [class_code == WARRIOR, class_code == MAGE, class_code == ROGUE],
+        [np.maximum(character_strength * 2 - defense, 1), np.maximum(character_magic * 2 - defense, 1),
+         np.maximum(character_strength * 3 - defense, 1)], 0)
+    is_rogue = class_code == ROGUE
+    is_cleric = class_code == CLERIC
+    period = np.maximum(cooldown, 1)
+
+    winner = np.where(character_health > 0, UNRESOLVED, ENEMY_WON)
+    turns = np.zeros(count, dtype=np.int64)
+    running = np.flatnonzero(winner == UNRESOLVED)
+
+    for turn in range(1, max_turns + 1):
+        if len(running) == 0:
+            break
+
+        # Battles whose ability is ready this turn (used on turn 1, then every period turns)
+        ready = (turn - 1) % period[running] == 0
+        damage = np.where(ready, ability_damage[running], player_damage[running])
+        rogues = ready & is_rogue[running]
+        if rogues.any():
+            missed = rng.random(len(running)) >= 0.5
+            damage = np.where(rogues & missed, 0, damage)
+        clerics = running[ready & is_cleric[running]]
+        character_health[clerics] += np.minimum(30, character_max_health[clerics] - character_health[clerics])
+        enemy_health[running] -= damage
+
+        killed = enemy_health[running] <= 0
+        done = running[killed]
+        winner[done] = PLAYER_WON
+        turns[done] = turn
+        running = running[~killed]
+
+        character_health[running] -= enemy_damage[running]
+        died = character_health[running] <= 0
+        done = running[died]
+        winner[done] = ENEMY_WON
+        turns[done] = turn
+        running = running[~died]
+
+    turns[running] = max_turns
+    won = winner == PLAYER_WON
+    lost = (winner == ENEMY_WON) & (turns > 0)
+    return {
+        "winner": winner,
+        "turns": turns,
+        "character_health": np.where(lost, 0, character_health),
+        "enemy_health": np.where(won, 0, enemy_health),
+        "xp_gained": np.where(won, xp_reward, 0),
+        "gold_gained": np.where(won, gold_reward, 0),
+    }
+
+def batch_loop(resolve, *columns):
+    """
+    Resolve a batch one battle at a time (used when NumPy is not installed)
+
+    Returns: Dictionary of lists in the same layout as the vectorized results
+    """
+    count = max((len(values) for values in columns if isinstance(values, (list, tuple))), default=1)
+    columns = [values if isinstance(values, (list, tuple)) else [values] * count for values in columns]
+    outcomes = [resolve(*stats) for stats in zip(*columns)]
+    fields = ["winner", "turns", "character_health", "enemy_health", "xp_gained", "gold_gained"]
+    return {field: [outcome[index] for outcome in outcomes] for index, field in enumerate(fields)}
+
+def resolve_battles(characters, enemies, policy="attack", rng=None, max_turns=MAX_TURNS):
+    """
+    Resolve a battle for each character against the matching enemy
+
+    Args:
+        characters: List of character dictionaries
+        enemies: List of enemy dictionaries (same length), or one enemy for all;
+                 their AI strategies are ignored (they always attack)
+        policy: "attack" (closed form) or "special" (ability whenever ready)
+        rng: Generator for the Rogue's critical strike (see resolve_ability_battles)
+
+    Returns: Dictionary of result arrays (see resolve_attack_battles)
+    Raises: ValueError if policy is not recognized
+    """
+    if isinstance(enemies, dict):
+        enemies = [enemies] * len(characters)
+
+    def column(records, field):
+        return [record[field] for record in records]
+
+    enemy_columns = [column(enemies, "health"), column(enemies, "strength"),
+                     column(enemies, "xp_reward"), column(enemies, "gold_reward")]
+
+    if policy == "attack":
+        return resolve_attack_battles(column(characters, "health"), column(characters, "strength"),
+                                      *enemy_columns)
+    if policy == "special":
+        abilities = [ability_registry.resolve_ability(character) for character in characters]
+        cooldowns = [ability.cooldown if ability else game_data.DEFAULT_ABILITY_COOLDOWN for ability in abilities]
+        return resolve_ability_battles(ability_codes(abilities),
+                                       column(characters, "health"), column(characters, "max_health"),
+                                       column(characters, "strength"), column(characters, "magic"),
+                                       *enemy_columns, cooldowns, rng=rng, max_turns=max_turns)
+    raise ValueError(f"Unknown policy '{policy}'. Must be 'attack' or 'special'")
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== BATTLE RESOLVER TEST ===")
+
+    if np is None:
+        print("NumPy not installed; resolving battles one at a time")
+        size = 1000
+        strengths = [5 + index % 40 for index in range(size)]
+        results = resolve_attack_battles([100] * size, strengths, 80, 12, 50, 25)
+        print(f"{sum(w == PLAYER_WON for w in results['winner'])} of {size} battles won")
+    else:
+        size = 1_000_000
+        generator = np.random.default_rng(0)
+        health = generator.integers(50, 300, size)
+        strength = generator.integers(5, 40, size)
+        results = resolve_attack_battles(health, strength, 80, 12, 50, 25)
+        print(f"Attack: {np.mean(results['winner'] == PLAYER_WON):.1%} of {size} battles won, "
+              f"mean turns {results['turns'].mean():.2f}")
+
+        codes = generator.integers(0, 4, size)
+        results = resolve_ability_battles(codes, health, health, strength, strength, 80, 12, 50, 25,
+                                          rng=generator)
+        print(f"Special: {np.mean(results['winner'] == PLAYER_WON):.1%} of {size} battles won, "
+              f"mean turns {results['turns'].mean():.2f}")
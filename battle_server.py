@@ -0,0 +1,345 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Server Module
+
+Name: Devane, Lemanuel
+
+This module hosts many SimpleBattle sessions at once on one asyncio event
+loop. Each session is a coroutine that waits for the player's actions on an
+inbound queue (falling back to a basic attack when a turn times out) and
+sends battle events to its own outbound queue. Clients connect in-process
+through BattleSession, or over TCP with one JSON object per line.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+import combat_system
+from battle_simulator import build_character
+from character_manager import validate_character_data
+from custom_exceptions import (
+    InvalidCharacterClassError,
+    InvalidSaveDataError,
+    InvalidTargetError)
+
+# Seconds a player has to choose an action before a basic attack is used
+DEFAULT_TURN_TIMEOUT = 30.0
+
+# ============================================================================
+# SESSIONS
+# ============================================================================
+
+class BattleSession:
+    """
+    One battle hosted by a BattleServer
+
+    Clients send actions with submit() and read events with next_event().
+    Events are SimpleBattle sink events ({'type': 'log'|'stats'|'turn'|'end', ...}) plus:
+    - {'type': 'prompt', 'turn': n, 'timeout': seconds} when an action is due
+    - {'type': 'timeout', 'turn': n} when the player ran out of time
+    - {'type': 'result', ...start_battle results...} when the battle ends
+    - {'type': 'error', 'message': ...} if the battle could not run
+    - {'type': 'closed'} as the last event
+    """
+
+    def __init__(self, session_id, character, enemy, turn_timeout=DEFAULT_TURN_TIMEOUT, rng=None):
+        self.session_id = session_id
+        self.inbound = asyncio.Queue()
+        self.outbound = asyncio.Queue()
+        self.turn_timeout = turn_timeout
+        self.action = "attack"
+        self.battle = combat_system.SimpleBattle(character, enemy, policy=lambda battle: self.action,
+                                                 sink=self.outbound.put_nowait, headless=True, rng=rng)
+        self.results = None
+        self.task = None
+
+    def submit(self, action, turn=None):
+        """
+        Queue the player's action ("attack", "special", "run" or "1"-"3")
+
+        turn is the number from the prompt being answered. Actions for any
+        other turn are dropped, so a late answer never plays on a later turn.
+        """
+        self.inbound.put_nowait((turn, action))
+
+    async def next_event(self):
+        """Wait for the next outbound event"""
+        return await self.outbound.get()
+
+    async def next_action(self):
+        """
+        Wait for the player's action for this turn
+
+        Actions queued before the prompt (duplicates, or answers that came
+        after an earlier turn timed out) are discarded, as are actions tagged
+        with another turn.
+
+        Returns: The submitted action, or "attack" if the turn timed out
+        """
+        turn = self.battle.turns + 1
+        while not self.inbound.empty():
+            self.inbound.get_nowait()
+        self.outbound.put_nowait({"type": "prompt", "turn": turn, "timeout": self.turn_timeout})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.turn_timeout
+        try:
+            while True:
+                action_turn, action = await asyncio.wait_for(self.inbound.get(), deadline - loop.time())
+                if action_turn is None or action_turn == turn:
+                    return action
+        except asyncio.TimeoutError:
+            self.outbound.put_nowait({"type": "timeout", "turn": turn})
+            return "attack"
+
+    async def run(self):
+        """
+        Play the battle to the end
+
+        Any error ends the session with an 'error' event instead of escaping
+        the task.
+
+        Returns: Battle results (see SimpleBattle.start_battle), or None if it
+                 could not start or failed
+        """
+        battle = self.battle
+        try:
+            battle.begin_battle()
+            winner = None
+            while battle.combat_active:
+                self.action = await self.next_action()
+                winner = battle.play_round()
+            self.results = battle.finish_battle(winner)
+            self.outbound.put_nowait(dict(self.results, type="result"))
+        except Exception as e:
+            self.outbound.put_nowait({"type": "error", "message": f"{type(e).__name__}: {e}"})
+        finally:
+            self.outbound.put_nowait({"type": "closed"})
+        return self.results
+
+class BattleServer:
+    """
+    Hosts battle sessions on the running event loop
+
+    Every session is its own task, so thousands of battles share one loop
+    and only wake up when their player acts or their turn times out.
+    """
+
+    def __init__(self, turn_timeout=DEFAULT_TURN_TIMEOUT):
+        self.turn_timeout = turn_timeout
+        self.sessions = {}
+        self.connections = set()
+        self.session_ids = itertools.count(1)
+        self.completed = 0
+
+    def open_session(self, character, enemy, rng=None):
+        """
+        Start a battle between a character and an enemy
+
+        Must be called from a coroutine running on the server's loop.
+
+        Returns: BattleSession (already running)
+        """
+        session = BattleSession(next(self.session_ids), character, enemy, self.turn_timeout, rng)
+        self.sessions[session.session_id] = session
+        session.task = asyncio.get_running_loop().create_task(self.host(session))
+        return session
+
+    async def host(self, session):
+        """Run a session and forget it once it ends"""
+        try:
+            return await session.run()
+        finally:
+            self.sessions.pop(session.session_id, None)
+            self.completed += 1
+
+    async def close(self):
+        """Cancel every running session and TCP connection"""
+        tasks = [session.task for session in self.sessions.values()] + list(self.connections)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------------
+    # TCP TRANSPORT
+    # ------------------------------------------------------------------------
+
+    async def serve_tcp(self, host="127.0.0.1", port=0):
+        """
+        Accept battle clients over TCP
+
+        Protocol: one JSON object per line in each direction. The client sends
+        {"type": "start", "class": "Warrior", "level": 1, "enemy": "goblin"}
+        (or {"type": "start", "character": {...}, "enemy": "goblin"}), then
+        {"type": "action", "action": "attack", "turn": n} when prompted, with
+        the prompt's turn number; the server sends the session's events.
+        Actions for any other turn are ignored. A client can start another battle once the
+        previous one is closed.
+
+        Returns: asyncio.Server (port 0 picks a free port; see server.sockets)
+        """
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def handle_client(self, reader, writer):
+        """Serve one TCP connection"""
+        session = None
+        forward = None
+        self.connections.add(asyncio.current_task())
+        try:
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    await send_message(writer, {"type": "error", "message": "Invalid JSON"})
+                    continue
+
+                if message.get("type") == "start":
+                    if session is not None and not session.task.done():
+                        await send_message(writer, {"type": "error", "message": "Battle already running"})
+                        continue
+                    try:
+                        character, enemy = battle_from_message(message)
+                    except (InvalidCharacterClassError, InvalidSaveDataError, InvalidTargetError,
+                            KeyError, TypeError, ValueError) as e:
+                        await send_message(writer, {"type": "error", "message": f"Cannot start battle: {e}"})
+                        continue
+                    if forward is not None:
+                        await forward
+                    session = self.open_session(character, enemy)
+                    forward = asyncio.get_running_loop().create_task(forward_events(session, writer))
+                elif message.get("type") == "action" and session is not None:
+                    session.submit(message.get("action", "attack"), message.get("turn"))
+                else:
+                    await send_message(writer, {"type": "error", "message": "Unexpected message"})
+            if forward is not None:
+                await forward
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown; the connection task has no other awaiter
+            pass
+        finally:
+            self.connections.discard(asyncio.current_task())
+            if session is not None and not session.task.done():
+                session.task.cancel()
+            if forward is not None:
+                forward.cancel()
+            writer.close()
+
+def battle_from_message(message):
+    """
+    Build the character and enemy for a TCP start message
+
+    Client-supplied characters must pass validate_character_data and have
+    0 <= health <= max_health, with max_health positive.
+
+    Returns: Tuple of (character, enemy)
+    Raises: InvalidCharacterClassError, InvalidSaveDataError, InvalidTargetError,
+            KeyError, TypeError, ValueError
+    """
+    if "character" in message:
+        if not isinstance(message["character"], dict):
+            raise InvalidSaveDataError("character must be a JSON object")
+        character = dict(message["character"])
+        character.pop("ability", None)
+        validate_character_data(character)
+        if character["max_health"] <= 0 or not 0 <= character["health"] <= character["max_health"]:
+            raise InvalidSaveDataError(f"Invalid health {character['health']}/{character['max_health']}")
+    else:
+        character = build_character(message.get("class", "Warrior"), int(message.get("level", 1)))
+    enemy_type = message.get("enemy", "goblin")
+    if not isinstance(enemy_type, str):
+        raise InvalidTargetError(f"Enemy must be an enemy id, got {enemy_type!r}")
+    enemy = combat_system.create_enemy(enemy_type)
+    return character, enemy
+
+async def send_message(writer, message):
+    """Write one JSON line"""
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+
+async def forward_events(session, writer):
+    """Copy a session's events to a TCP client until the session closes"""
+    while True:
+        event = await session.next_event()
+        await send_message(writer, event)
+        if event["type"] == "closed":
+            return
+
+# ============================================================================
+# LOAD TESTING
+# ============================================================================
+
+async def play_session(session, policy):
+    """
+    Play a session in-process, answering every prompt with policy(session.battle)
+
+    Returns: The result event, or None if the battle did not finish
+    """
+    result = None
+    while True:
+        event = await session.next_event()
+        if event["type"] == "prompt":
+            session.submit(policy(session.battle), event["turn"])
+        elif event["type"] == "result":
+            result = event
+        elif event["type"] == "closed":
+            return result
+
+async def load_test(sessions=1000, character_class="Warrior", level=3, enemy_type="orc",
+                    policy=combat_system.special_when_ready_policy, turn_timeout=DEFAULT_TURN_TIMEOUT):
+    """
+    Run many concurrent battles through an in-process server
+
+    Returns: Dictionary with sessions, wins, seconds and battles_per_second
+    """
+    server = BattleServer(turn_timeout)
+    start = time.perf_counter()
+    opened = [server.open_session(build_character(character_class, level), combat_system.create_enemy(enemy_type))
+              for _ in range(sessions)]
+    results = await asyncio.gather(*[play_session(session, policy) for session in opened])
+    seconds = time.perf_counter() - start
+    wins = sum(1 for result in results if result and result["winner"] == "player")
+    return {"sessions": sessions, "wins": wins, "seconds": seconds,
+            "battles_per_second": sessions / seconds if seconds else 0.0}
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== BATTLE SERVER TEST ===")
+
+    stats = asyncio.run(load_test(2000))
+    print(f"In-process: {stats['sessions']} battles, {stats['wins']} won, "
+          f"{stats['battles_per_second']:.0f} battles/second")
+
+    async def tcp_demo():
+        server = BattleServer(turn_timeout=0.05)
+        tcp = await server.serve_tcp()
+        port = tcp.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await send_message(writer, {"type": "start", "class": "Mage", "level": 2, "enemy": "orc"})
+        prompts = timeouts = 0
+        async for line in reader:
+            event = json.loads(line)
+            if event["type"] == "prompt":
+                prompts += 1
+                # Answer the first prompt; let the rest time out
+                if prompts == 1:
+                    await send_message(writer, {"type": "action", "action": "special", "turn": event["turn"]})
+            elif event["type"] == "timeout":
+                timeouts += 1
+            elif event["type"] == "result":
+                print(f"TCP: winner {event['winner']} in {event['turns']} turns ({timeouts} timed out)")
+            elif event["type"] == "closed":
+                break
+        writer.close()
+        tcp.close()
+        await server.close()
+        await tcp.wait_closed()
+
+    asyncio.run(tcp_demo())
@@ -0,0 +1,360 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Simulator Module
+
+Name: Devane, Lemanuel
+
+This module runs Monte Carlo balance simulations: many seeded, headless
+SimpleBattles per class/enemy/level matchup, sharded across worker processes,
+with win rates, turn-count histograms and expected rewards streamed back.
+It also builds the enemy AI policy tables offline (see enemy_ai).
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import character_manager
+import combat_system
+import enemy_ai
+import game_data
+import reward_pipeline
+from custom_exceptions import MissingDataFileError
+
+# Player policies a simulation can use, by name (names pickle, functions may not)
+SIMULATION_POLICIES = {
+    "attack": combat_system.attack_policy,
+    "special": combat_system.special_when_ready_policy,
+    "cautious": combat_system.cautious_policy,
+}
+
+# Battles per shard handed to one worker at a time
+DEFAULT_SHARD_SIZE = 5000
+
+# Score a fleeing enemy gets for escaping (winning scores 1, losing 0)
+FLEE_SCORE = 0.5
+
+# ============================================================================
+# MATCHUP SETUP
+# ============================================================================
+
+def build_character(character_class, level=1):
+    """
+    Create a character of a class at a given level with full health
+
+    Stats come from the class progression table, exactly as if the character
+    had leveled up from level 1.
+
+    Returns: Character dictionary
+    Raises: InvalidCharacterClassError if class is not valid
+    """
+    character = character_manager.create_character(f"Sim {character_class}", character_class)
+    if level > 1:
+        table = character_manager.get_class_progression(character_class)
+        character["level"] = level
+        for stat in ["max_health", "strength", "magic"]:
+            character[stat] = game_data.get_stat_at_level(table, stat, level)
+        character["health"] = character["max_health"]
+    character["cooldowns"] = {}
+    return character
+
+def shard_seed(seed, character_class, enemy_type, level, shard_index):
+    """
+    Derive a shard's seed from the simulation seed
+
+    Seeds depend only on the matchup and shard number, never on which worker
+    runs the shard, so results are identical for any number of workers.
+
+    Returns: Integer seed
+    """
+    return combat_system.derive_seed(seed, character_class, enemy_type, level, shard_index)
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def new_stats():
+    """Empty aggregate for one matchup"""
+    return {"battles": 0, "wins": 0, "losses": 0, "escapes": 0,
+            "xp_total": 0, "gold_total": 0, "health_total": 0, "turns_histogram": {}}
+
+def merge_stats(total, part):
+    """
+    Add one aggregate into another
+
+    Returns: total (updated in place)
+    """
+    for key in ["battles", "wins", "losses", "escapes", "xp_total", "gold_total", "health_total"]:
+        total[key] += part[key]
+    histogram = total["turns_histogram"]
+    for turns, count in part["turns_histogram"].items():
+        histogram[turns] = histogram.get(turns, 0) + count
+    return total
+
+def summarize_stats(stats):
+    """
+    Add derived figures to an aggregate
+
+    Returns: stats with win_rate, escape_rate, mean_turns, expected_xp, expected_gold,
+             mean_health_left (character health at the end) and xp_per_turn
+    """
+    battles = stats["battles"] or 1
+    total_turns = sum(turns * count for turns, count in stats["turns_histogram"].items())
+    stats["win_rate"] = stats["wins"] / battles
+    stats["escape_rate"] = stats["escapes"] / battles
+    stats["mean_turns"] = total_turns / battles
+    stats["expected_xp"] = stats["xp_total"] / battles
+    stats["expected_gold"] = stats["gold_total"] / battles
+    stats["mean_health_left"] = stats["health_total"] / battles
+    stats["xp_per_turn"] = stats["xp_total"] / total_turns if total_turns else 0.0
+    return stats
+
+def run_shard(task):
+    """
+    Run one shard of battles (the unit of work sent to a worker process)
+
+    Args:
+        task: Tuple of (character_class, enemy_type, level, battles, seed, policy_name)
+
+    Returns: Tuple of (task, aggregate dictionary)
+    """
+    character_class, enemy_type, level, battles, seed, policy_name = task
+    policy = SIMULATION_POLICIES[policy_name]
+    template = build_character(character_class, level)
+    enemy_template = combat_system.create_enemy(enemy_type)
+
+    stats = new_stats()
+    histogram = stats["turns_histogram"]
+    for index in range(battles):
+        character = dict(template)
+        character["cooldowns"] = {}
+        # Each battle gets its own stream, so any single battle can be replayed
+        # with battle_rng(seed, index). Rewards don't change the outcome, so
+        # they go on a throwaway queue that is never applied.
+        battle = combat_system.SimpleBattle(character, dict(enemy_template), policy=policy, headless=True,
+                                            rng=combat_system.battle_rng(seed, index), record=False,
+                                            rewards=reward_pipeline.RewardQueue())
+        result = battle.start_battle()
+
+        stats["battles"] += 1
+        stats["health_total"] += result["character_health"]
+        if result["winner"] == "player":
+            stats["wins"] += 1
+            stats["xp_total"] += result["xp_gained"]
+            stats["gold_total"] += result["gold_gained"]
+        elif result["winner"] == "enemy":
+            stats["losses"] += 1
+        else:
+            stats["escapes"] += 1
+        histogram[result["turns"]] = histogram.get(result["turns"], 0) + 1
+
+    return task, stats
+
+def plan_shards(matchups, battles, seed=0, policy="special", shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Split each matchup's battles into seeded shards
+
+    Args:
+        matchups: Iterable of (character_class, enemy_type, level)
+
+    Returns: List of shard tasks for run_shard
+    """
+    if policy not in SIMULATION_POLICIES:
+        raise ValueError(f"Unknown policy '{policy}'. Must be one of: {', '.join(SIMULATION_POLICIES)}")
+
+    tasks = []
+    for character_class, enemy_type, level in matchups:
+        for shard_index, start in enumerate(range(0, battles, shard_size)):
+            count = min(shard_size, battles - start)
+            tasks.append((character_class, enemy_type, level, count,
+                          shard_seed(seed, character_class, enemy_type, level, shard_index), policy))
+    return tasks
+
+def iter_simulation(matchups, battles, seed=0, policy="special", workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Run battles for every matchup, streaming results as shards finish
+
+    Args:
+        matchups: Iterable of (character_class, enemy_type, level)
+        battles: Battles per matchup
+        seed: Simulation seed (same seed, same results)
+        policy: Name from SIMULATION_POLICIES
+        workers: Worker processes (None = one per CPU, 0 = run in this process)
+        shard_size: Battles per shard
+
+    Yields: Tuples of ((character_class, enemy_type, level), running aggregate)
+            after each shard, so callers can show progress or stop early
+    """
+    tasks = plan_shards(matchups, battles, seed, policy, shard_size)
+    totals = {}
+
+    def add(task, stats):
+        matchup = task[:3]
+        total = totals.setdefault(matchup, new_stats())
+        merge_stats(total, stats)
+        return matchup, summarize_stats(total)
+
+    if workers == 0:
+        for task in tasks:
+            yield add(*run_shard(task))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, task) for task in tasks]
+        for future in as_completed(futures):
+            yield add(*future.result())
+
+def simulate(matchups, battles, seed=0, policy="special", workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Run battles for every matchup and return the final aggregates
+
+    Returns: Dictionary {(character_class, enemy_type, level): aggregate} where each
+             aggregate has battles, wins, losses, escapes, win_rate, escape_rate,
+             mean_turns, expected_xp, expected_gold, mean_health_left, xp_per_turn
+             and turns_histogram {turns: count}
+    """
+    results = {}
+    for matchup, stats in iter_simulation(matchups, battles, seed, policy, workers, shard_size):
+        results[matchup] = stats
+    return results
+
+def simulate_grid(classes, enemy_types, levels, battles, seed=0, policy="special", workers=None,
+                  shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Simulate every class against every enemy type at every level
+
+    Returns: Same as simulate
+    """
+    matchups = [(character_class, enemy_type, level)
+                for character_class in classes
+                for enemy_type in enemy_types
+                for level in levels]
+    return simulate(matchups, battles, seed, policy, workers, shard_size)
+
+# ============================================================================
+# ENEMY AI POLICIES
+# ============================================================================
+
+def score_battle(strategy, battle, result):
+    """
+    How well a battle went for an enemy playing a strategy
+
+    Aggressive enemies are scored on the share of the character's health
+    they took; the others on the outcome (fleeing counts FLEE_SCORE).
+
+    Returns: Score between 0 and 1
+    """
+    if strategy == "aggressive":
+        return 1 - battle.character['health'] / battle.character['max_health']
+    if result['winner'] == "enemy":
+        return 1.0
+    if battle.enemy_fled:
+        return FLEE_SCORE
+    return 0.0
+
+def evaluate_policy(strategy, table, matchups, battles, seed=0, policy="special"):
+    """
+    Mean score of a policy table over seeded battles
+
+    Every table is evaluated on the same seeds, so differences between
+    tables come from the tables rather than from luck.
+
+    Returns: Mean score (see score_battle)
+    """
+    player_policy = SIMULATION_POLICIES[policy]
+    total = 0.0
+    count = 0
+    for character_class, enemy_type, level in matchups:
+        template = build_character(character_class, level)
+        enemy_template = dict(combat_system.create_enemy(enemy_type), strategy=strategy)
+        for index in range(battles):
+            character = dict(template)
+            character["cooldowns"] = {}
+            # Rewards go on a throwaway queue, as in run_shard
+            battle = combat_system.SimpleBattle(
+                character, dict(enemy_template), policy=player_policy, headless=True,
+                rng=combat_system.battle_rng(seed, character_class, enemy_type, level, index),
+                record=False, enemy_policy=table, rewards=reward_pipeline.RewardQueue())
+            total += score_battle(strategy, battle, battle.start_battle())
+            count += 1
+    return total / count if count else 0.0
+
+def build_policy_table(strategy, matchups, battles=50, seed=0, policy="special", rounds=2):
+    """
+    Build a strategy's policy table by simulation
+
+    Starting from a table that always takes the strategy's first action,
+    each state's action is switched to whichever allowed action scores best
+    with the rest of the table fixed; this repeats for up to rounds passes
+    or until nothing changes.
+
+    Args:
+        strategy: One of game_data.ENEMY_STRATEGIES
+        matchups: Iterable of (character_class, enemy_type, level)
+        battles: Battles per matchup for each evaluation
+
+    Returns: Table (list of actions, see game_data.load_enemy_policies)
+    """
+    matchups = list(matchups)
+    actions = game_data.STRATEGY_ACTIONS[strategy]
+    table = [actions[0]] * (enemy_ai.HP_BANDS * 2)
+    best = evaluate_policy(strategy, table, matchups, battles, seed, policy)
+    for _ in range(rounds):
+        changed = False
+        for state in range(len(table)):
+            for action in actions:
+                if action == table[state]:
+                    continue
+                candidate = table[:state] + [action] + table[state + 1:]
+                score = evaluate_policy(strategy, candidate, matchups, battles, seed, policy)
+                # Only a strictly better score switches, so unvisited states keep their action
+                if score > best:
+                    table, best, changed = candidate, score, True
+        if not changed:
+            break
+    return table
+
+def default_policy_matchups(classes=("Warrior", "Mage", "Rogue", "Cleric")):
+    """
+    Every class against every enemy type, at the lowest level the enemy spawns at
+
+    Returns: List of (character_class, enemy_type, level)
+    """
+    try:
+        enemies = game_data.load_enemies()
+    except MissingDataFileError:
+        enemies = game_data.DEFAULT_ENEMIES
+    return [(character_class, enemy_id, enemy["min_level"])
+            for enemy_id, enemy in enemies.items()
+            for character_class in classes]
+
+def build_policy_tables(matchups=None, battles=50, seed=0, policy="special", workers=None):
+    """
+    Build every strategy's policy table, one strategy per worker process
+
+    Args:
+        matchups: Iterable of (character_class, enemy_type, level)
+                  (default: default_policy_matchups())
+        workers: Worker processes (None = one per CPU, 0 = run in this process)
+
+    Returns: Dictionary {strategy: table}, ready for game_data.format_policy_blocks
+    """
+    matchups = list(matchups) if matchups is not None else default_policy_matchups()
+    strategies = game_data.ENEMY_STRATEGIES
+    if workers == 0:
+        return {strategy: build_policy_table(strategy, matchups, battles, seed, policy)
+                for strategy in strategies}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {strategy: pool.submit(build_policy_table, strategy, matchups, battles, seed, policy)
+                   for strategy in strategies}
+        return {strategy: future.result() for strategy, future in futures.items()}
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== BATTLE SIMULATOR TEST ===")
+
+    results = simulate_grid(["Warrior", "Mage", "Rogue", "Cleric"], ["goblin", "orc", "dragon"], [1, 5],
+                            battles=2000, seed=42)
+    for (character_class, enemy_type, level), stats in sorted(results.items()):
+        print(f"{character_class:8} vs {enemy_type:6} L{level}: win {stats['win_rate']:.1%}, "
+              f"turns {stats['mean_turns']:.1f}, XP/battle {stats['expected_xp']:.1f}")
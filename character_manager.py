@@ -10,27 +10,188 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import json
+import gzip
+import hashlib
+import unicodedata
+from urllib.parse import quote, unquote
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import game_data
+import ability_registry
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
     InvalidSaveDataError,
-    CharacterDeadError
+    CharacterDeadError,
+    MissingDataFileError
 )
 
+# Class progression tables from game_data, loaded on first use
+progression_tables = None
+
+# Characters whose class has no table level up on the built-in Warrior curve
+fallback_progression = game_data.build_progression_tables(game_data.DEFAULT_CLASS_PROGRESSION)["Warrior"]
+
+# Manifest file kept inside each save directory (see SAVE INDEX section)
+SAVE_INDEX_FILENAME = "save_index.txt"
+
+# In-memory save indexes, keyed by save directory
+save_index_cache = {}
+
+# Marker file recording a save directory's layout (see SAVE LAYOUT section)
+SAVE_LAYOUT_FILENAME = "save_layout.txt"
+SAVE_LAYOUTS = ["flat", "sharded"]
+
+# Layout of each save directory, read once per process
+save_layout_cache = {}
+
+# Memo of character name -> canonical key (see CHARACTER KEYS section)
+character_key_cache = {}
+MAX_CHARACTER_KEY_CACHE = 100000
+
+# ============================================================================
+# CHARACTER OBJECT
+# ============================================================================
+
+# Keys holding runtime objects (the special ability cached on typed characters), never saved or exported
+RUNTIME_FIELDS = ["ability"]
+
+# Save-file fields in save order, followed by the other standard fields
+CHARACTER_FIELDS = [
+    "name", "class", "level", "health", "max_health", "strength", "magic",
+    "experience", "gold", "inventory", "active_quests", "completed_quests",
+    "equipped_weapon", "equipped_armor", "cooldowns"]
+
+# Slot holding each field ("class" is a keyword, so it gets another name);
+# runtime fields get slots too, so they never need the overflow dict
+CHARACTER_SLOTS = {field: field for field in CHARACTER_FIELDS + RUNTIME_FIELDS}
+CHARACTER_SLOTS["class"] = "character_class"
+
+class Character:
+    """
+    Memory-compact character with dictionary-style access
+    
+    Standard fields live in __slots__ instead of a per-instance dict, which
+    cuts memory per character and makes field access an attribute lookup.
+    character['strength'], get, setdefault, 'key' in character and iteration
+    all behave like the character dictionaries used everywhere else, so the
+    other modules work with either. Any non-standard key goes in a small
+    overflow dict that is only created when needed.
+    
+    Returned by create_character and load_character when called with typed=True.
+    """
+    
+    __slots__ = tuple(CHARACTER_SLOTS.values()) + ("extra",)
+    
+    def __init__(self, data=None):
+        """Initialize from a character dictionary (or another Character)"""
+        self.extra = None
+        if data is not None:
+            for key, value in data.items():
+                self[key] = value
+    
+    def __getitem__(self, key):
+        slot = CHARACTER_SLOTS.get(key)
+        if slot is None:
+            if self.extra is not None and key in self.extra:
+                return self.extra[key]
+            raise KeyError(key)
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key, value):
+        slot = CHARACTER_SLOTS.get(key)
+        if slot is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        else:
+            setattr(self, slot, value)
+    
+    def __delitem__(self, key):
+        slot = CHARACTER_SLOTS.get(key)
+        try:
+            if slot is None:
+                del self.extra[key]
+            else:
+                delattr(self, slot)
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(key) from None
+    
+    def __contains__(self, key):
+        slot = CHARACTER_SLOTS.get(key)
+        if slot is None:
+            return self.extra is not None and key in self.extra
+        return hasattr(self, slot)
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __len__(self):
+        return len(self.keys())
+    
+    def __repr__(self):
+        return f"Character({self.to_dict()!r})"
+    
+    def get(self, key, default=None):
+        """Return the value for key, or default if it isn't set"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def setdefault(self, key, default=None):
+        """Return the value for key, setting it to default first if it isn't set"""
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+    
+    def keys(self):
+        """List the keys that are set, standard and runtime fields first"""
+        keys = [field for field in CHARACTER_SLOTS if hasattr(self, CHARACTER_SLOTS[field])]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+    
+    def values(self):
+        """List the values that are set, in keys() order"""
+        return [self[key] for key in self.keys()]
+    
+    def items(self):
+        """List (key, value) pairs that are set, in keys() order"""
+        return [(key, self[key]) for key in self.keys()]
+    
+    def to_dict(self):
+        """
+        Convert to a plain character dictionary
+        
+        Runtime fields (RUNTIME_FIELDS) are left out.
+        
+        Returns: New dictionary (lists are shared, not copied)
+        """
+        return {key: value for key, value in self.items() if key not in RUNTIME_FIELDS}
+
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
 # ============================================================================
 
-def create_character(name, character_class):
+def create_character(name, character_class, typed=False):
     """
     Create a new character with stats based on class
     
-    Valid classes: Warrior, Mage, Rogue, Cleric
+    Valid classes: Warrior, Mage, Rogue, Cleric (defined in data/classes.txt)
     
     Returns: Dictionary with character data including:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
+            A Character object with the same keys if typed is True.
     
     Raises: InvalidCharacterClassError if class is not valid
     """
@@ -47,24 +208,16 @@ def create_character(name, character_class):
     # - inventory=[], active_quests=[], completed_quests=[]
     
     # Raise InvalidCharacterClassError if class not in valid list
-    # List of valid classes
-    valid_classes = ["Warrior", "Mage", "Rogue", "Cleric"]
+    # Valid classes and base stats come from the progression tables
+    tables = get_progression_tables()
     
     # Validate class
-    if character_class not in valid_classes:
+    if character_class not in tables:
         raise InvalidCharacterClassError(
-            f"Invalid class '{character_class}'. Must be one of: {', '.join(valid_classes)}"
+            f"Invalid class '{character_class}'. Must be one of: {', '.join(tables)}"
         )
     
-    # Base stats per class
-    base_stats = {
-        "Warrior": {"health": 120, "strength": 15, "magic": 5},
-        "Mage": {"health": 80, "strength": 8, "magic": 20},
-        "Rogue": {"health": 90, "strength": 12, "magic": 10},
-        "Cleric": {"health": 100, "strength": 10, "magic": 15}
-    }
-    
-    stats = base_stats[character_class]
+    stats = tables[character_class]
     
     # Create character dictionary with base stats
     character = {
@@ -83,13 +236,52 @@ def create_character(name, character_class):
         'equipped_weapon': None,
         'equipped_armor': None}
     
+    if typed:
+        # Cache the class's special ability in its slot, instead of looking it up on every cast
+        character = Character(character)
+        ability_registry.resolve_ability(character)
     return character
 
+def get_progression_tables():
+    """
+    Get the class progression tables, loading data/classes.txt on first use
+    
+    Falls back to game_data.DEFAULT_CLASS_PROGRESSION if the file is missing.
+    
+    Returns: Dictionary {class_name: table} (see game_data.build_progression_tables)
+    """
+    global progression_tables
+    if progression_tables is None:
+        try:
+            progression_tables = game_data.load_progression()
+        except MissingDataFileError:
+            progression_tables = game_data.build_progression_tables(game_data.DEFAULT_CLASS_PROGRESSION)
+    return progression_tables
+
+def set_progression_tables(tables):
+    """
+    Replace the class progression tables, e.g. with a rebalanced file
+    
+    Args:
+        tables: Result of game_data.load_progression or build_progression_tables
+    """
+    global progression_tables
+    progression_tables = tables
+
+def get_class_progression(character_class):
+    """
+    Get the progression table for a class
+    
+    Returns: Table dictionary (the built-in curve for unknown classes)
+    """
+    return get_progression_tables().get(character_class, fallback_progression)
+
 def save_character(character, save_directory="data/save_games"):
     """
     Save character to file
     
-    Filename format: {character_name}_save.txt
+    Filename format: {character_key}_save.txt, where the key is the
+    filename-encoded canonical form of the name (see get_character_key)
     
     File format:
     NAME: character_name
@@ -117,38 +309,56 @@ def save_character(character, save_directory="data/save_games"):
     if not os.path.exists(save_directory):
         os.makedirs(save_directory, exist_ok=True)
     
-    filename = f"{save_directory}/{character['name']}_save.txt"
+    # Make sure the index is current before we change the directory
+    index = get_save_index(save_directory)
+    key = find_save_key(character['name'], save_directory)
+    if key == get_character_key(character['name']):
+        filename = get_save_path(character['name'], save_directory)
+    else:
+        # A save sharing its canonical key with another one stays where it is
+        filename = index[key]["path"]
+    if get_save_layout(save_directory) == "sharded":
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
     
+    # Build the whole file first and swap it in, so a failed save never
+    # damages the previous one
+    text = (f"NAME: {character['name']}\n"
+            f"CLASS: {character['class']}\n"
+            f"LEVEL: {character['level']}\n"
+            f"HEALTH: {character['health']}\n"
+            f"MAX_HEALTH: {character['max_health']}\n"
+            f"STRENGTH: {character['strength']}\n"
+            f"MAGIC: {character['magic']}\n"
+            f"EXPERIENCE: {character['experience']}\n"
+            f"GOLD: {character['gold']}\n"
+            f"INVENTORY: {','.join(character['inventory'])}\n"
+            f"ACTIVE_QUESTS: {','.join(character['active_quests'])}\n"
+            f"COMPLETED_QUESTS: {','.join(character['completed_quests'])}\n")
+    temp_file = filename + ".tmp"
     try:
-        with open(filename, "w") as f:
-            f.write(f"NAME: {character['name']}\n")
-            f.write(f"CLASS: {character['class']}\n")
-            f.write(f"LEVEL: {character['level']}\n")
-            f.write(f"HEALTH: {character['health']}\n")
-            f.write(f"MAX_HEALTH: {character['max_health']}\n")
-            f.write(f"STRENGTH: {character['strength']}\n")
-            f.write(f"MAGIC: {character['magic']}\n")
-            f.write(f"EXPERIENCE: {character['experience']}\n")
-            f.write(f"GOLD: {character['gold']}\n")
-            f.write(f"INVENTORY: {','.join(character['inventory'])}\n")
-            f.write(f"ACTIVE_QUESTS: {','.join(character['active_quests'])}\n")
-            f.write(f"COMPLETED_QUESTS: {','.join(character['completed_quests'])}\n")
+        with open(temp_file, "w") as f:
+            f.write(text)
+        os.replace(temp_file, filename)
         
+        update_save_index(character, filename, save_directory, key)
         return True
     
     except (PermissionError, IOError) as e:
         # Let the error raise
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
         raise e
 
-def load_character(character_name, save_directory="data/save_games"):
+def load_character(character_name, save_directory="data/save_games", typed=False):
     """
     Load character from save file
     
     Args:
         character_name: Name of character to load
         save_directory: Directory containing save files
+        typed: Return a Character object instead of a dictionary
     
-    Returns: Character dictionary
+    Returns: Character dictionary (or Character object)
     Raises: 
         CharacterNotFoundError if save file doesn't exist
         SaveFileCorruptedError if file exists but can't be read
@@ -159,79 +369,96 @@ def load_character(character_name, save_directory="data/save_games"):
     # Try to read file → SaveFileCorruptedError
     # Validate data format → InvalidSaveDataError
     # Parse comma-separated lists back into Python lists
-    filename = f"{save_directory}/{character_name}_save.txt"
-    
-    # Check if file exists
-    if not os.path.exists(filename):
-        raise CharacterNotFoundError(f"No save file found for {character_name}")
-    
-    character = {}
+    filename = find_save_path(character_name, save_directory)
     
     try:
         with open(filename, "r") as f:
-            for line in f: # <-- Correctly indented loop start
-                line = line.strip()
-
-                # Skip blank lines and comments
-                if not line or line.startswith('#'):
-                    continue
-            
-                parts = line.split(':', 1)
-        
-                
-                
-                
-                # Check if the split operation resulted in exactly 2 parts (key and value).
-                if len(parts) != 2:
-                    raise SaveFileCorruptedError(f"Malformed line in save file: '{line}'")
-            
-                # Correctly unpack and clean key/value
-                key, value = parts
-                key = key.lower()
-                value = value.strip()
-                
-                # Convert lists from comma-separated strings
-                if key in ["inventory", "active_quests", "completed_quests"]:
-                    character[key] = value.split(",") if value else []
-                # Convert numeric fields to int
-                elif key in ["level", "health", "max_health", "strength", "magic", "experience", "gold"]:
-                    try:
-                        character[key] = int(value)
-                    except ValueError:
-                        raise InvalidSaveDataError(f"Invalid number for {key}: {value}")
-                else:
-                    character[key] = value
-        
-        # Validate the loaded character (runs after the loop finishes)
-        validate_character_data(character)
-        return character
+            character = parse_character_save(f)
     
+    except FileNotFoundError:
+        # Opening the file doubles as the existence check
+        raise CharacterNotFoundError(f"No save file found for {character_name}")
     except InvalidSaveDataError as e:
         # Data format issues
         raise e
     except Exception as e:
         # Any other file reading issue (e.g., UnicodeDecodeError, etc.)
         raise SaveFileCorruptedError(f"Failed to read save file: {e}")
+    
+    if typed:
+        character = Character(character)
+        ability_registry.resolve_ability(character)
+    return character
+
+def parse_character_save(lines):
+    """
+    Parse the lines of a save file into a validated character dictionary
+    
+    Args:
+        lines: Iterable of save file lines (an open file works)
+    
+    Returns: Character dictionary
+    Raises:
+        SaveFileCorruptedError if a line is malformed
+        InvalidSaveDataError if data format is wrong
+    """
+    character = {}
+    
+    for line in lines:
+        line = line.strip()
+
+        # Skip blank lines and comments
+        if not line or line.startswith('#'):
+            continue
+    
+        parts = line.split(':', 1)
+        
+        # Check if the split operation resulted in exactly 2 parts (key and value).
+        if len(parts) != 2:
+            raise SaveFileCorruptedError(f"Malformed line in save file: '{line}'")
+    
+        # Correctly unpack and clean key/value
+        key, value = parts
+        key = key.lower()
+        value = value.strip()
+        
+        # Convert lists from comma-separated strings
+        if key in ["inventory", "active_quests", "completed_quests"]:
+            character[key] = value.split(",") if value else []
+        # Convert numeric fields to int
+        elif key in ["level", "health", "max_health", "strength", "magic", "experience", "gold"]:
+            try:
+                character[key] = int(value)
+            except ValueError:
+                raise InvalidSaveDataError(f"Invalid number for {key}: {value}")
+        else:
+            character[key] = value
+    
+    # Validate the loaded character (runs after the loop finishes)
+    validate_character_data(character)
+    return character
+
 def list_saved_characters(save_directory="data/save_games"):
     """
     Get list of all saved character names
     
-    Returns: List of character names (without _save.txt extension)
+    Returns: List of character names, as written in their saves
     """
     # TODO: Implement this function
     # Return empty list if directory doesn't exist
     # Extract character names from filenames
-    if not os.path.exists(save_directory):
-        return []  # No saves exist
-    
-    saved_files = os.listdir(save_directory)
-    characters = []
+    return [entry["name"] for entry in get_save_index(save_directory).values()]
+
+def list_saved_character_summaries(save_directory="data/save_games"):
+    """
+    Get name, level and class of every saved character without opening saves
     
-    for file in saved_files:
-        if file.endswith("_save.txt"):
-            # Remove the suffix to get the character name
-            characters.append(file[:-9])  # "_save.txt" is 9 characters
-    return characters
+    Returns: List of dictionaries with 'name', 'level' and 'class'
+    """
+    summaries = []
+    for entry in get_save_index(save_directory).values():
+        summaries.append({"name": entry["name"], "level": entry["level"], "class": entry["class"]})
+    return summaries
 
 def delete_character(character_name, save_directory="data/save_games"):
     """
@@ -241,15 +468,770 @@ def delete_character(character_name, save_directory="data/save_games"):
     Raises: CharacterNotFoundError if character doesn't exist
     """
     # TODO: Implement character deletion
-    # Verify file exists before attempting deletion
-    filename = f"{save_directory}/{character_name}_save.txt"
+    # Look the save up while the index still matches the directory
+    key = find_save_key(character_name, save_directory)
+    filename = find_save_path(character_name, save_directory)
     
-    if not os.path.exists(filename):
+    # Removing the file doubles as the existence check
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
         raise CharacterNotFoundError(f"No save file found for {character_name}")
     
-    os.remove(filename)
+    remove_from_save_index(character_name, save_directory, filename, key)
     return True
 
+# ============================================================================
+# CHARACTER KEYS
+# ============================================================================
+
+# Saves are keyed by a canonical form of the character name: surrounding
+# whitespace stripped, Unicode-normalized and case-folded, so "Aria", "aria "
+# and "ARIA" are the same character. On disk the key is percent-encoded,
+# which keeps "/", spaces and non-ASCII out of filenames and can be decoded
+# back to the key. The save index is keyed the same way and remembers the
+# display name, so lookups never have to probe the filesystem.
+#
+# Saves written before canonical keys can collide ("Aria" and "ARIA" were
+# different characters then). The save at the canonical path keeps the
+# canonical key and the others are indexed under a collision key that
+# includes their exact name, so every save stays listed and loadable.
+
+def get_character_key(character_name):
+    """
+    Get the canonical key for a character name
+    
+    Returns: Canonical key string
+    Raises: InvalidSaveDataError if the name is empty
+    """
+    key = character_key_cache.get(character_name)
+    if key is not None:
+        return key
+    
+    if not isinstance(character_name, str) or not character_name.strip():
+        raise InvalidSaveDataError(f"Character name cannot be empty, got {character_name!r}")
+    
+    key = unicodedata.normalize("NFC", unicodedata.normalize("NFC", character_name.strip()).casefold())
+    if len(character_key_cache) >= MAX_CHARACTER_KEY_CACHE:
+        character_key_cache.clear()
+    character_key_cache[character_name] = key
+    return key
+
+def get_collision_key(character_name):
+    """
+    Get the index key for a save whose canonical key belongs to another save
+    
+    Returns: Key string (the canonical key plus the exact, normalized name)
+    """
+    exact = unicodedata.normalize("NFC", character_name.strip())
+    return f"{get_character_key(character_name)}\n{exact}"
+
+def find_save_key(character_name, save_directory="data/save_games"):
+    """
+    Find the index key of a character's save
+    
+    Returns: The collision key if the index holds one for this exact name,
+             else the canonical key
+    Raises: InvalidSaveDataError if the name is empty
+    """
+    key = get_character_key(character_name)
+    index = get_save_index(save_directory)
+    collision_key = get_collision_key(character_name)
+    if collision_key in index:
+        return collision_key
+    return key
+
+def is_same_save_file(path, other):
+    """
+    Check whether two paths name the same file
+    
+    Also true for paths differing only in case on a case-insensitive filesystem.
+    
+    Returns: True if both paths lead to one file
+    """
+    if os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(other)):
+        return True
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+def encode_save_filename(text):
+    """
+    Percent-encode text for use in a filename
+    
+    Only letters, digits and "_.-~" are kept as-is.
+    
+    Returns: Encoded string (reversed by decode_save_filename)
+    """
+    return quote(text, safe="")
+
+def decode_save_filename(encoded):
+    """
+    Reverse encode_save_filename
+    
+    Returns: Decoded string
+    """
+    return unquote(encoded)
+
+def find_save_path(character_name, save_directory="data/save_games"):
+    """
+    Find where a character's save lives
+    
+    Uses the save index, so saves written under an older filename scheme are
+    still found. Characters the index doesn't know get their canonical path.
+    
+    Returns: Path string
+    Raises: InvalidSaveDataError if the name is empty
+    """
+    entry = get_save_index(save_directory).get(find_save_key(character_name, save_directory))
+    if entry is not None:
+        return entry["path"]
+    return get_save_path(character_name, save_directory)
+
+# ============================================================================
+# SAVE LAYOUT
+# ============================================================================
+
+# A save directory is either "flat" (every save directly inside it) or
+# "sharded" (save_games/ab/cd/key_save.txt, where ab/cd are the first hex
+# digits of a hash of the character key). Sharding keeps every directory small, so
+# per-save I/O stays constant however many characters exist. The layout is
+# recorded in SAVE_LAYOUT_FILENAME; directories without it are flat.
+
+def get_save_layout(save_directory="data/save_games"):
+    """
+    Get the layout of a save directory
+    
+    Returns: "flat" or "sharded"
+    Raises: InvalidSaveDataError if the layout file names an unknown layout
+    """
+    layout = save_layout_cache.get(save_directory)
+    if layout is not None:
+        return layout
+    
+    layout = "flat"
+    try:
+        with open(os.path.join(save_directory, SAVE_LAYOUT_FILENAME), "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip().upper() == "LAYOUT":
+                    layout = value.strip().lower()
+    except FileNotFoundError:
+        pass
+    
+    if layout not in SAVE_LAYOUTS:
+        raise InvalidSaveDataError(f"Unknown save layout '{layout}' in {save_directory}")
+    
+    save_layout_cache[save_directory] = layout
+    return layout
+
+def set_save_layout(save_directory, layout):
+    """
+    Record the layout of a save directory
+    
+    Raises: InvalidSaveDataError if layout is not one of SAVE_LAYOUTS
+    """
+    if layout not in SAVE_LAYOUTS:
+        raise InvalidSaveDataError(f"Invalid save layout '{layout}'. Must be one of: {', '.join(SAVE_LAYOUTS)}")
+    
+    os.makedirs(save_directory, exist_ok=True)
+    with open(os.path.join(save_directory, SAVE_LAYOUT_FILENAME), "w") as f:
+        f.write(f"LAYOUT: {layout}\n")
+    save_layout_cache[save_directory] = layout
+
+def get_shard_path(character_key, save_directory="data/save_games"):
+    """
+    Get the two-level shard directory a character's save lives in
+    
+    Returns: Path string in the format {save_directory}/ab/cd
+    """
+    digest = hashlib.sha1(character_key.encode("utf-8")).hexdigest()
+    return f"{save_directory}/{digest[0:2]}/{digest[2:4]}"
+
+def get_key_save_path(character_key, save_directory="data/save_games"):
+    """
+    Build the canonical save file path for a character key
+    
+    Returns: Path string in the format {save_directory}/{encoded_key}_save.txt,
+             or {save_directory}/ab/cd/{encoded_key}_save.txt when sharded
+    """
+    filename = f"{encode_save_filename(character_key)}_save.txt"
+    if get_save_layout(save_directory) == "sharded":
+        return f"{get_shard_path(character_key, save_directory)}/{filename}"
+    return f"{save_directory}/{filename}"
+
+def get_save_path(character_name, save_directory="data/save_games"):
+    """
+    Build the canonical save file path for a character name
+    
+    Returns: Path string (see get_key_save_path)
+    Raises: InvalidSaveDataError if the name is empty
+    """
+    return get_key_save_path(get_character_key(character_name), save_directory)
+
+def iter_save_files(save_directory="data/save_games"):
+    """
+    Generator over the save files in a directory, whatever its layout
+    
+    Flat saves left in a sharded directory (an interrupted migration) are
+    included too.
+    
+    Yields: Tuples of (filename_stem, path), the stem being the part before "_save.txt"
+    """
+    with os.scandir(save_directory) as top:
+        for entry in top:
+            if entry.is_file() and entry.name.endswith("_save.txt"):
+                yield entry.name[:-9], f"{save_directory}/{entry.name}"  # "_save.txt" is 9 characters
+            elif entry.is_dir() and get_save_layout(save_directory) == "sharded":
+                for shard in os.scandir(entry.path):
+                    if not shard.is_dir():
+                        continue
+                    for file in os.listdir(shard.path):
+                        if file.endswith("_save.txt"):
+                            yield file[:-9], f"{save_directory}/{entry.name}/{shard.name}/{file}"
+
+def migrate_to_sharded_layout(save_directory="data/save_games"):
+    """
+    Move every flat save in a directory into its shard
+    
+    The layout is switched first, so new saves go straight to their shards.
+    Safe to re-run: an interrupted migration picks up where it stopped.
+    
+    Legacy saves whose names share a canonical key (e.g. "Aria" and "ARIA")
+    would land on the same shard path; only the first is moved (the one
+    already at the canonical flat path, else the first by name) and the
+    others stay where they are, indexed under collision keys.
+    
+    Returns: Number of saves moved
+    """
+    if not os.path.exists(save_directory):
+        return 0
+    
+    set_save_layout(save_directory, "sharded")
+    saves = []
+    for file in os.listdir(save_directory):
+        if not file.endswith("_save.txt"):
+            continue
+        path = f"{save_directory}/{file}"
+        # Saves from before canonical keys are renamed on the way
+        name = read_save_summary(path)[0] or decode_save_filename(file[:-9])
+        key = get_character_key(name)
+        saves.append((file != f"{encode_save_filename(key)}_save.txt", file, path, key))
+    
+    moved = 0
+    for _, _, path, key in sorted(saves):
+        target = get_key_save_path(key, save_directory)
+        if os.path.exists(target):
+            # Another save already holds this key's shard path
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        moved += 1
+    
+    # Paths changed wholesale, rescan instead of patching the index
+    save_index_cache[save_directory] = rebuild_save_index(save_directory)
+    return moved
+
+# ============================================================================
+# SAVE INDEX
+# ============================================================================
+
+# Every save directory keeps a manifest (SAVE_INDEX_FILENAME) that mirrors an
+# in-memory dict of key -> {name, path, size, mtime, level, class}. The manifest is
+# append-only: SAVE/DELETE records are replayed in order and the last DIR_MTIME
+# record stamps the directory state they describe. Listing a directory then
+# costs a single os.stat, and a changed directory mtime triggers a rescan.
+
+def get_save_index(save_directory="data/save_games"):
+    """
+    Get the save index for a directory, revalidated against the directory mtime
+    
+    Returns: Dictionary {character_key: {'name', 'path', 'size', 'mtime', 'level', 'class'}}
+    """
+    try:
+        dir_mtime = os.stat(save_directory).st_mtime_ns
+    except FileNotFoundError:
+        save_index_cache.pop(save_directory, None)
+        return {}
+    
+    cached = save_index_cache.get(save_directory)
+    if cached is not None and cached["dir_mtime"] == dir_mtime:
+        return cached["entries"]
+    
+    # Try the manifest on disk before falling back to a full rescan
+    cached = read_save_index(save_directory)
+    if cached is None or cached["dir_mtime"] != dir_mtime:
+        cached = rebuild_save_index(save_directory)
+    
+    save_index_cache[save_directory] = cached
+    return cached["entries"]
+
+def lookup_saved_character(character_name, save_directory="data/save_games"):
+    """
+    Look up a saved character in the index
+    
+    Returns: Index entry dictionary, or None if the character has no save
+    """
+    return get_save_index(save_directory).get(find_save_key(character_name, save_directory))
+
+def rebuild_save_index(save_directory="data/save_games"):
+    """
+    Rescan a save directory and rewrite its manifest
+    
+    Only the LEVEL and CLASS lines of each save are read. Sharded directories
+    only change the top-level mtime when a new shard appears, so call this
+    after editing saves in a sharded directory by hand.
+    
+    Saves whose names share a canonical key get collision keys (see
+    CHARACTER KEYS): the one at the canonical path, or else the first by
+    path, keeps the canonical key.
+    
+    Returns: Index state dictionary with 'dir_mtime', 'entries', 'records', 'on_disk'
+    """
+    found = []
+    for stem, filename in iter_save_files(save_directory):
+        stat = os.stat(filename)
+        name, level, char_class = read_save_summary(filename)
+        if name is None:
+            name = decode_save_filename(stem)
+        key = get_character_key(name)
+        found.append((filename != get_key_save_path(key, save_directory), filename, key, {
+            "name": name,
+            "path": filename,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "level": level,
+            "class": char_class}))
+    
+    entries = {}
+    for _, filename, key, entry in sorted(found, key=lambda item: item[:2]):
+        if key in entries:
+            key = get_collision_key(entry["name"])
+            if key in entries:
+                # A stale copy of a save under the same exact name
+                continue
+        entries[key] = entry
+    
+    cached = {"dir_mtime": None, "entries": entries, "records": 0, "on_disk": False}
+    write_save_index(save_directory, cached)
+    return cached
+
+def read_save_summary(filename):
+    """
+    Read just the name, level and class from a save file
+    
+    Returns: Tuple of (name, level, class), with None for anything unreadable
+    """
+    name = None
+    level = None
+    char_class = None
+    try:
+        with open(filename, "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip().upper()
+                if key == "NAME":
+                    name = value.strip() or None
+                elif key == "LEVEL":
+                    level = int(value.strip())
+                elif key == "CLASS":
+                    char_class = value.strip()
+                if name is not None and level is not None and char_class is not None:
+                    break
+    except (OSError, UnicodeDecodeError, ValueError):
+        pass
+    return name, level, char_class
+
+def read_save_index(save_directory="data/save_games"):
+    """
+    Replay a save directory's manifest
+    
+    Returns: Index state dictionary, or None if the manifest is missing or unreadable
+    """
+    entries = {}
+    dir_mtime = None
+    records = 0
+    try:
+        with open(os.path.join(save_directory, SAVE_INDEX_FILENAME), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split("\t")
+                records += 1
+                if parts[0] == "SAVE" and len(parts) == 8:
+                    entries[decode_save_filename(parts[1])] = {
+                        "name": decode_save_filename(parts[2]),
+                        "path": parts[3],
+                        "size": int(parts[4]),
+                        "mtime": int(parts[5]),
+                        "level": int(parts[6]) if parts[6] else None,
+                        "class": parts[7] or None}
+                elif parts[0] == "DELETE" and len(parts) == 2:
+                    entries.pop(decode_save_filename(parts[1]), None)
+                elif parts[0] == "DIR_MTIME" and len(parts) == 2:
+                    dir_mtime = int(parts[1])
+                else:
+                    return None
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+    
+    return {"dir_mtime": dir_mtime, "entries": entries, "records": records, "on_disk": True}
+
+def format_save_index_record(character_key, entry):
+    """Format one SAVE record of the manifest (key and name are encoded to stay tab-free)"""
+    level = "" if entry["level"] is None else entry["level"]
+    char_class = entry["class"] or ""
+    key = encode_save_filename(character_key)
+    name = encode_save_filename(entry["name"])
+    return f"SAVE\t{key}\t{name}\t{entry['path']}\t{entry['size']}\t{entry['mtime']}\t{level}\t{char_class}\n"
+
+def write_save_index(save_directory, cached):
+    """
+    Rewrite a save directory's manifest from the in-memory index
+    
+    The manifest is only a cache, so write failures leave the index in memory only.
+    """
+    manifest = os.path.join(save_directory, SAVE_INDEX_FILENAME)
+    temp_file = manifest + ".tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write("# Quest Chronicles save index\n")
+            for key, entry in cached["entries"].items():
+                f.write(format_save_index_record(key, entry))
+        os.replace(temp_file, manifest)
+        cached["records"] = len(cached["entries"]) + 1  # plus the DIR_MTIME stamp
+        cached["on_disk"] = True
+    except OSError:
+        cached["on_disk"] = False
+    
+    stamp_save_index(save_directory, cached)
+
+def stamp_save_index(save_directory, cached):
+    """
+    Record the current directory mtime as the state the index describes
+    
+    Appending to an existing file leaves the directory mtime unchanged, so the
+    stamp is taken after every other write to the directory.
+    """
+    cached["dir_mtime"] = os.stat(save_directory).st_mtime_ns
+    if not cached["on_disk"]:
+        return
+    try:
+        with open(os.path.join(save_directory, SAVE_INDEX_FILENAME), "a", encoding="utf-8") as f:
+            f.write(f"DIR_MTIME\t{cached['dir_mtime']}\n")
+    except OSError:
+        cached["on_disk"] = False
+
+def append_save_index_record(save_directory, cached, record):
+    """
+    Append one SAVE/DELETE record to the manifest, compacting it when it grows
+    
+    Returns: None
+    """
+    # Compact once superseded records outnumber live ones
+    if not cached["on_disk"] or cached["records"] > 2 * len(cached["entries"]) + 32:
+        write_save_index(save_directory, cached)
+        return
+    try:
+        with open(os.path.join(save_directory, SAVE_INDEX_FILENAME), "a", encoding="utf-8") as f:
+            f.write(record)
+        cached["records"] += 2  # the record and its DIR_MTIME stamp
+    except OSError:
+        cached["on_disk"] = False
+    
+    stamp_save_index(save_directory, cached)
+
+def update_save_index(character, filename, save_directory="data/save_games", key=None):
+    """
+    Record a freshly written save in the index
+    
+    A save the index knew under another path (an older filename scheme) is
+    removed, so each character keeps exactly one save file. Paths that lead
+    to the same file (e.g. differing only in case on a case-insensitive
+    filesystem) are left alone.
+    
+    Args:
+        key: Index key the save was written under (default: the canonical key)
+    """
+    cached = save_index_cache.get(save_directory)
+    if cached is None:
+        # Nothing cached yet, the next lookup rescans the directory
+        return
+    
+    if key is None:
+        key = get_character_key(character["name"])
+    previous = cached["entries"].get(key)
+    if previous is not None and not is_same_save_file(previous["path"], filename):
+        try:
+            os.remove(previous["path"])
+        except FileNotFoundError:
+            pass
+    
+    stat = os.stat(filename)
+    entry = {
+        "name": character["name"],
+        "path": filename,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "level": character["level"],
+        "class": character["class"]}
+    cached["entries"][key] = entry
+    append_save_index_record(save_directory, cached, format_save_index_record(key, entry))
+
+def remove_from_save_index(character_name, save_directory="data/save_games", filename=None, key=None):
+    """
+    Drop a deleted save from the index
+    
+    Works on the cached index as it is: the deletion itself changed the
+    directory mtime, so revalidating here would force a full rescan.
+    
+    Args:
+        filename: Path of the deleted save; the entry is only dropped if it points there
+        key: Index key of the save (default: its collision key if indexed, else the canonical key)
+    """
+    cached = save_index_cache.get(save_directory)
+    if cached is None:
+        return
+    if key is None:
+        key = get_collision_key(character_name)
+        if key not in cached["entries"]:
+            key = get_character_key(character_name)
+    if key not in cached["entries"]:
+        return
+    if filename is not None and cached["entries"][key]["path"] != filename:
+        return
+    
+    del cached["entries"][key]
+    append_save_index_record(save_directory, cached, f"DELETE\t{encode_save_filename(key)}\n")
+
+# ============================================================================
+# BULK EXPORT / IMPORT
+# ============================================================================
+
+# Archives are JSON Lines: one character dictionary per line, optionally
+# gzip-compressed. Both directions stream one character at a time, so memory
+# use is bounded by a single record (plus one import batch).
+
+def iter_saved_characters(save_directory="data/save_games"):
+    """
+    Generator over every saved character
+    
+    Yields: Tuples of (character_name, character_dict, error). Exactly one of
+            character_dict and error is None, so unreadable saves don't stop the scan.
+    """
+    for character_name in list_saved_characters(save_directory):
+        try:
+            yield character_name, load_character(character_name, save_directory), None
+        except (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError) as e:
+            yield character_name, None, e
+
+def export_all(stream, save_directory="data/save_games", compress=False):
+    """
+    Write every saved character to a single JSON Lines archive
+    
+    Args:
+        stream: Binary file object to write to (left open)
+        save_directory: Directory containing save files
+        compress: Gzip-compress the archive
+    
+    Returns: Dictionary {'exported': int, 'failed': [(character_name, message), ...]}
+    """
+    report = {"exported": 0, "failed": []}
+    out = gzip.GzipFile(fileobj=stream, mode="wb") if compress else stream
+    
+    try:
+        for character_name, character, error in iter_saved_characters(save_directory):
+            if error is not None:
+                report["failed"].append((character_name, str(error)))
+                continue
+            record = {key: value for key, value in character.items() if key not in RUNTIME_FIELDS}
+            out.write(json.dumps(record).encode("utf-8") + b"\n")
+            report["exported"] += 1
+    finally:
+        if compress:
+            out.close()  # flushes the gzip trailer, leaves stream open
+    
+    return report
+
+def import_all(stream, save_directory="data/save_games", compress=False, batch_size=100):
+    """
+    Restore characters from a JSON Lines archive written by export_all
+    
+    Records are validated with validate_character_data in batches of batch_size
+    and saved with save_character. A bad record is reported and skipped, it
+    never aborts the import.
+    
+    Returns: Dictionary {'imported': int, 'failed': [(record_number, message), ...]}
+             where record_number counts archive lines from 1
+    """
+    report = {"imported": 0, "failed": []}
+    source = gzip.GzipFile(fileobj=stream, mode="rb") if compress else stream
+    
+    batch = []
+    for record_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            character = json.loads(line)
+            if not isinstance(character, dict):
+                raise InvalidSaveDataError(f"Record is not a character object: {character!r}")
+        except (ValueError, InvalidSaveDataError) as e:
+            report["failed"].append((record_number, str(e)))
+            continue
+        
+        batch.append((record_number, character))
+        if len(batch) >= batch_size:
+            import_character_batch(batch, save_directory, report)
+            batch = []
+    
+    if batch:
+        import_character_batch(batch, save_directory, report)
+    
+    return report
+
+def import_character_batch(batch, save_directory, report):
+    """Validate and save one batch of (record_number, character) pairs into report"""
+    valid = []
+    for record_number, character in batch:
+        try:
+            validate_character_data(character)
+            valid.append((record_number, character))
+        except InvalidSaveDataError as e:
+            report["failed"].append((record_number, str(e)))
+    
+    for record_number, character in valid:
+        try:
+            save_character(character, save_directory)
+            report["imported"] += 1
+        except (OSError, TypeError, InvalidSaveDataError) as e:
+            report["failed"].append((record_number, f"Could not save {character['name']}: {e}"))
+
+# ============================================================================
+# BULK VERIFICATION
+# ============================================================================
+
+# Integrity checks over a whole save directory. File reads fan out over a
+# thread pool (I/O bound) and parsing/validation over a process pool (CPU
+# bound). Reads run window by window while earlier windows are still being
+# parsed, and results stream back through a generator so memory stays bounded.
+
+def read_save_for_verify(name, path):
+    """
+    Read one save file for verification (runs in the I/O thread pool)
+    
+    Returns: Tuple of (name, path, text, error_status, error_message)
+    """
+    try:
+        with open(path, "r") as f:
+            return name, path, f.read(), None, None
+    except FileNotFoundError:
+        return name, path, None, "CharacterNotFoundError", f"No save file found for {name}"
+    except Exception as e:
+        return name, path, None, "SaveFileCorruptedError", f"Failed to read save file: {e}"
+
+def verify_save_chunk(chunk):
+    """
+    Parse and validate a chunk of read saves (runs in the parse process pool)
+    
+    Args:
+        chunk: List of tuples from read_save_for_verify
+    
+    Returns: List of result dictionaries with 'name', 'path', 'status', 'error'
+             where status is 'ok' or the name of the exception load_character raises
+    """
+    results = []
+    for name, path, text, status, message in chunk:
+        if status is None:
+            try:
+                parse_character_save(text.splitlines())
+                status = "ok"
+            except InvalidSaveDataError as e:
+                status, message = "InvalidSaveDataError", str(e)
+            except Exception as e:
+                status, message = "SaveFileCorruptedError", f"Failed to read save file: {e}"
+        results.append({"name": name, "path": path, "status": status, "error": message})
+    return results
+
+def verify_saved_characters(save_directory="data/save_games", io_workers=8, parse_workers=None,
+                            chunk_size=64, stats=None):
+    """
+    Load and validate every save in a directory in parallel
+    
+    Args:
+        save_directory: Directory containing save files
+        io_workers: Threads used to read files
+        parse_workers: Processes used to parse (None = one per CPU, 0 = parse in this process)
+        chunk_size: Saves handed to a parse worker at a time
+        stats: Optional dictionary updated live with throughput counters:
+               checked, ok, failed, bytes_read, seconds, saves_per_second
+    
+    Yields: Result dictionaries from verify_save_chunk, in save index order
+            (a chunk is yielded once it and every chunk before it are parsed)
+    """
+    if stats is None:
+        stats = {}
+    stats.update({"checked": 0, "ok": 0, "failed": 0, "bytes_read": 0,
+                  "seconds": 0.0, "saves_per_second": 0.0})
+    started = time.perf_counter()
+    
+    saves = [(entry["name"], entry["path"]) for entry in get_save_index(save_directory).values()]
+    
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    
+    parse_pool = None
+    if parse_workers > 0:
+        try:
+            parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        except (OSError, NotImplementedError):
+            parse_pool = None  # No process support here, parse inline instead
+    
+    # Read a window ahead of the parsers, but no further, to bound memory
+    window = chunk_size * (parse_workers if parse_pool else 1) * 2
+    pending = deque()
+    
+    def collect(results):
+        for result in results:
+            stats["checked"] += 1
+            if result["status"] == "ok":
+                stats["ok"] += 1
+            else:
+                stats["failed"] += 1
+        stats["seconds"] = time.perf_counter() - started
+        if stats["seconds"] > 0:
+            stats["saves_per_second"] = stats["checked"] / stats["seconds"]
+        return results
+    
+    try:
+        with ThreadPoolExecutor(max_workers=io_workers) as io_pool:
+            for start in range(0, len(saves), window):
+                batch = saves[start:start + window]
+                reads = list(io_pool.map(read_save_for_verify,
+                                         [name for name, path in batch],
+                                         [path for name, path in batch]))
+                for read in reads:
+                    if read[2] is not None:
+                        stats["bytes_read"] += len(read[2])
+                
+                for i in range(0, len(reads), chunk_size):
+                    chunk = reads[i:i + chunk_size]
+                    if parse_pool is None:
+                        yield from collect(verify_save_chunk(chunk))
+                    else:
+                        pending.append(parse_pool.submit(verify_save_chunk, chunk))
+                
+                # Keep at most one window of parsing in flight
+                while len(pending) > window // chunk_size:
+                    yield from collect(pending.popleft().result())
+            
+            while pending:
+                yield from collect(pending.popleft().result())
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -258,14 +1240,35 @@ def gain_experience(character, xp_amount):
     """
     Add experience to character and handle level ups
     
-    Level up formula: level_up_xp = current_level * 100
-    Example when leveling up:
+    Level up formula: level_up_xp = current_level * xp_per_level (100 by default)
+    Example when leveling up (gains come from the class progression table):
     - Increase level by 1
     - Increase max_health by 10
     - Increase strength by 2
     - Increase magic by 2
     - Restore health to max_health
     
+    Levels are applied by apply_experience; a level up prints a single
+    message however many levels were gained.
+    
+    Returns: Updated character dictionary
+    Raises: CharacterDeadError if character health is 0
+    """
+    message = format_level_up_message(apply_experience(character, xp_amount))
+    if message:
+        print(message)
+    return character
+
+def apply_experience(character, xp_amount):
+    """
+    Add experience and apply any level ups, without printing
+    
+    Any number of levels is applied at once: the final level is looked up in
+    the class's cumulative XP table.
+    
+    Returns: Level-up summary dictionary:
+            {'name': str, 'old_level': int, 'new_level': int, 'levels_gained': int}
+            (format it for players with format_level_up_message)
     Raises: CharacterDeadError if character health is 0
     """
     # TODO: Implement experience gain and leveling
@@ -280,23 +1283,44 @@ def gain_experience(character, xp_amount):
     # Add experience
     character["experience"] += xp_amount
     
-    # Check for level ups
-    while character["experience"] >= character["level"] * 100:
-        # Subtract XP needed for current level
-        character["experience"] -= character["level"] * 100
-        character["level"] += 1
+    # Jump straight to the final level
+    table = get_class_progression(character.get("class"))
+    old_level = character["level"]
+    total_xp = game_data.get_xp_to_reach(table, old_level) + character["experience"]
+    new_level = max(old_level, game_data.get_level_for_xp(table, total_xp))
+    levels = new_level - old_level
+    
+    if levels > 0:
+        # Keep only the XP left over past the new level
+        character["experience"] = total_xp - game_data.get_xp_to_reach(table, new_level)
+        character["level"] = new_level
         
         #Increase stats upon leveling up
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+        for stat in ["max_health", "strength", "magic"]:
+            character[stat] += (game_data.get_stat_at_level(table, stat, new_level)
+                                - game_data.get_stat_at_level(table, stat, old_level))
         
         # Restore health to max
         character["health"] = character["max_health"]
-        
-        print(f"{character['name']} leveled up to level {character['level']}!")
     
-    return character
+    return {
+        "name": character["name"],
+        "old_level": old_level,
+        "new_level": character["level"],
+        "levels_gained": levels}
+
+def format_level_up_message(summary):
+    """
+    Turn an apply_experience summary into a message for the player
+    
+    Returns: Message string, or None if no level was gained
+    """
+    if summary["levels_gained"] == 0:
+        return None
+    if summary["levels_gained"] == 1:
+        return f"{summary['name']} leveled up to level {summary['new_level']}!"
+    return (f"{summary['name']} gained {summary['levels_gained']} levels "
+            f"and is now level {summary['new_level']}!")
 
 
 def add_gold(character, amount):
@@ -410,10 +1434,19 @@ def validate_character_data(character):
         if not isinstance(character[num_key], int):
             raise InvalidSaveDataError(f"{num_key} must be an integer, got {character[num_key]}")
     
-    # Check lists
+    # Text fields are saved one per line
+    for text_key in ["name", "class"]:
+        if not isinstance(character[text_key], str) or "\n" in character[text_key]:
+            raise InvalidSaveDataError(f"{text_key} must be a single-line string, got {character[text_key]!r}")
+    
+    # Check lists (saved comma-separated, so entries can't hold commas or newlines)
     for list_key in ["inventory", "active_quests", "completed_quests"]:
         if not isinstance(character[list_key], list):
             raise InvalidSaveDataError(f"{list_key} must be a list, got {character[list_key]}")
+        for entry in character[list_key]:
+            if not isinstance(entry, str) or "," in entry or "\n" in entry:
+                raise InvalidSaveDataError(f"{list_key} entries must be strings without commas "
+                                           f"or newlines, got {entry!r}")
     
     return True
 
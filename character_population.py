@@ -0,0 +1,436 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Population Module
+
+Name: Devane, Lemanuel
+
+This module stores many characters' numeric stats in contiguous arrays so
+fleet-wide operations (heal everyone, pay everyone above a level, revive the
+dead) run as batch operations instead of one dictionary at a time.
+"""
+
+from array import array
+import character_manager
+import game_data
+from custom_exceptions import CharacterDeadError
+
+# NumPy is optional: with it, batch operations are vectorized; without it they
+# loop over array.array storage using the same rules
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Numeric character fields kept in arrays, one array per field
+POPULATION_FIELDS = ["level", "health", "max_health", "strength", "magic", "experience", "gold"]
+
+# Stats raised on level up
+LEVEL_UP_STATS = ["max_health", "strength", "magic"]
+
+# ============================================================================
+# CHARACTER POPULATION
+# ============================================================================
+
+class CharacterPopulation:
+    """
+    Array-backed store for a large population of characters
+
+    Each character gets a slot number. Numeric stats live in one contiguous
+    array per field (NumPy int64 arrays when available, array.array otherwise),
+    and the batch methods apply the same rules and clamping as the matching
+    character_manager functions to many slots at once.
+
+    Slots arguments accept None (every character), a list/array of slot
+    numbers, or (with NumPy) a boolean mask.
+    """
+
+    def __init__(self, use_numpy=None):
+        """
+        Create an empty population
+
+        Args:
+            use_numpy: True/False to force a backend, None to use NumPy if installed
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+
+        self.use_numpy = use_numpy
+        self.size = 0
+        self.names = []
+        self.classes = []
+        # Source character dictionaries, updated by write_back
+        self.characters = []
+        if use_numpy:
+            self.stats = {field: np.zeros(16, dtype=np.int64) for field in POPULATION_FIELDS}
+        else:
+            self.stats = {field: array("q") for field in POPULATION_FIELDS}
+
+    @classmethod
+    def from_characters(cls, characters, use_numpy=None):
+        """
+        Build a population from character dictionaries
+
+        Returns: CharacterPopulation with one slot per character, in order
+        """
+        population = cls(use_numpy)
+        for character in characters:
+            population.add(character)
+        return population
+
+    def __len__(self):
+        return self.size
+
+    def add(self, character):
+        """
+        Add a character to the population
+
+        The character's numeric stats are copied in; call write_back (or
+        get_character) to copy batch results back into it.
+
+        Returns: Slot number of the new character
+        """
+        slot = self.size
+        if self.use_numpy:
+            capacity = len(self.stats["level"])
+            if slot >= capacity:
+                # Grow by doubling so appends stay amortized O(1)
+                for field in POPULATION_FIELDS:
+                    grown = np.zeros(capacity * 2, dtype=np.int64)
+                    grown[:capacity] = self.stats[field]
+                    self.stats[field] = grown
+            for field in POPULATION_FIELDS:
+                self.stats[field][slot] = character[field]
+        else:
+            for field in POPULATION_FIELDS:
+                self.stats[field].append(character[field])
+
+        self.names.append(character["name"])
+        self.classes.append(character.get("class"))
+        self.characters.append(character)
+        self.size += 1
+        return slot
+
+    def get_stat(self, field, slot):
+        """Get one numeric stat of one character"""
+        return int(self.stats[field][slot])
+
+    def column(self, field):
+        """
+        Get the live values of a field for every slot
+
+        Returns: NumPy array view or array.array slice of length len(self)
+        """
+        return self.stats[field][:self.size]
+
+    def get_character(self, slot):
+        """
+        Copy a slot's stats back into its character dictionary
+
+        Returns: The character dictionary
+        """
+        character = self.characters[slot]
+        for field in POPULATION_FIELDS:
+            character[field] = int(self.stats[field][slot])
+        return character
+
+    def write_back(self):
+        """Copy every slot's stats back into its character dictionary"""
+        for slot in range(self.size):
+            self.get_character(slot)
+
+    # ------------------------------------------------------------------------
+    # Slot selection
+    # ------------------------------------------------------------------------
+
+    def select(self, slots):
+        """
+        Normalize a slots argument
+
+        A slot may only be selected once: batch operations read every
+        selected slot before writing, so a repeated slot would not add up
+        the way repeated single-character calls do.
+
+        Returns: NumPy index array (NumPy backend) or list of slot numbers
+        Raises: ValueError if a slot is selected more than once
+        """
+        if self.use_numpy:
+            if slots is None:
+                return np.arange(self.size)
+            slots = np.asarray(slots)
+            if slots.dtype == bool:
+                return np.flatnonzero(slots[:self.size])
+            slots = slots.astype(np.int64)
+            if len(np.unique(slots)) != len(slots):
+                raise ValueError("Each slot can only be selected once")
+            return slots
+        if slots is None:
+            return range(self.size)
+        slots = list(slots)
+        if len(set(slots)) != len(slots):
+            raise ValueError("Each slot can only be selected once")
+        return slots
+
+    def slots_where(self, field, minimum=None, maximum=None):
+        """
+        Find the characters whose field is within [minimum, maximum]
+
+        Example: slots_where("level", minimum=10)
+
+        Returns: Selected slots (NumPy index array or list)
+        """
+        values = self.column(field)
+        if self.use_numpy:
+            mask = np.ones(self.size, dtype=bool)
+            if minimum is not None:
+                mask &= values >= minimum
+            if maximum is not None:
+                mask &= values <= maximum
+            return np.flatnonzero(mask)
+        return [slot for slot in range(self.size)
+                if (minimum is None or values[slot] >= minimum)
+                and (maximum is None or values[slot] <= maximum)]
+
+    # ------------------------------------------------------------------------
+    # Batch operations
+    # ------------------------------------------------------------------------
+
+    def is_character_dead(self, slots=None):
+        """
+        Batch is_character_dead: health is 0 or below
+
+        Returns: Boolean NumPy array or list of bools, one per selected slot
+        """
+        slots = self.select(slots)
+        health = self.stats["health"]
+        if self.use_numpy:
+            return health[slots] <= 0
+        return [health[slot] <= 0 for slot in slots]
+
+    def heal_character(self, amount, slots=None):
+        """
+        Batch heal_character: heal by amount without exceeding max_health
+
+        Dead characters are not healed.
+
+        Returns: Actual amounts healed, one per selected slot
+        """
+        slots = self.select(slots)
+        health = self.stats["health"]
+        max_health = self.stats["max_health"]
+
+        if self.use_numpy:
+            current = health[slots]
+            maximum = max_health[slots]
+            alive = current > 0
+            healed = np.where(current + amount > maximum, maximum - current, amount)
+            healed = np.where(alive, healed, 0)
+            health[slots] = current + healed
+            return healed
+
+        healed_amounts = []
+        for slot in slots:
+            if health[slot] <= 0:
+                healed_amounts.append(0)
+                continue
+            if health[slot] + amount > max_health[slot]:
+                healed = max_health[slot] - health[slot]
+            else:
+                healed = amount
+            health[slot] += healed
+            healed_amounts.append(healed)
+        return healed_amounts
+
+    def add_gold(self, amount, slots=None):
+        """
+        Batch add_gold: add (or spend, if negative) gold
+
+        All-or-nothing: if any selected character would go negative, no gold
+        changes for anyone.
+
+        Returns: New gold totals, one per selected slot
+        Raises: ValueError if any result would be negative
+        """
+        slots = self.select(slots)
+        gold = self.stats["gold"]
+
+        if self.use_numpy:
+            new_gold = gold[slots] + amount
+            if (new_gold < 0).any():
+                broke = slots[np.flatnonzero(new_gold < 0)[0]]
+                raise ValueError(f"{self.names[broke]} cannot have negative gold!")
+            gold[slots] = new_gold
+            return new_gold
+
+        for slot in slots:
+            if gold[slot] + amount < 0:
+                raise ValueError(f"{self.names[slot]} cannot have negative gold!")
+        for slot in slots:
+            gold[slot] += amount
+        return [gold[slot] for slot in slots]
+
+    def revive_character(self, slots=None):
+        """
+        Batch revive_character: dead characters come back with 50% health
+
+        Returns: Which selected characters were revived (bools, one per slot)
+        """
+        slots = self.select(slots)
+        health = self.stats["health"]
+        max_health = self.stats["max_health"]
+
+        if self.use_numpy:
+            dead = health[slots] <= 0
+            revived = slots[dead]
+            health[revived] = max_health[revived] // 2
+            return dead
+
+        revived = []
+        for slot in slots:
+            dead = health[slot] <= 0
+            if dead:
+                health[slot] = max_health[slot] // 2
+            revived.append(dead)
+        return revived
+
+    def gain_experience(self, xp_amount, slots=None):
+        """
+        Batch gain_experience: add experience and apply level ups
+
+        Uses each character's class progression table, exactly like
+        character_manager.gain_experience. xp_amount is one number for
+        everyone or one per selected slot.
+
+        Returns: Levels gained, one per selected slot
+        Raises: CharacterDeadError if any selected character is dead (nothing is applied)
+        """
+        slots = self.select(slots)
+        stats = self.stats
+
+        if self.use_numpy:
+            if (stats["health"][slots] <= 0).any():
+                dead = slots[np.flatnonzero(stats["health"][slots] <= 0)[0]]
+                raise CharacterDeadError(f"{self.names[dead]} is dead and cannot gain XP!")
+
+            xp = np.broadcast_to(np.asarray(xp_amount, dtype=np.int64), slots.shape)
+            gained = np.zeros(len(slots), dtype=np.int64)
+
+            # One vectorized pass per class, since each has its own table
+            class_of = np.array([self.classes[slot] for slot in slots], dtype=object)
+            for character_class in set(class_of):
+                in_class = np.flatnonzero(class_of == character_class)
+                table = character_manager.get_class_progression(character_class)
+                group = slots[in_class]
+                gained[in_class] = self.level_up_group(table, group, xp[in_class])
+            return gained
+
+        if isinstance(xp_amount, int):
+            xp_amount = [xp_amount] * len(slots)
+        else:
+            xp_amount = list(xp_amount)
+        for slot in slots:
+            if stats["health"][slot] <= 0:
+                raise CharacterDeadError(f"{self.names[slot]} is dead and cannot gain XP!")
+
+        gained = []
+        for slot, xp in zip(slots, xp_amount):
+            table = character_manager.get_class_progression(self.classes[slot])
+            old_level = stats["level"][slot]
+            total_xp = game_data.get_xp_to_reach(table, old_level) + stats["experience"][slot] + xp
+            new_level = max(old_level, game_data.get_level_for_xp(table, total_xp))
+
+            stats["experience"][slot] += xp
+            if new_level > old_level:
+                stats["experience"][slot] = total_xp - game_data.get_xp_to_reach(table, new_level)
+                stats["level"][slot] = new_level
+                for stat in LEVEL_UP_STATS:
+                    stats[stat][slot] += (game_data.get_stat_at_level(table, stat, new_level)
+                                          - game_data.get_stat_at_level(table, stat, old_level))
+                stats["health"][slot] = stats["max_health"][slot]
+            gained.append(new_level - old_level)
+        return gained
+
+    def level_up_group(self, table, slots, xp):
+        """
+        Vectorized level ups for slots that share one progression table
+
+        Returns: NumPy array of levels gained
+        """
+        stats = self.stats
+        old_level = stats["level"][slots]
+        total_xp = xp_to_reach_array(table, old_level) + stats["experience"][slots] + xp
+        new_level = np.maximum(old_level, level_for_xp_array(table, total_xp))
+        leveled = new_level > old_level
+
+        stats["experience"][slots] = np.where(
+            leveled, total_xp - xp_to_reach_array(table, new_level), stats["experience"][slots] + xp)
+        stats["level"][slots] = new_level
+        for stat in LEVEL_UP_STATS:
+            stats[stat][slots] += stat_at_level_array(table, stat, new_level) - stat_at_level_array(table, stat, old_level)
+        stats["health"][slots] = np.where(leveled, stats["max_health"][slots], stats["health"][slots])
+        return new_level - old_level
+
+# ============================================================================
+# VECTORIZED PROGRESSION LOOKUPS
+# ============================================================================
+
+# NumPy versions of game_data.get_xp_to_reach, get_level_for_xp and
+# get_stat_at_level: table arrays inside the precomputed range, the closed
+# forms past it.
+
+def xp_to_reach_array(table, levels):
+    """Vectorized game_data.get_xp_to_reach"""
+    xp_to_reach = np.asarray(table["xp_to_reach"], dtype=np.int64)
+    in_table = (levels >= 0) & (levels < len(xp_to_reach))
+    closed_form = table["xp_per_level"] * levels * (levels - 1) // 2
+    return np.where(in_table, xp_to_reach[np.clip(levels, 0, len(xp_to_reach) - 1)], closed_form)
+
+def level_for_xp_array(table, total_xp):
+    """Vectorized game_data.get_level_for_xp"""
+    xp_to_reach = np.asarray(table["xp_to_reach"], dtype=np.int64)
+    in_table = np.searchsorted(xp_to_reach[1:], total_xp, side="right")
+
+    budget = np.maximum(total_xp, 0) // table["xp_per_level"]
+    closed_form = ((1 + np.sqrt(1 + 8 * budget.astype(np.float64))) // 2).astype(np.int64)
+    # Float sqrt can be off by one either way, so nudge onto the exact boundary
+    closed_form += ((closed_form + 1) * closed_form // 2 <= budget)
+    closed_form -= (closed_form * (closed_form - 1) // 2 > budget)
+
+    return np.where(total_xp < xp_to_reach[-1], in_table, closed_form)
+
+def stat_at_level_array(table, stat, levels):
+    """Vectorized game_data.get_stat_at_level"""
+    values = np.asarray(table[f"{stat}_at"], dtype=np.int64)
+    in_table = (levels >= 1) & (levels < len(values))
+    base = table["health"] if stat == "max_health" else table[stat]
+    per_level = table["health_per_level"] if stat == "max_health" else table[f"{stat}_per_level"]
+    return np.where(in_table, values[np.clip(levels, 0, len(values) - 1)], base + per_level * (levels - 1))
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== CHARACTER POPULATION TEST ===")
+
+    heroes = [character_manager.create_character(f"Hero{i}", "Warrior") for i in range(5)]
+    heroes[0]["health"] = 0
+    heroes[1]["health"] = 40
+    heroes[4]["level"] = 10
+
+    def as_list(values):
+        # NumPy results print more cleanly as plain lists
+        return values.tolist() if hasattr(values, "tolist") else values
+
+    population = CharacterPopulation.from_characters(heroes)
+    print(f"Backend: {'numpy' if population.use_numpy else 'array'}")
+    print(f"Dead: {as_list(population.is_character_dead())}")
+    print(f"Healed: {as_list(population.heal_character(50))}")
+    print(f"Revived: {as_list(population.revive_character())}")
+    print(f"Gold for level >= 10: {as_list(population.add_gold(50, population.slots_where('level', minimum=10)))}")
+    print(f"Levels gained: {as_list(population.gain_experience(250))}")
+
+    population.write_back()
+    for hero in heroes:
+        print(f"{hero['name']}: Level {hero['level']}, HP {hero['health']}/{hero['max_health']}, Gold {hero['gold']}")
@@ -0,0 +1,117 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Combat Output Module
+
+Name: Devane, Lemanuel
+
+This module turns battle events into output. Battles run at a verbosity
+level (silent, summary or full) that decides which events they produce at
+all, and the writers here collect events in memory and write them out in
+one go at the end of each turn or of the whole battle, instead of printing
+every line as it happens.
+"""
+
+import sys
+import json
+
+# How much a battle reports:
+# - silent: nothing (no messages are even formatted)
+# - summary: the start and end of the battle
+# - full: every action and health update
+VERBOSITY_LEVELS = ["silent", "summary", "full"]
+
+# When a writer sends its buffered output on
+FLUSH_MODES = ["turn", "battle"]
+
+# ============================================================================
+# FORMATTING
+# ============================================================================
+
+def format_battle_log(message):
+    """Format a battle message as a console line"""
+    return f">>> {message}"
+
+def format_combat_stats(character, enemy, combat_active=True):
+    """
+    Format both combatants' health as console text
+
+    Returns: String (several lines, without a trailing newline)
+    """
+    status = 'Active' if combat_active else 'Inactive'
+    return (f"\nCombat Status: {status}\n"
+            f"\n{character['name']}: HP={character['health']}/{character['max_health']}\n"
+            f"{enemy['name']}: HP={enemy['health']}/{enemy['max_health']}")
+
+def check_verbosity(verbosity):
+    """
+    Raises: ValueError if verbosity is not one of VERBOSITY_LEVELS
+    """
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown verbosity '{verbosity}'. Must be one of: {', '.join(VERBOSITY_LEVELS)}")
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+
+class BufferedWriter:
+    """
+    Battle sink that buffers console text in memory
+
+    Events are formatted as they arrive and kept in a list; the text is
+    written to the stream in a single write when a 'turn' event arrives
+    (flush_on="turn") or only when the battle's 'end' event arrives
+    (flush_on="battle").
+    """
+
+    def __init__(self, stream=None, flush_on="turn"):
+        """
+        Args:
+            stream: Text stream to write to (default: sys.stdout at flush time)
+            flush_on: "turn" or "battle"
+
+        Raises: ValueError if flush_on is not recognized
+        """
+        if flush_on not in FLUSH_MODES:
+            raise ValueError(f"Unknown flush mode '{flush_on}'. Must be one of: {', '.join(FLUSH_MODES)}")
+        self.stream = stream
+        self.flush_on = flush_on
+        self.lines = []
+
+    def __call__(self, event):
+        line = self.format_event(event)
+        if line is not None:
+            self.lines.append(line)
+        if event["type"] == "end" or (event["type"] == "turn" and self.flush_on == "turn"):
+            self.flush()
+
+    def format_event(self, event):
+        """
+        Format one event (override for other output formats)
+
+        Returns: String, or None to skip the event
+        """
+        if event["type"] == "log":
+            return format_battle_log(event["message"])
+        if event["type"] == "stats":
+            return format_combat_stats(event["character"], event["enemy"], event["active"])
+        return None
+
+    def flush(self):
+        """Write out everything buffered so far"""
+        if not self.lines:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("\n".join(self.lines) + "\n")
+        stream.flush()
+        self.lines.clear()
+
+class JsonLinesWriter(BufferedWriter):
+    """
+    Structured battle sink: one JSON object per event, buffered like BufferedWriter
+
+    The 'turn' and 'end' boundary events are written too, so a reader can
+    split the stream back into turns and battles.
+    """
+
+    def format_event(self, event):
+        return json.dumps(event)
@@ -9,8 +9,24 @@ AI Usage: I used Chatgpt and Google Ai to help me with the structure or the code
 Handles combat mechanics
 """
 import random
+import math
+import hashlib
+import struct
+import sys
+from array import array
 import character_manager
+import game_data
+import ability_registry
+import combat_output
+import battle_resolver
+import enemy_ai
+import loot_system
+import reward_pipeline
+# The built-in ability actions live in the registry; kept importable from here
+from ability_registry import warrior_power_strike, mage_fireball, rogue_critical_strike, cleric_heal
+from effect_scheduler import EffectScheduler
 from custom_exceptions import (
+    MissingDataFileError,
     InvalidTargetError,
     CombatNotActiveError,
     CharacterDeadError,
@@ -24,77 +40,162 @@ from character_manager import is_character_dead, create_character
 # ENEMY DEFINITIONS
 # ============================================================================
 
+# Enemy templates and level index, built from data/enemies.txt on first use
+enemy_catalog = None
+
 def create_enemy(enemy_type):
     """
     Create an enemy based on type
     
-    Example enemy types and stats:
+    Enemy types come from data/enemies.txt (see game_data.load_enemies).
+    Built-in enemy types and stats:
     - goblin: health=50, strength=8, magic=2, xp_reward=25, gold_reward=10
     - orc: health=80, strength=12, magic=5, xp_reward=50, gold_reward=25
     - dragon: health=200, strength=25, magic=15, xp_reward=200, gold_reward=100
     
-    Returns: Enemy dictionary
+    Returns: Enemy dictionary (a copy of the type's prebuilt template)
     Raises: InvalidTargetError if enemy_type not recognized
     """
-    # TODO: Implement enemy creation
-    # Return dictionary with: name, health, max_health, strength, magic, xp_reward, gold_reward
-    valid_types = ["goblin", "orc", "dragon"]  # all lowercase to match stats dict
-
-    enemy_type_key = enemy_type.lower()
-    if enemy_type_key not in valid_types:
+    template = get_enemy_catalog()["templates"].get(enemy_type.lower())
+    if template is None:
         raise InvalidTargetError(f"Invalid enemy type: {enemy_type}")
+    return dict(template)
 
-    enemy_stats = {
-        "goblin": {"health": 50, "strength": 8, "magic": 2, "xp_reward": 25, "gold_reward": 10},
-        "orc": {"health": 80, "strength": 12, "magic": 5, "xp_reward": 50, "gold_reward": 25},
-        "dragon": {"health": 200, "strength": 25, "magic": 15, "xp_reward": 200, "gold_reward": 100}}
+def get_random_enemy_for_level(character_level, rng=None):
+    """
+    Get an appropriate enemy for character's level
     
+    Picks by weight among the enemies whose level band contains the level
+    (built-in bands: level 1-2 goblins, 3-5 orcs, 6+ dragons). Levels below
+    the lowest band use the lowest band.
     
-    stats = enemy_stats[enemy_type_key]
-    return {
-        "name": enemy_type.capitalize(),
-        "health": stats["health"],
-        "max_health": stats["health"],
-        "strength": stats["strength"],
-        "magic": stats["magic"],
-        "xp_reward": stats["xp_reward"],
-        "gold_reward": stats["gold_reward"]}
-
-def get_random_enemy_for_level(character_level):
+    Returns: Enemy dictionary
+    Raises: InvalidTargetError if no enemy spawns at the level
     """
-    Get an appropriate enemy for character's level
+    if rng is None:
+        rng = random
+    index = get_enemy_catalog()["index"]
+    if not index["starts"]:
+        raise InvalidTargetError("No enemies can spawn")
     
-    Level 1-2: Goblins
-    Level 3-5: Orcs
-    Level 6+: Dragons
+    band = game_data.get_enemy_band(index, max(character_level, index["starts"][0]))
+    if band is None:
+        raise InvalidTargetError(f"No enemies spawn at level {character_level}")
+    return create_enemy(game_data.pick_enemy_id(band, rng.random()))
+
+def generate_enemy(character, rng=None):
+    """
+    Spawn an enemy suited to a character's level
     
     Returns: Enemy dictionary
+    Raises: InvalidTargetError if no enemy spawns at the character's level
     """
-    # TODO: Implement level-appropriate enemy selection
-    # Use if/elif/else to select enemy type
-    # Call create_enemy with appropriate type
-    if character_level <= 2:
-        enemy_type = "goblin"
-    elif 3 <= character_level <= 5:
-        enemy_type = "orc"
-    else:
-        enemy_type = "dragon"
+    return get_random_enemy_for_level(character['level'], rng)
+
+def get_enemy_catalog():
+    """
+    Get the enemy catalog, loading data/enemies.txt on first use
+    
+    Falls back to game_data.DEFAULT_ENEMIES if the file is missing.
     
-    return create_enemy(enemy_type)
+    Returns: Dictionary with 'templates' {enemy_id: enemy} and 'index'
+             (see game_data.build_enemy_level_index)
+    """
+    global enemy_catalog
+    if enemy_catalog is None:
+        try:
+            enemies = game_data.load_enemies()
+        except MissingDataFileError:
+            enemies = game_data.DEFAULT_ENEMIES
+        enemy_catalog = build_enemy_catalog(enemies)
+    return enemy_catalog
+
+def set_enemy_catalog(enemies):
+    """
+    Replace the enemy catalog, e.g. with a rebalanced file
+    
+    Args:
+        enemies: Result of game_data.load_enemies
+    """
+    global enemy_catalog
+    enemy_catalog = build_enemy_catalog(enemies)
+
+def build_enemy_catalog(enemies):
+    """
+    Prebuild an enemy dictionary for each type and index the level bands
+    
+    Returns: Catalog dictionary (see get_enemy_catalog)
+    """
+    templates = {}
+    for enemy_id, enemy in enemies.items():
+        templates[enemy_id.lower()] = {
+            "enemy_id": enemy_id,
+            "name": enemy["name"],
+            "health": enemy["health"],
+            "max_health": enemy["health"],
+            "strength": enemy["strength"],
+            "magic": enemy["magic"],
+            "xp_reward": enemy["xp_reward"],
+            "gold_reward": enemy["gold_reward"]}
+        if enemy.get("strategy"):
+            templates[enemy_id.lower()]["strategy"] = enemy["strategy"]
+    return {"templates": templates, "index": game_data.build_enemy_level_index(enemies)}
 
 # ============================================================================
 # COMBAT SYSTEM
 # ============================================================================
 
+# Player actions a policy can return, with the menu numbers they answer to
+PLAYER_ACTIONS = {"1": "attack", "2": "special", "3": "run"}
+
 class SimpleBattle:
     """
     Simple turn-based combat system
     
     Manages combat between character and enemy
+    
+    The player's action comes from a policy: a callable that takes the battle
+    and returns "attack", "special" or "run" (or menu numbers "1"-"3"). The
+    default asks the player with input(); pass attack_policy or another
+    function to run battles headless on a server, in tests or in simulations.
+    
+    Output goes to a sink: a callable that takes event dictionaries
+    ({'type': 'log', 'message': ...} or {'type': 'stats', ...}, plus
+    {'type': 'turn', 'turn': n} before each player decision and
+    {'type': 'end', 'winner': ..., 'turns': n} when the battle is over). The
+    default is a combat_output.BufferedWriter that prints once per turn;
+    headless battles produce no output unless given a sink. verbosity picks
+    which events are produced (see combat_output.VERBOSITY_LEVELS); per-turn
+    messages are not even formatted below "full".
+    
+    Escape and ability rolls come from rng: a random.Random (or NumPy
+    Generator) so a seeded battle plays out the same way every time.
+    
+    Every action is recorded in battle_log, a compact BattleLog that
+    replay_battle can play back through the engine.
     """
     
-    def __init__(self, character, enemy):
-        """Initialize battle with character and enemy"""
+    def __init__(self, character, enemy, policy=None, sink=None, headless=False, rng=None,
+                 record=True, verbosity=None, enemy_policy=None, rewards=None):
+        """
+        Initialize battle with character and enemy
+        
+        Args:
+            character: Character dictionary
+            enemy: Enemy dictionary
+            policy: Player action callable (default: interactive_policy)
+            sink: Event callable (default: combat_output.BufferedWriter, or no output if headless)
+            headless: Run without input or output; policy defaults to attack_policy
+            rng: Random generator with a random() method (default: the random module)
+            record: Keep a BattleLog of every action (battle_log is None otherwise)
+            verbosity: "silent", "summary" or "full" (default: "full" with a sink, else "silent")
+            enemy_policy: Enemy AI policy table (default: the table for the
+                          enemy's 'strategy', or basic attacks if it has none)
+            rewards: reward_pipeline.RewardQueue to queue victory rewards on
+                     (default: apply them when the battle ends)
+        
+        Raises: ValueError if verbosity or the enemy's strategy is not recognized
+        """
         # TODO: Implement initialization
         # Store character and enemy
         # Set combat_active flag
@@ -107,17 +208,49 @@ class SimpleBattle:
         # Flag to indicate if battle is ongoing
         self.combat_active = True
         
-        # Track whose turn it is: 'player' or 'enemy'
+        # Count of rounds (one player turn plus one enemy turn)
+        self.turns = 0
+        
+        # Where player actions come from and where output goes
+        if policy is None:
+            policy = attack_policy if headless else interactive_policy
+        if sink is None and not headless:
+            sink = combat_output.BufferedWriter()
+        if verbosity is None:
+            verbosity = "full" if sink is not None else "silent"
+        combat_output.check_verbosity(verbosity)
+        self.policy = policy
+        self.verbosity = verbosity
+        self.sink = sink if verbosity != "silent" else None
+        # Per-turn messages are only built when a sink will see them
+        self.log_turns = self.sink is not None and verbosity == "full"
+        self.rng = rng if rng is not None else random
        
-        # Optional: store battle log messages
-        self.battle_log = []
+        # How the enemy picks its actions (None: always a basic attack)
+        self.enemy_policy = enemy_policy if enemy_policy is not None else enemy_ai.get_enemy_policy(enemy)
+        self.enemy_fled = False
+        self.enemy_recoveries = 0
+        self.rewards = rewards
+       
+        # Cooldowns and status effects, advanced once per player turn
+        self.effects = EffectScheduler(self.apply_damage)
+       
+        # Event log; rolls go through a recorder so replays get the same values
+        self.battle_log = BattleLog() if record else None
+        if record:
+            self.rng = RecordingRng(self.rng, self.battle_log)
     
     def start_battle(self):
         """
         Start the combat loop
         
         Returns: Dictionary with battle results:
-                {'winner': 'player'|'enemy', 'xp_gained': int, 'gold_gained': int}
+                {'winner': 'player'|'enemy'|None, 'xp_gained': int, 'gold_gained': int,
+                 'turns': int, 'character_health': int, 'enemy_health': int}
+                winner is None if the player escaped or the enemy fled (see enemy_fled);
+                on a win, gold_gained includes bonus loot gold, 'loot' holds the
+                drops (see loot_system.roll_loot) and 'rewards' the applied batch
+                (see reward_pipeline.RewardQueue.apply_character; None if queued)
         
         Raises: CharacterDeadError if character is already dead
         """
@@ -125,48 +258,88 @@ class SimpleBattle:
         # Check character isn't dead
         # Loop until someone dies
         # Award XP and gold if player wins
+        self.begin_battle()
+
+        winner = None
+        while self.combat_active:
+            winner = self.play_round()
+        return self.finish_battle(winner)
+    
+    def begin_battle(self):
+        """
+        Check the character can fight and announce the battle
+        
+        Raises: CharacterDeadError if character is already dead
+        """
         self.character.setdefault('experience', 0)
         self.character.setdefault('gold', 0)
         #dictionary initializes cooldowns
         self.character.setdefault('cooldowns', {})
+        self.effects.track_cooldowns(self.character)
+        if self.enemy_policy is not None:
+            self.effects.track_cooldowns(self.enemy)
         if is_character_dead(self.character):
             raise CharacterDeadError(f"{self.character['name']} is already dead!")
 
-        display_battle_log(f"Battle started between {self.character['name']} and {self.enemy['name']}!")
-
-        while self.combat_active:
+        self.display_battle_log(f"Battle started between {self.character['name']} and {self.enemy['name']}!",
+                                summary=True)
+    
+    def play_round(self):
+        """
+        Play one player turn and, if the battle is still on, one enemy turn
+        
+        Returns: 'player' or 'enemy' if the round ended the battle, else None
+                 (combat_active is False after an escape)
+        """
+        self.turns += 1
         # Player's turn
-            self.player_turn()
-        # Check if battle ended after player acts
-            winner = self.check_battle_end()
-            if winner:
-                break
+        self.player_turn()
+        # Check if battle ended after player acts (a kill or an escape)
+        winner = self.check_battle_end()
+        if winner or not self.combat_active:
+            return winner
 
         # Enemy's turn
-            self.enemy_turn()
+        self.enemy_turn()
         # Check if battle ended after enemy acts
-            winner = self.check_battle_end()
-            if winner:
-                break
-        results = {'winner': winner, 'xp_gained': 0, 'gold_gained': 0}
+        return self.check_battle_end()
+    
+    def finish_battle(self, winner):
+        """
+        Award rewards and build the results once the battle is over
+        
+        Returns: Results dictionary (see start_battle)
+        """
+        self.effects.settle()
+        results = {'winner': winner, 'xp_gained': 0, 'gold_gained': 0, 'turns': self.turns,
+                   'character_health': self.character['health'], 'enemy_health': self.enemy['health']}
     # Battle ended, award rewards if player won
         if winner == "player":
-            rewards = get_victory_rewards(self.enemy)
-            self.character['experience'] += rewards['xp']
-            self.character['gold'] += rewards['gold']
-            display_battle_log(f"{self.character['name']} won! Gained {rewards['xp']} XP and {rewards['gold']} gold.")
+            rewards = grant_victory_rewards(self.character, self.enemy, self.rng, self.rewards)
+            self.display_battle_log(f"{self.character['name']} won! Gained {rewards['xp']} XP and "
+                                    f"{rewards['gold']} gold.", summary=True)
+            if rewards['summary'] is not None and self.sink is not None:
+                for message in reward_pipeline.format_reward_summary(rewards['summary'], totals=False):
+                    self.display_battle_log(message, summary=True)
             #Appends xp and gold won to characterif winner, returns nothing to dictionaryof stats if loser
-            return {'winner': 'player', 'xp_gained': rewards['xp'], 'gold_gained': rewards['gold']}
-    
-        else:
-            display_battle_log(f"{self.character['name']} was defeated by {self.enemy['name']}...")
-            return {'winner': 'enemy', 'xp_gained': 0, 'gold_gained': 0}
+            results['xp_gained'] = rewards['xp']
+            results['gold_gained'] = rewards['gold']
+            results['loot'] = rewards['loot']
+            results['rewards'] = rewards['summary']
+        elif winner == "enemy":
+            self.display_battle_log(f"{self.character['name']} was defeated by {self.enemy['name']}...",
+                                    summary=True)
+        elif self.enemy_fled:
+            self.display_battle_log(f"{self.enemy['name']} fled from the battle!", summary=True)
+        if self.sink is not None:
+            self.sink({"type": "end", "winner": winner, "turns": self.turns})
+        return results
     
     def player_turn(self):
         """
         Handle player's turn
         
-        Displays options:
+        Options (chosen by the battle's policy):
         1. Basic Attack
         2. Special Ability (if available)
         3. Try to Run
@@ -181,46 +354,62 @@ class SimpleBattle:
         if not self.combat_active:
             raise CombatNotActiveError("Cannot act, combat is not active!")
 
-    # Display current stats
+    # Display current stats and let the output catch up before the player decides
         self.display_combat_stats(self.character, self.enemy)
+        if self.log_turns:
+            self.sink({"type": "turn", "turn": self.turns})
 
-    # Choose action
-        print("\nChoose an action:")
-        print("1. Basic Attack")
-        print("2. Special Ability")
-        print("3. Try to Run")
-
-        choice = input("Enter choice (1-3): ").strip()
+    # Choose action (a stunned character loses the turn)
+        enemy_health = self.enemy['health']
+        rolls = self.battle_log.roll_count() if self.battle_log is not None else 0
+        if self.effects.consume_stun(self.character):
+            choice = "stunned"
+        else:
+            choice = self.policy(self)
+            choice = PLAYER_ACTIONS.get(choice, choice)
 
-        if choice == "1":
+        if choice == "stunned":
+            if self.log_turns:
+                self.display_battle_log(f"{self.character['name']} is stunned and cannot act!")
+        elif choice == "attack":
             damage = self.calculate_damage(self.character, self.enemy)
             self.apply_damage(self.enemy, damage)
-            self.display_battle_log(f"{self.character['name']} dealt {damage} damage to {self.enemy['name']}!")
-        elif choice == "2":
+            if self.log_turns:
+                self.display_battle_log(f"{self.character['name']} dealt {damage} damage to {self.enemy['name']}!")
+        elif choice == "special":
         # Call special ability function
-            result = use_special_ability(self.character, self.enemy)
-            self.display_battle_log(result)
-        elif choice == "3":
+            try:
+                result = use_special_ability(self.character, self.enemy, self.rng, self.effects)
+                self.display_battle_log(result)
+            except AbilityOnCooldownError as e:
+                if self.log_turns:
+                    self.display_battle_log(f"{e} Turn skipped.")
+        elif choice == "run":
             escaped = self.attempt_escape()
             if escaped:
-                self.display_battle_log(f"{self.character['name']} successfully escaped!")
+                self.display_battle_log(f"{self.character['name']} successfully escaped!", summary=True)
                 self.combat_active = False
-            else:
+            elif self.log_turns:
                 self.display_battle_log(f"{self.character['name']} failed to escape!")
         else:
             self.display_battle_log("Invalid choice! Turn skipped.")
         # Show updated stats after action
         self.display_combat_stats(self.character, self.enemy, self.combat_active)
-        #decraments cooldowns every turn
-        for ability in self.character['cooldowns']:
-            if self.character['cooldowns'][ability] > 0:
-                self.character['cooldowns'][ability] -= 1
+        # Count cooldowns down and fire status effects due this turn
+        for message in self.effects.advance():
+            self.display_battle_log(message)
+        if self.battle_log is not None:
+            self.battle_log.record(self.turns, "player", choice, enemy_health - self.enemy['health'],
+                                   self.character['health'], self.enemy['health'],
+                                   self.effects.remaining(self.character, 'special'),
+                                   self.battle_log.roll_count() - rolls)
     
     def enemy_turn(self):
         """
         Handle enemy's turn - simple AI
         
-        Enemy always attacks
+        Enemies without a strategy always attack; others look their action
+        up in their policy table (see enemy_ai)
         
         Raises: CombatNotActiveError if called outside of battle
         """
@@ -231,13 +420,58 @@ class SimpleBattle:
         if not self.combat_active:
             raise CombatNotActiveError("Cannot act, combat is not active!")
 
-        damage = self.calculate_damage(self.enemy, self.character)
-        self.apply_damage(self.character, damage)
-        self.display_battle_log(f"{self.enemy['name']} attacks and deals {damage} damage to {self.character['name']}!")
+        if self.effects.consume_stun(self.enemy):
+            if self.log_turns:
+                self.display_battle_log(f"{self.enemy['name']} is stunned and cannot act!")
+            action, damage = "stunned", 0
+        else:
+            action = "attack"
+            if self.enemy_policy is not None:
+                action = enemy_ai.choose_action(self.enemy_policy, self.enemy)
+            if action != "attack" and not enemy_ai.can_take_action(action, self.enemy, self.enemy_recoveries):
+                action = "attack"
+            if action == "attack":
+                damage = self.calculate_damage(self.enemy, self.character)
+                self.apply_damage(self.character, damage)
+                if self.log_turns:
+                    self.display_battle_log(f"{self.enemy['name']} attacks and deals {damage} damage to {self.character['name']}!")
+            else:
+                damage = self.enemy_action(action)
+        if self.battle_log is not None:
+            self.battle_log.record(self.turns, "enemy", action, damage, self.character['health'],
+                                   self.enemy['health'], self.effects.remaining(self.character, 'special'))
         
         # Show updated stats after attack
         self.display_combat_stats(self.character, self.enemy, self.combat_active)
 
+    def enemy_action(self, action):
+        """
+        Carry out an enemy AI action other than a basic attack
+        
+        Returns: Damage dealt to the character
+        """
+        enemy = self.enemy
+        if action == "ability":
+            damage = enemy_ai.ability_damage(enemy, self.character)
+            self.effects.set_cooldown(enemy, 'special', enemy_ai.ENEMY_ABILITY_COOLDOWN)
+            self.apply_damage(self.character, damage)
+            if self.log_turns:
+                self.display_battle_log(f"{enemy['name']} unleashes a heavy strike for {damage} damage!")
+            return damage
+        if action == "recover":
+            amount = enemy_ai.recover_amount(enemy)
+            self.effects.set_cooldown(enemy, 'special', enemy_ai.ENEMY_ABILITY_COOLDOWN)
+            self.enemy_recoveries += 1
+            enemy['health'] += amount
+            if self.log_turns:
+                self.display_battle_log(f"{enemy['name']} recovers {amount} HP!")
+            return 0
+        if action == "flee":
+            self.enemy_fled = True
+            self.combat_active = False
+            return 0
+        raise ValueError(f"Unknown enemy action '{action}'. Must be one of: {', '.join(game_data.ENEMY_ACTIONS)}")
+
     def calculate_damage(self, attacker, defender):
         """
         Calculate damage from attack
@@ -261,7 +495,8 @@ class SimpleBattle:
         target['health'] -= damage
         if target['health'] < 0:
             target['health'] = 0
-        display_battle_log(f"{target['name']} takes {damage} damage! (HP: {target['health']}/{target['max_health']})")
+        if self.log_turns:
+            self.display_battle_log(f"{target['name']} takes {damage} damage! (HP: {target['health']}/{target['max_health']})")
     
     def check_battle_end(self):
         """
@@ -289,17 +524,64 @@ class SimpleBattle:
         # TODO: Implement escape attempt
         # Use random number or simple calculation
         # If successful, set combat_active to False
-        success = random.random() < 0.5  # 50% chance
+        success = self.rng.random() < 0.5  # 50% chance
         if success:
             self.combat_active = False
         
         return success
+    
+    def display_battle_log(self, message, summary=False):
+        """
+        Send a battle message to the sink
+        
+        Args:
+            summary: True for start/end messages, which are shown at "summary" verbosity too
+        """
+        if self.log_turns or (summary and self.sink is not None):
+            self.sink({"type": "log", "message": message})
+    
+    def display_combat_stats(self, character, enemy, combat_active=True):
+        """Send both combatants' health to the sink (full verbosity only)"""
+        if self.log_turns:
+            self.sink({"type": "stats", "active": combat_active,
+                       "character": {"name": character['name'], "health": character['health'],
+                                     "max_health": character['max_health']},
+                       "enemy": {"name": enemy['name'], "health": enemy['health'],
+                                 "max_health": enemy['max_health']}})
+
+# ============================================================================
+# PLAYER POLICIES
+# ============================================================================
+
+def interactive_policy(battle):
+    """Ask the player for an action with input() (the default policy)"""
+    print("\nChoose an action:")
+    print("1. Basic Attack")
+    print("2. Special Ability")
+    print("3. Try to Run")
+    return input("Enter choice (1-3): ").strip()
+
+def attack_policy(battle):
+    """Always use a basic attack"""
+    return "attack"
+
+def special_when_ready_policy(battle):
+    """Use the special ability whenever it is off cooldown, otherwise attack"""
+    if battle.character['cooldowns'].get('special', 0) > 0:
+        return "attack"
+    return "special"
+
+def cautious_policy(battle):
+    """Try to run below a quarter of max health, otherwise fight like special_when_ready_policy"""
+    if battle.character['health'] * 4 < battle.character['max_health']:
+        return "run"
+    return special_when_ready_policy(battle)
 
 # ============================================================================
 # SPECIAL ABILITIES
 # ============================================================================
 
-def use_special_ability(character, enemy):
+def use_special_ability(character, enemy, rng=None, effects=None):
     """
     Use character's class-specific special ability
     
@@ -309,58 +591,349 @@ def use_special_ability(character, enemy):
     - Rogue: Critical Strike (3x strength damage, 50% chance)
     - Cleric: Heal (restore 30 health)
     
+    The ability comes from the ability registry and is cached on the
+    character; cooldowns and status effects come from data/abilities.txt.
+    
+    Args:
+        rng: Random generator for chance-based abilities (default: the random module)
+        effects: The battle's EffectScheduler; without one the cooldown is
+                 written to character['cooldowns'] and status effects are skipped
+    
     Returns: String describing what happened
     Raises: AbilityOnCooldownError if ability was used recently
     """
     if character['cooldowns'].get('special', 0) > 0:
         raise AbilityOnCooldownError(f"{character['name']}'s special ability is on cooldown!")
-    character['cooldowns']['special'] = 2
-
-    char_class = character['class'].lower()
-
-    if char_class == 'warrior':
-        return warrior_power_strike(character, enemy)
-    elif char_class == 'mage':
-        return mage_fireball(character, enemy)
-    elif char_class == 'rogue':
-        return rogue_critical_strike(character, enemy)
-    elif char_class == 'cleric':
-        return cleric_heal(character)
+    ability = ability_registry.resolve_ability(character)
+    cooldown = ability.cooldown if ability else game_data.DEFAULT_ABILITY_COOLDOWN
+    if effects is not None:
+        effects.set_cooldown(character, 'special', cooldown)
     else:
+        character['cooldowns']['special'] = cooldown
+
+    if ability is None:
         return f"{character['name']} has no special ability!"
-    # Set cooldown (2 turns)
+    result = ability.use(character, enemy, rng)
+
+    if effects is not None:
+        for effect in ability.effects:
+            target = character if effect['target'] == "self" else enemy
+            result += " " + effects.apply_effect(target, effect)
+    return result
+
+# ============================================================================
+# RANDOM NUMBER STREAMS
+# ============================================================================
+
+def derive_seed(seed, *keys):
+    """
+    Derive an independent 64-bit seed from a parent seed and keys
 
+    The same seed and keys always give the same child seed, and different
+    keys give unrelated ones, so every worker, shard and battle can get its
+    own stream: derive_seed(seed, "worker", 3), derive_seed(shard_seed, 17).
+
+    Returns: Integer seed
+    """
+    text = ":".join(str(part) for part in (seed,) + keys)
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+def spawn_seeds(seed, count):
+    """
+    Derive count child seeds from a parent seed (one per battle or worker)
+
+    Returns: List of integer seeds
+    """
+    return [derive_seed(seed, index) for index in range(count)]
+
+def battle_rng(seed, *keys):
+    """
+    Create a random.Random for one battle
+
+    Returns: random.Random seeded with derive_seed(seed, *keys)
+    """
+    return random.Random(derive_seed(seed, *keys))
+
+# ============================================================================
+# BATTLE REPLAY LOG
+# ============================================================================
+
+# One event: turn, actor, action, random rolls used, damage dealt,
+# character HP after, enemy HP after, special cooldown after (21 bytes)
+BATTLE_EVENT = struct.Struct("<IBBBiiiH")
+# Serialized log header: event count, roll count
+BATTLE_LOG_HEADER = struct.Struct("<II")
+
+BATTLE_ACTORS = ["player", "enemy"]
+BATTLE_ACTIONS = ["attack", "special", "run", "invalid", "stunned", "ability", "recover", "flee"]
+
+class BattleLog:
+    """
+    Compact record of a battle's events
+
+    Events are packed as fixed-width BATTLE_EVENT structs in a bytearray and
+    every random roll is kept in a double array, so a battle costs a few
+    dozen bytes per turn and can be replayed exactly with replay_battle.
+    """
+
+    def __init__(self, events=None, rolls=None):
+        self.events = bytearray(events or b"")
+        self.rolls = array("d", rolls or [])
+
+    def __len__(self):
+        return len(self.events) // BATTLE_EVENT.size
+
+    def roll_count(self):
+        """Number of random rolls recorded so far"""
+        return len(self.rolls)
+
+    def record(self, turn, actor, action, damage, character_health, enemy_health, cooldown, rolls=0):
+        """Append one event (unknown actions are recorded as 'invalid')"""
+        action_code = BATTLE_ACTIONS.index(action) if action in BATTLE_ACTIONS else BATTLE_ACTIONS.index("invalid")
+        self.events += BATTLE_EVENT.pack(turn, BATTLE_ACTORS.index(actor), action_code, rolls,
+                                         damage, character_health, enemy_health, cooldown)
+
+    def __iter__(self):
+        """
+        Decode the events
+
+        Yields: Dictionaries with turn, actor, action, rolls, damage,
+                character_health, enemy_health and cooldown
+        """
+        for turn, actor, action, rolls, damage, character_health, enemy_health, cooldown in \
+                BATTLE_EVENT.iter_unpack(bytes(self.events)):
+            yield {"turn": turn, "actor": BATTLE_ACTORS[actor], "action": BATTLE_ACTIONS[action],
+                   "rolls": rolls, "damage": damage, "character_health": character_health,
+                   "enemy_health": enemy_health, "cooldown": cooldown}
+
+    def to_bytes(self):
+        """
+        Serialize the log for storage
+
+        Returns: bytes (header, events, then rolls as little-endian doubles)
+        """
+        rolls = array("d", self.rolls)
+        if sys.byteorder == "big":
+            rolls.byteswap()
+        return BATTLE_LOG_HEADER.pack(len(self), len(rolls)) + bytes(self.events) + rolls.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Load a log written by to_bytes
+
+        Returns: BattleLog
+        Raises: ValueError if the data is truncated
+        """
+        if len(data) < BATTLE_LOG_HEADER.size:
+            raise ValueError("Battle log is truncated")
+        event_count, roll_count = BATTLE_LOG_HEADER.unpack_from(data)
+        events_end = BATTLE_LOG_HEADER.size + event_count * BATTLE_EVENT.size
+        if len(data) != events_end + roll_count * 8:
+            raise ValueError("Battle log is truncated")
+        rolls = array("d")
+        rolls.frombytes(data[events_end:])
+        if sys.byteorder == "big":
+            rolls.byteswap()
+        return cls(data[BATTLE_LOG_HEADER.size:events_end], rolls)
+
+class RecordingRng:
+    """Random generator wrapper that records every roll into a BattleLog"""
+
+    def __init__(self, rng, battle_log):
+        self.rng = rng
+        self.rolls = battle_log.rolls
+
+    def random(self):
+        value = float(self.rng.random())
+        self.rolls.append(value)
+        return value
+
+class ReplayRng:
+    """Random generator that returns recorded rolls in order"""
+
+    def __init__(self, rolls):
+        self.values = iter(rolls)
+
+    def random(self):
+        return next(self.values)
+
+def replay_battle(character, enemy, battle_log, sink=None):
+    """
+    Play a recorded battle back through the engine
+
+    The player's recorded actions and random rolls are fed to a new
+    SimpleBattle, so the engine reproduces the fight turn by turn. The
+    replayed events are compared with the recording to audit it. The
+    character and enemy passed in are left untouched: the replay fights
+    copies, and victory rewards go on a throwaway queue instead of being paid.
+
+    Args:
+        character: Character dictionary as it was when the battle started
+        enemy: Enemy dictionary as it was when the battle started
+        battle_log: BattleLog (or bytes from BattleLog.to_bytes)
+        sink: Optional event sink to watch the replay
+
+    Returns: Dictionary with the battle results ('rewards' is None, since
+             nothing is paid) plus 'matches': True if the replay produced
+             exactly the recorded events
+    """
+    if not isinstance(battle_log, BattleLog):
+        battle_log = BattleLog.from_bytes(battle_log)
+
+    actions = iter([event["action"] for event in battle_log
+                    if event["actor"] == "player" and event["action"] != "stunned"])
+    character = dict(character)
+    character['cooldowns'] = dict(character.get('cooldowns', {}))
+    enemy = dict(enemy)
+    if 'cooldowns' in enemy:
+        enemy['cooldowns'] = dict(enemy['cooldowns'])
+    battle = SimpleBattle(character, enemy, policy=lambda battle: next(actions, "attack"),
+                          sink=sink, headless=True, rng=ReplayRng(battle_log.rolls),
+                          rewards=reward_pipeline.RewardQueue())
+    try:
+        results = battle.start_battle()
+    except StopIteration:
+        # The engine asked for more rolls than were recorded
+        results = {'winner': None, 'xp_gained': 0, 'gold_gained': 0, 'turns': battle.turns,
+                   'character_health': character['health'], 'enemy_health': battle.enemy['health']}
+    results['matches'] = (battle.battle_log.events == battle_log.events and
+                          battle.battle_log.rolls == battle_log.rolls)
+    return results
+
+# ============================================================================
+# AUTO-RESOLVE
+# ============================================================================
+
+# Minimum win probability for a fight to be resolved without playing it out
+AUTO_RESOLVE_THRESHOLD = 0.99
+
+def predict_battle(character, enemy):
+    """
+    Work out a fight's outcome without playing it, for the better of two plans:
+    basic attacks only, or the special ability whenever it is ready
+    
+    Basic attacks are deterministic, so that outcome follows directly from
+    the calculate_damage formula (see battle_resolver). Deterministic
+    abilities are stepped through once; for a 50% ability (the Rogue's
+    critical strike) the win probability is exact: the character falls on a
+    known turn, so the player wins if enough of the ability uses before
+    then land.
     
+    Abilities with status effects, custom actions or a cooldown still
+    running are not predicted; only the attack plan is considered then.
+    Enemies with an AI strategy are not predicted at all (win probability 0).
+    
+    Returns: Dictionary {'policy': 'attack'|'special', 'win_probability': float}
+    """
+    prediction = {'policy': "attack", 'win_probability': 0.0}
+    if is_character_dead(character) or enemy.get('strategy') is not None:
+        return prediction
+    winner = battle_resolver.resolve_attack_battle(character['health'], character['strength'],
+                                                   enemy['health'], enemy['strength'])[0]
+    if winner == battle_resolver.PLAYER_WON:
+        prediction['win_probability'] = 1.0
+        return prediction
 
+    code = predictable_ability_code(character)
+    if code is None:
+        return prediction
+    cooldown = ability_registry.resolve_ability(character).cooldown
+    if code == battle_resolver.ROGUE:
+        probability = critical_strike_win_probability(character, enemy, cooldown)
+    else:
+        winner = battle_resolver.resolve_ability_battle(
+            code, character['health'], character['max_health'], character['strength'], character['magic'],
+            enemy['health'], enemy['strength'], cooldown=cooldown)[0]
+        probability = 1.0 if winner == battle_resolver.PLAYER_WON else 0.0
+    return {'policy': "special", 'win_probability': probability}
+
+def predictable_ability_code(character):
+    """
+    Get the battle_resolver class code of a character's ability, if it can be predicted
     
+    Returns: Class code, or None if the character has no ability, it has
+             status effects or a custom action, or it is on cooldown
+    """
+    ability = ability_registry.resolve_ability(character)
+    if ability is None or ability.effects or character.get('cooldowns', {}).get('special', 0) > 0:
+        return None
+    if ability.action not in battle_resolver.ABILITY_ACTIONS:
+        return None
+    return battle_resolver.ABILITY_ACTIONS.index(ability.action)
 
-def warrior_power_strike(character, enemy):
-    """Warrior special ability"""
-    damage = max(character['strength'] * 2 - (enemy['strength'] // 4), 1)
-    enemy['health'] = max(enemy['health'] - damage, 0)
-    return f"{character['name']} used Power Strike and dealt {damage} damage to {enemy['name']}!"
+def critical_strike_win_probability(character, enemy, cooldown):
+    """
+    Exact chance of winning by using the Rogue's critical strike whenever it is ready
+    
+    Returns: Probability between 0 and 1
+    """
+    defense = enemy['strength'] // 4
+    player_damage = battle_resolver.attack_damage(character['strength'], enemy['strength'])
+    enemy_damage = battle_resolver.attack_damage(enemy['strength'], character['strength'])
+    critical_damage = max(character['strength'] * 3 - defense, 1)
+    # The character falls on this turn unless the enemy falls first (the player acts first)
+    last_turn = -(-character['health'] // enemy_damage)
+    strikes = (last_turn - 1) // max(cooldown, 1) + 1
+    remaining = enemy['health'] - (last_turn - strikes) * player_damage
+    hits_needed = max(-(-remaining // critical_damage), 0)
+    if hits_needed > strikes:
+        return 0.0
+    return sum(math.comb(strikes, hits) for hits in range(hits_needed, strikes + 1)) / 2 ** strikes
 
-def mage_fireball(character, enemy):
-    """Mage special ability"""
-    damage = max(character['magic'] * 2 - (enemy['strength'] // 4), 1)
-    enemy['health'] = max(enemy['health'] - damage, 0)
-    return f"{character['name']} cast Fireball and dealt {damage} damage to {enemy['name']}!"
+def auto_resolve_battle(character, enemy, threshold=AUTO_RESOLVE_THRESHOLD, rng=None, rewards=None):
+    """
+    Settle a lopsided fight instantly instead of playing it turn by turn
+    
+    If predict_battle gives a win probability of at least threshold, the
+    fight is resolved with the predicted plan (chance-based abilities still
+    roll, so an unlikely loss can happen) and applied to the character and
+    enemy just as SimpleBattle would: health, cooldowns, XP, gold and loot.
+    
+    Args:
+        threshold: Minimum win probability (1.0 for certain wins only)
+        rng: Random generator for chance-based abilities and loot (default: the random module)
+        rewards: reward_pipeline.RewardQueue to queue victory rewards on
+                 (default: apply them now)
+    
+    Returns: Results dictionary (see SimpleBattle.start_battle) plus
+             'win_probability', or None if the fight is not lopsided enough
+    """
+    prediction = predict_battle(character, enemy)
+    if prediction['win_probability'] < threshold:
+        return None
+    character.setdefault('experience', 0)
+    character.setdefault('gold', 0)
+    character.setdefault('cooldowns', {})
 
-def rogue_critical_strike(character, enemy):
-    """Rogue special ability"""
-    if random.random() < 0.5:
-        damage = max(character['strength'] * 3 - (enemy['strength'] // 4), 1)
-        enemy['health'] = max(enemy['health'] - damage, 0)
-        return f"{character['name']} landed a Critical Strike and dealt {damage} damage to {enemy['name']}!"
+    if prediction['policy'] == "attack":
+        outcome = battle_resolver.resolve_attack_battle(character['health'], character['strength'],
+                                                        enemy['health'], enemy['strength'])
+        # A cooldown left from an earlier battle counts down every turn, as in SimpleBattle
+        character['cooldowns']['special'] = max(character['cooldowns'].get('special', 0) - outcome[1], 0)
     else:
-        return f"{character['name']} missed the Critical Strike!"
-
+        code = predictable_ability_code(character)
+        cooldown = ability_registry.resolve_ability(character).cooldown
+        outcome = battle_resolver.resolve_ability_battle(
+            code, character['health'], character['max_health'], character['strength'], character['magic'],
+            enemy['health'], enemy['strength'], cooldown=cooldown, rng=rng if rng is not None else random)
+        # Cooldown left from the last use, as EffectScheduler.settle would leave it
+        turns, period = outcome[1], max(cooldown, 1)
+        last_use = (turns - 1) // period * period + 1
+        character['cooldowns']['special'] = max(last_use - 1 + cooldown - turns, 0)
 
-def cleric_heal(character):
-    """Cleric special ability"""
-    heal_amount = min(30, character['max_health'] - character['health'])
-    character['health'] += heal_amount
-    return f"{character['name']} healed for {heal_amount} HP!"
+    winner_code, turns, character['health'], enemy['health'] = outcome[:4]
+    winner = {battle_resolver.PLAYER_WON: "player", battle_resolver.ENEMY_WON: "enemy"}.get(winner_code)
+    results = {'winner': winner, 'xp_gained': 0, 'gold_gained': 0, 'turns': turns,
+               'character_health': character['health'], 'enemy_health': enemy['health'],
+               'win_probability': prediction['win_probability']}
+    if winner == "player":
+        rewards = grant_victory_rewards(character, enemy, rng, rewards)
+        results['xp_gained'] = rewards['xp']
+        results['gold_gained'] = rewards['gold']
+        results['loot'] = rewards['loot']
+        results['rewards'] = rewards['summary']
+    return results
 
 # ============================================================================
 # COMBAT UTILITIES
@@ -388,6 +961,30 @@ def get_victory_rewards(enemy):
     # TODO: Implement reward calculation
     return {'xp': enemy['xp_reward'], 'gold': enemy['gold_reward']}
 
+def grant_victory_rewards(character, enemy, rng=None, rewards=None):
+    """
+    Roll the enemy's loot and give the character everything won
+
+    Args:
+        rng: Random generator for the loot rolls (default: the random module)
+        rewards: reward_pipeline.RewardQueue to queue the rewards on
+                 (default: apply them now)
+
+    Returns: Dictionary with 'xp', 'gold' (including bonus loot gold),
+             'loot' (see loot_system.roll_loot) and 'summary' (the applied
+             batch, see reward_pipeline.RewardQueue.apply_character; None if queued)
+    """
+    victory = get_victory_rewards(enemy)
+    loot = loot_system.roll_loot(enemy, rng)
+    gold = victory['gold'] + loot['gold']
+    items = [item_id for item_id, tier in loot['items']]
+    summary = None
+    if rewards is not None:
+        rewards.grant(character, victory['xp'], gold, items)
+    else:
+        summary = reward_pipeline.apply_reward(character, victory['xp'], gold, items)
+    return {'xp': victory['xp'], 'gold': gold, 'loot': loot, 'summary': summary}
+
 def display_combat_stats(character, enemy, combat_active=True):
     """
     Display current combat status
@@ -395,21 +992,22 @@ def display_combat_stats(character, enemy, combat_active=True):
     Shows both character and enemy health/stats
     """
     # TODO: Implement status display
-    if combat_active == True:
-        status = 'Active'
-    else:
-        status = 'Inactive'
-    print(f"\nCombat Status: {status}")
-    print(f"\n{character['name']}: HP={character['health']}/{character['max_health']}")
-    print(f"{enemy['name']}: HP={enemy['health']}/{enemy['max_health']}")
-    
+    print(combat_output.format_combat_stats(character, enemy, combat_active))
+
 
 def display_battle_log(message):
     """
     Display a formatted battle message
     """
     # TODO: Implement battle log display
-    print(f">>> {message}")
+    print(combat_output.format_battle_log(message))
+
+def console_sink(event):
+    """Print a battle event to the console as soon as it happens (unbuffered)"""
+    if event["type"] == "log":
+        display_battle_log(event["message"])
+    elif event["type"] == "stats":
+        display_combat_stats(event["character"], event["enemy"], event["active"])
     
 
 # ============================================================================
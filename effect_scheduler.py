@@ -0,0 +1,215 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Effect Scheduler Module
+
+Name: Devane, Lemanuel
+
+This module tracks ability cooldowns and timed status effects (poison, stun,
+buffs) for a battle. Instead of counting every cooldown down each turn, each
+timer is filed under the turn it runs out, so a turn only touches the timers
+that actually expire (or tick) on it.
+"""
+
+# ============================================================================
+# EFFECT SCHEDULER
+# ============================================================================
+
+class EffectScheduler:
+    """
+    Turn-indexed timers for cooldowns and status effects
+
+    Timers live in buckets keyed by the turn they fire on; advance() moves to
+    the next turn and handles only that turn's bucket, so the cost per turn
+    is O(timers firing), not O(all timers).
+
+    Cooldowns keep the character['cooldowns'] contract: an ability on
+    cooldown has a positive value there, and it is reset to 0 when the
+    cooldown expires (remaining() gives the exact turns left).
+
+    Effects:
+    - poison: the target takes 'amount' damage at the end of each of the
+      next 'turns' turns
+    - buff: the target's 'stat' is raised by 'amount' for 'turns' turns
+    - stun: the target skips its next 'turns' turns (see consume_stun)
+    """
+
+    def __init__(self, apply_damage=None, statuses=None):
+        """
+        Create a scheduler at turn 0
+
+        Args:
+            apply_damage: Callable (target, damage) used for poison damage
+                          (default: subtract from health, clamped at 0)
+            statuses: Shared {id(combatant): {effect_type: count}} dictionary,
+                      for battles where several schedulers affect the same combatants
+        """
+        self.turn = 0
+        self.buckets = {}
+        self.cooldowns = {}
+        self.buffs = {}
+        self.statuses = statuses if statuses is not None else {}
+        self.apply_damage = apply_damage if apply_damage is not None else subtract_health
+        self.next_buff = 0
+
+    def schedule(self, turn, entry):
+        """File a timer entry under the turn it fires on"""
+        self.buckets.setdefault(turn, []).append(entry)
+
+    # ------------------------------------------------------------------------
+    # COOLDOWNS
+    # ------------------------------------------------------------------------
+
+    def set_cooldown(self, owner, ability, turns):
+        """
+        Put an ability on cooldown for the owner's next turns turns
+
+        The cooldown counts down at each advance(); with advance() called at
+        the end of the owner's turn, the ability is usable again turns turns
+        after the one it was used on.
+        """
+        cooldowns = owner.setdefault('cooldowns', {})
+        key = (id(owner), ability)
+        if turns <= 0:
+            cooldowns[ability] = 0
+            self.cooldowns.pop(key, None)
+            return
+        expires = self.turn + turns
+        cooldowns[ability] = turns
+        self.cooldowns[key] = (expires, owner, ability)
+        self.schedule(expires, ("cooldown", key, expires))
+
+    def track_cooldowns(self, owner):
+        """Schedule expiry for cooldowns the owner already has (e.g. from an earlier battle)"""
+        for ability, turns in list(owner.setdefault('cooldowns', {}).items()):
+            if turns > 0 and (id(owner), ability) not in self.cooldowns:
+                self.set_cooldown(owner, ability, turns)
+
+    def remaining(self, owner, ability):
+        """Turns until the owner's ability is off cooldown"""
+        timer = self.cooldowns.get((id(owner), ability))
+        if timer is None:
+            return 0
+        return max(timer[0] - self.turn, 0)
+
+    # ------------------------------------------------------------------------
+    # STATUS EFFECTS
+    # ------------------------------------------------------------------------
+
+    def apply_effect(self, target, effect):
+        """
+        Apply a status effect (see game_data.load_abilities for the format)
+
+        Returns: String describing the effect
+        """
+        effect_type = effect['type']
+        turns = effect['turns']
+        amount = effect.get('amount', 0)
+        if effect_type == "poison":
+            self.add_status(target, "poison", 1)
+            self.schedule(self.turn + 1, ("poison", target, amount, turns))
+            return f"{target['name']} is poisoned for {turns} turns!"
+        if effect_type == "stun":
+            self.add_status(target, "stun", turns)
+            return f"{target['name']} is stunned!"
+        if effect_type == "buff":
+            stat = effect['stat']
+            target[stat] += amount
+            self.add_status(target, "buff", 1)
+            self.next_buff += 1
+            self.buffs[self.next_buff] = (target, stat, amount)
+            self.schedule(self.turn + turns, ("buff", self.next_buff))
+            return f"{target['name']}'s {stat} rises by {amount} for {turns} turns!"
+        raise ValueError(f"Unknown effect type: {effect_type}")
+
+    def add_status(self, target, effect_type, count):
+        statuses = self.statuses.setdefault(id(target), {})
+        statuses[effect_type] = statuses.get(effect_type, 0) + count
+
+    def remove_status(self, target, effect_type):
+        statuses = self.statuses.get(id(target))
+        if statuses and statuses.get(effect_type, 0) > 0:
+            statuses[effect_type] -= 1
+            if statuses[effect_type] == 0:
+                del statuses[effect_type]
+
+    def has_effect(self, target, effect_type):
+        """True if the target is under an effect of this type"""
+        return self.statuses.get(id(target), {}).get(effect_type, 0) > 0
+
+    def consume_stun(self, target):
+        """
+        Check whether the target must skip this turn, using up one stunned turn
+
+        Returns: True if the target is stunned
+        """
+        return consume_stun(self.statuses, target)
+
+    # ------------------------------------------------------------------------
+    # TURNS
+    # ------------------------------------------------------------------------
+
+    def advance(self):
+        """
+        Move to the next turn and fire the timers filed under it
+
+        Returns: List of messages describing what happened
+        """
+        self.turn += 1
+        messages = []
+        for entry in self.buckets.pop(self.turn, ()):
+            kind = entry[0]
+            if kind == "cooldown":
+                key, expires = entry[1], entry[2]
+                timer = self.cooldowns.get(key)
+                # A cooldown reset after this entry was filed has its own entry
+                if timer is not None and timer[0] == expires:
+                    del self.cooldowns[key]
+                    timer[1]['cooldowns'][timer[2]] = 0
+            elif kind == "poison":
+                target, amount, turns_left = entry[1], entry[2], entry[3]
+                if target['health'] > 0:
+                    self.apply_damage(target, amount)
+                    messages.append(f"{target['name']} suffers {amount} poison damage!")
+                if turns_left > 1 and target['health'] > 0:
+                    self.schedule(self.turn + 1, ("poison", target, amount, turns_left - 1))
+                else:
+                    self.remove_status(target, "poison")
+            elif kind == "buff":
+                target, stat, amount = self.buffs.pop(entry[1])
+                target[stat] -= amount
+                self.remove_status(target, "buff")
+                messages.append(f"{target['name']}'s {stat} boost wears off.")
+        return messages
+
+    def settle(self):
+        """
+        End the battle: write exact remaining cooldowns back and undo active buffs
+
+        Poison and stun end with the battle.
+        """
+        for expires, owner, ability in self.cooldowns.values():
+            owner['cooldowns'][ability] = max(expires - self.turn, 0)
+        self.cooldowns.clear()
+        for target, stat, amount in self.buffs.values():
+            target[stat] -= amount
+        self.buffs.clear()
+        self.buckets.clear()
+        self.statuses.clear()
+
+def consume_stun(statuses, target):
+    """
+    Use up one stunned turn from a statuses dictionary (see EffectScheduler)
+
+    Returns: True if the target is stunned
+    """
+    target_statuses = statuses.get(id(target))
+    if not target_statuses or target_statuses.get("stun", 0) <= 0:
+        return False
+    target_statuses["stun"] -= 1
+    if target_statuses["stun"] == 0:
+        del target_statuses["stun"]
+    return True
+
+def subtract_health(target, damage):
+    """Default damage rule: reduce health, never below 0"""
+    target['health'] = max(target['health'] - damage, 0)
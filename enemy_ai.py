@@ -0,0 +1,127 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Enemy AI Module
+
+Name: Devane, Lemanuel
+
+This module decides what enemies with a STRATEGY do on their turn. Each
+strategy has a policy table, built offline by battle_simulator and stored in
+data/enemy_policies.txt, that maps the enemy's state (its health band and
+whether its ability is ready) straight to an action, so a decision is one
+table lookup rather than a search.
+"""
+
+import game_data
+from custom_exceptions import MissingDataFileError
+
+# Enemy ability: a heavy strike for this multiple of a basic attack's strength,
+# usable again after this many rounds
+ENEMY_ABILITY_MULTIPLIER = 2
+ENEMY_ABILITY_COOLDOWN = 3
+
+# Percent of maximum health restored by "recover", which shares the ability's
+# cooldown and can only be used a few times per battle (so battles always end)
+ENEMY_RECOVER_PERCENT = 20
+ENEMY_MAX_RECOVERIES = 3
+
+HP_BANDS = len(game_data.POLICY_HP_BANDS)
+
+# Policy tables by strategy, from data/enemy_policies.txt
+policy_tables = None
+
+# ============================================================================
+# POLICY TABLES
+# ============================================================================
+
+def get_policy_tables():
+    """
+    Get the enemy policy tables, loading data/enemy_policies.txt on first use
+
+    Falls back to game_data.DEFAULT_ENEMY_POLICIES if the file is missing.
+
+    Returns: Dictionary {strategy: table} (see game_data.load_enemy_policies)
+    """
+    global policy_tables
+    if policy_tables is None:
+        try:
+            policies = game_data.load_enemy_policies()
+        except MissingDataFileError:
+            policies = game_data.DEFAULT_ENEMY_POLICIES
+        set_policy_tables(policies)
+    return policy_tables
+
+def set_policy_tables(policies):
+    """
+    Replace the policy tables, e.g. with freshly built ones
+
+    Strategies missing from policies keep their built-in table.
+
+    Args:
+        policies: Dictionary {strategy: table}
+    """
+    global policy_tables
+    tables = dict(game_data.DEFAULT_ENEMY_POLICIES)
+    tables.update(policies)
+    policy_tables = {strategy: tuple(table) for strategy, table in tables.items()}
+
+def get_enemy_policy(enemy):
+    """
+    Get the policy table for an enemy's strategy
+
+    Returns: Table (tuple of actions), or None if the enemy has no strategy
+    Raises: ValueError if the strategy is not recognized
+    """
+    strategy = enemy.get('strategy')
+    if strategy is None:
+        return None
+    table = get_policy_tables().get(strategy)
+    if table is None:
+        raise ValueError(f"Unknown enemy strategy '{strategy}'. "
+                         f"Must be one of: {', '.join(game_data.ENEMY_STRATEGIES)}")
+    return table
+
+# ============================================================================
+# DECISIONS
+# ============================================================================
+
+def policy_state(enemy):
+    """
+    Index of the enemy's current state in a policy table
+
+    Returns: health band * 2, plus 1 if the enemy's ability is cooling down
+    """
+    band = min(enemy['health'] * HP_BANDS // max(enemy['max_health'], 1), HP_BANDS - 1)
+    cooling = enemy.get('cooldowns', {}).get('special', 0) > 0
+    return band * 2 + cooling
+
+def choose_action(table, enemy):
+    """
+    Look up what the enemy does this turn
+
+    Returns: One of game_data.ENEMY_ACTIONS
+    """
+    return table[policy_state(enemy)]
+
+def can_take_action(action, enemy, recoveries=0):
+    """
+    Check whether the enemy can take an action now
+
+    The ability and recovering need the ability off cooldown, and recovering
+    is limited to ENEMY_MAX_RECOVERIES per battle. Attacking and fleeing are
+    always possible.
+
+    Returns: True if the action can be taken
+    """
+    if action in ("ability", "recover"):
+        if enemy.get('cooldowns', {}).get('special', 0) > 0:
+            return False
+        return action == "ability" or recoveries < ENEMY_MAX_RECOVERIES
+    return True
+
+def ability_damage(enemy, defender):
+    """Heavy strike damage, with the same defense rule as a basic attack"""
+    return max(enemy['strength'] * ENEMY_ABILITY_MULTIPLIER - defender['strength'] // 4, 1)
+
+def recover_amount(enemy):
+    """Health the enemy regains by recovering (never above maximum)"""
+    return min(enemy['max_health'] * ENEMY_RECOVER_PERCENT // 100, enemy['max_health'] - enemy['health'])
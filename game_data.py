@@ -10,11 +10,106 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import math
+import bisect
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError)
 
+# Levels precomputed in each class's progression arrays; lookups past this
+# fall back to the closed-form curve
+PROGRESSION_TABLE_LEVELS = 100
+
+# Numeric fields of a class progression block
+CLASS_NUMERIC_FIELDS = ["health", "strength", "magic", "health_per_level",
+                        "strength_per_level", "magic_per_level", "xp_per_level"]
+
+# Built-in class progression, used when data/classes.txt is missing
+DEFAULT_CLASS_PROGRESSION = {
+    "Warrior": {"class": "Warrior", "health": 120, "strength": 15, "magic": 5,
+                "health_per_level": 10, "strength_per_level": 2, "magic_per_level": 2, "xp_per_level": 100},
+    "Mage": {"class": "Mage", "health": 80, "strength": 8, "magic": 20,
+             "health_per_level": 10, "strength_per_level": 2, "magic_per_level": 2, "xp_per_level": 100},
+    "Rogue": {"class": "Rogue", "health": 90, "strength": 12, "magic": 10,
+              "health_per_level": 10, "strength_per_level": 2, "magic_per_level": 2, "xp_per_level": 100},
+    "Cleric": {"class": "Cleric", "health": 100, "strength": 10, "magic": 15,
+               "health_per_level": 10, "strength_per_level": 2, "magic_per_level": 2, "xp_per_level": 100}}
+
+# Numeric fields of an enemy block (MAX_LEVEL may also be NONE)
+ENEMY_NUMERIC_FIELDS = ["health", "strength", "magic", "xp_reward", "gold_reward",
+                        "min_level", "max_level", "weight"]
+
+# Built-in enemies, used when data/enemies.txt is missing
+DEFAULT_ENEMIES = {
+    "goblin": {"enemy_id": "goblin", "name": "Goblin", "health": 50, "strength": 8, "magic": 2,
+               "xp_reward": 25, "gold_reward": 10, "min_level": 1, "max_level": 2, "weight": 1},
+    "orc": {"enemy_id": "orc", "name": "Orc", "health": 80, "strength": 12, "magic": 5,
+            "xp_reward": 50, "gold_reward": 25, "min_level": 3, "max_level": 5, "weight": 1},
+    "dragon": {"enemy_id": "dragon", "name": "Dragon", "health": 200, "strength": 25, "magic": 15,
+               "xp_reward": 200, "gold_reward": 100, "min_level": 6, "max_level": None, "weight": 1}}
+
+# Enemy AI strategies (an enemy's optional STRATEGY field), the actions each
+# strategy's policy table may choose from, and the health bands (percent of
+# maximum health, lowest first) the tables are indexed by
+ENEMY_STRATEGIES = ["aggressive", "defensive", "ability", "fleeing"]
+ENEMY_ACTIONS = ["attack", "ability", "recover", "flee"]
+STRATEGY_ACTIONS = {
+    "aggressive": ["attack", "ability"],
+    "defensive": ["attack", "recover"],
+    "ability": ["attack", "ability", "recover"],
+    "fleeing": ["attack", "flee"]}
+POLICY_HP_BANDS = [25, 50, 75, 100]
+
+# Built-in policy tables, used when data/enemy_policies.txt is missing. Each
+# table lists two actions per health band: one for when the enemy's ability
+# is ready and one for while it cools down.
+DEFAULT_ENEMY_POLICIES = {
+    "aggressive": ["ability", "attack", "ability", "attack", "ability", "attack", "ability", "attack"],
+    "defensive": ["recover", "attack", "attack", "attack", "recover", "attack", "attack", "attack"],
+    "ability": ["ability", "attack", "recover", "attack", "attack", "attack", "attack", "attack"],
+    "fleeing": ["flee", "attack", "flee", "attack", "flee", "attack", "attack", "attack"]}
+
+# Loot rarity tiers, rarest last, with the chance weights used by loot tables
+# that do not set their own TIER lines
+RARITY_TIERS = ["common", "uncommon", "rare", "epic"]
+DEFAULT_RARITY_WEIGHTS = {"common": 70, "uncommon": 24, "rare": 5, "epic": 1}
+
+# Built-in loot tables by enemy id, used when data/loot.txt is missing
+DEFAULT_LOOT_TABLES = {
+    "goblin": {"enemy_id": "goblin", "gold_min": 0, "gold_max": 5, "drop_chance": 40, "rolls": 1,
+               "tiers": dict(DEFAULT_RARITY_WEIGHTS),
+               "drops": [("health_potion", "common", 3), ("leather_armor", "uncommon", 1),
+                         ("iron_sword", "uncommon", 1)]},
+    "orc": {"enemy_id": "orc", "gold_min": 5, "gold_max": 15, "drop_chance": 50, "rolls": 1,
+            "tiers": dict(DEFAULT_RARITY_WEIGHTS),
+            "drops": [("health_potion", "common", 2), ("iron_sword", "common", 1),
+                      ("super_health_potion", "uncommon", 1), ("steel_armor", "rare", 1)]},
+    "dragon": {"enemy_id": "dragon", "gold_min": 50, "gold_max": 150, "drop_chance": 100, "rolls": 2,
+               "tiers": dict(DEFAULT_RARITY_WEIGHTS),
+               "drops": [("super_health_potion", "common", 1), ("magic_robe", "uncommon", 1),
+                         ("steel_sword", "rare", 1), ("fire_staff", "rare", 1),
+                         ("strength_elixir", "epic", 1), ("wisdom_elixir", "epic", 1)]}}
+
+# Status effects an ability can apply, who they can target, and buffable stats
+EFFECT_TYPES = ["poison", "stun", "buff"]
+EFFECT_TARGETS = ["self", "enemy"]
+BUFF_STATS = ["strength", "magic"]
+
+# Cooldown (in the user's turns) for abilities that do not set one
+DEFAULT_ABILITY_COOLDOWN = 2
+
+# Built-in class abilities, used when data/abilities.txt is missing
+DEFAULT_ABILITIES = {
+    "power_strike": {"ability_id": "power_strike", "class": "Warrior", "name": "Power Strike",
+                     "cooldown": 2, "effects": []},
+    "fireball": {"ability_id": "fireball", "class": "Mage", "name": "Fireball",
+                 "cooldown": 2, "effects": []},
+    "critical_strike": {"ability_id": "critical_strike", "class": "Rogue", "name": "Critical Strike",
+                        "cooldown": 2, "effects": []},
+    "heal": {"ability_id": "heal", "class": "Cleric", "name": "Heal",
+             "cooldown": 2, "effects": []}}
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
@@ -161,6 +256,315 @@ def load_items(filename=os.path.join("data", "items.txt")):
         raise CorruptedDataError(f"Unable to read item file: {e}")
 
 
+def load_progression(filename=os.path.join("data", "classes.txt"), max_level=PROGRESSION_TABLE_LEVELS):
+    """
+    Load class progression data and precompute its lookup tables
+    
+    Expected format per class (separated by blank lines):
+    CLASS: Warrior
+    HEALTH: 120
+    STRENGTH: 15
+    MAGIC: 5
+    HEALTH_PER_LEVEL: 10
+    STRENGTH_PER_LEVEL: 2
+    MAGIC_PER_LEVEL: 2
+    XP_PER_LEVEL: 100
+    
+    Leveling from level L costs L * XP_PER_LEVEL experience.
+    
+    Returns: Dictionary of progression tables {class_name: table} (see build_progression_tables)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    classes = {}
+    for block in read_data_blocks(filename, "Class"):
+        class_data = parse_class_block(block)
+        validate_class_data(class_data)
+        classes[class_data["class"]] = class_data
+    
+    if not classes:
+        raise InvalidDataFormatError(f"No classes defined in {filename}")
+    
+    return build_progression_tables(classes, max_level)
+
+def load_enemies(filename=os.path.join("data", "enemies.txt")):
+    """
+    Load enemy data from file
+    
+    Expected format per enemy (separated by blank lines):
+    ENEMY_ID: goblin
+    NAME: Goblin
+    HEALTH: 50
+    STRENGTH: 8
+    MAGIC: 2
+    XP_REWARD: 25
+    GOLD_REWARD: 10
+    MIN_LEVEL: 1
+    MAX_LEVEL: 2
+    WEIGHT: 1
+    
+    MAX_LEVEL: NONE means no upper level; WEIGHT is optional (default 1) and
+    sets how often the enemy spawns relative to others in its level band.
+    STRATEGY is optional: one of ENEMY_STRATEGIES (see enemy_ai); enemies
+    without one always use a basic attack.
+    
+    Returns: Dictionary of enemies {enemy_id: enemy_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    enemies = {}
+    for block in read_data_blocks(filename, "Enemy"):
+        enemy_data = parse_enemy_block(block)
+        validate_enemy_data(enemy_data)
+        if enemy_data["enemy_id"] in enemies:
+            raise InvalidDataFormatError(f"Duplicate enemy id: {enemy_data['enemy_id']}")
+        enemies[enemy_data["enemy_id"]] = enemy_data
+    
+    if not enemies:
+        raise InvalidDataFormatError(f"No enemies defined in {filename}")
+    
+    return enemies
+
+def load_abilities(filename=os.path.join("data", "abilities.txt")):
+    """
+    Load class ability data from file
+    
+    Expected format per ability (separated by blank lines):
+    ABILITY_ID: power_strike
+    CLASS: Warrior
+    NAME: Power Strike
+    COOLDOWN: 2
+    EFFECT: stun target=enemy turns=1
+    
+    EFFECT lines are optional and may repeat. Each names an effect type
+    (poison, stun or buff) followed by key=value settings:
+    - target: self or enemy
+    - turns: how long it lasts (poison ticks once per turn; a stun skips
+      that many of the target's turns)
+    - amount: poison damage per turn, or buff size
+    - stat: the stat a buff raises (strength or magic)
+    
+    Returns: Dictionary of abilities {ability_id: ability_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    abilities = {}
+    for block in read_data_blocks(filename, "Ability"):
+        ability_data = parse_ability_block(block)
+        validate_ability_data(ability_data)
+        if ability_data["ability_id"] in abilities:
+            raise InvalidDataFormatError(f"Duplicate ability id: {ability_data['ability_id']}")
+        abilities[ability_data["ability_id"]] = ability_data
+    
+    if not abilities:
+        raise InvalidDataFormatError(f"No abilities defined in {filename}")
+    
+    return abilities
+
+def load_enemy_policies(filename=os.path.join("data", "enemy_policies.txt")):
+    """
+    Load enemy AI policy tables from file
+    
+    Expected format per strategy (separated by blank lines):
+    STRATEGY: fleeing
+    HP_25: flee flee
+    HP_50: attack attack
+    HP_75: attack attack
+    HP_100: attack attack
+    
+    Each HP_<n> line covers enemy health up to n% of maximum (the bands in
+    POLICY_HP_BANDS) and names the action to take when the enemy's ability
+    is ready, then the action while it is cooling down.
+    
+    Returns: Dictionary {strategy: table}, where a table is a flat list of
+             actions indexed by band * 2 + (1 if cooling down else 0)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    policies = {}
+    for block in read_data_blocks(filename, "Enemy policy"):
+        strategy, table = parse_policy_block(block)
+        validate_policy_data(strategy, table)
+        if strategy in policies:
+            raise InvalidDataFormatError(f"Duplicate policy for strategy: {strategy}")
+        policies[strategy] = table
+    
+    if not policies:
+        raise InvalidDataFormatError(f"No enemy policies defined in {filename}")
+    
+    return policies
+
+def load_loot_tables(filename=os.path.join("data", "loot.txt")):
+    """
+    Load enemy loot tables from file
+    
+    Expected format per enemy (separated by blank lines):
+    ENEMY_ID: goblin
+    GOLD: 0-5
+    DROP_CHANCE: 40
+    ROLLS: 1
+    TIER: common 80
+    TIER: uncommon 20
+    DROP: health_potion common 3
+    DROP: iron_sword uncommon 1
+    
+    GOLD is a range of bonus gold on top of the enemy's GOLD_REWARD.
+    DROP_CHANCE is the percent chance that a roll drops an item, and ROLLS
+    is the number of rolls per kill (default 1). TIER lines set the weight
+    of each rarity tier (default DEFAULT_RARITY_WEIGHTS); DROP lines name an
+    item, its tier and its weight within the tier.
+    
+    Returns: Dictionary of loot tables {enemy_id: loot_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    tables = {}
+    for block in read_data_blocks(filename, "Loot"):
+        loot_data = parse_loot_block(block)
+        validate_loot_data(loot_data)
+        if loot_data["enemy_id"] in tables:
+            raise InvalidDataFormatError(f"Duplicate loot table for enemy: {loot_data['enemy_id']}")
+        tables[loot_data["enemy_id"]] = loot_data
+    
+    if not tables:
+        raise InvalidDataFormatError(f"No loot tables defined in {filename}")
+    
+    return tables
+
+def build_enemy_level_index(enemies):
+    """
+    Precompute which enemies spawn at each level
+    
+    The level bands are cut at every MIN_LEVEL and MAX_LEVEL + 1 into
+    non-overlapping intervals. Each interval keeps its enemies with
+    cumulative spawn weights, so a lookup is two binary searches: one for
+    the interval and one for the weighted pick.
+    
+    Returns: Dictionary with:
+             - starts: sorted first level of each interval
+             - bands: per interval, {'enemy_ids': [...], 'cumulative': [...]}
+               (None where no enemy spawns)
+    """
+    boundaries = set()
+    for enemy in enemies.values():
+        if enemy["weight"] > 0:
+            boundaries.add(enemy["min_level"])
+            if enemy["max_level"] is not None:
+                boundaries.add(enemy["max_level"] + 1)
+    starts = sorted(boundaries)
+    
+    # Sweep the intervals, adding enemies as their band opens
+    by_min_level = sorted((enemy for enemy in enemies.values() if enemy["weight"] > 0),
+                          key=lambda enemy: enemy["min_level"])
+    active = []
+    next_enemy = 0
+    bands = []
+    for start in starts:
+        while next_enemy < len(by_min_level) and by_min_level[next_enemy]["min_level"] <= start:
+            active.append(by_min_level[next_enemy])
+            next_enemy += 1
+        active = [enemy for enemy in active if enemy["max_level"] is None or enemy["max_level"] >= start]
+        
+        if not active:
+            bands.append(None)
+            continue
+        cumulative = []
+        total = 0
+        for enemy in active:
+            total += enemy["weight"]
+            cumulative.append(total)
+        bands.append({"enemy_ids": [enemy["enemy_id"] for enemy in active], "cumulative": cumulative})
+    
+    return {"starts": starts, "bands": bands}
+
+def get_enemy_band(index, level):
+    """
+    Find the enemies that spawn at a level
+    
+    Returns: Band dictionary {'enemy_ids', 'cumulative'}, or None if no enemy
+             spawns at the level (O(log n))
+    """
+    position = bisect.bisect_right(index["starts"], level) - 1
+    if position < 0:
+        return None
+    return index["bands"][position]
+
+def pick_enemy_id(band, roll):
+    """
+    Pick an enemy from a band by weight
+    
+    Args:
+        band: Band dictionary from get_enemy_band
+        roll: Random number in [0, 1)
+    
+    Returns: Enemy id (O(log n))
+    """
+    cumulative = band["cumulative"]
+    position = bisect.bisect_right(cumulative, roll * cumulative[-1])
+    return band["enemy_ids"][min(position, len(cumulative) - 1)]
+
+def build_progression_tables(classes, max_level=PROGRESSION_TABLE_LEVELS):
+    """
+    Precompute cumulative progression arrays for each class
+    
+    Each table is the class dictionary plus arrays indexed by level (index 0 unused):
+    - xp_to_reach: total experience needed to reach the level from level 1
+    - max_health_at, strength_at, magic_at: base stats at the level
+    
+    Returns: Dictionary {class_name: table}
+    """
+    tables = {}
+    for class_name, class_data in classes.items():
+        table = dict(class_data)
+        levels = range(max_level + 1)
+        step = class_data["xp_per_level"]
+        table["xp_to_reach"] = [step * level * (level - 1) // 2 if level else 0 for level in levels]
+        table["max_health_at"] = [class_data["health"] + class_data["health_per_level"] * (level - 1) for level in levels]
+        table["strength_at"] = [class_data["strength"] + class_data["strength_per_level"] * (level - 1) for level in levels]
+        table["magic_at"] = [class_data["magic"] + class_data["magic_per_level"] * (level - 1) for level in levels]
+        tables[class_name] = table
+    return tables
+
+def get_xp_to_reach(table, level):
+    """
+    Total experience needed to reach level from level 1
+    
+    Returns: Integer XP (O(1): array lookup, closed form past the table)
+    """
+    if 0 <= level < len(table["xp_to_reach"]):
+        return table["xp_to_reach"][level]
+    return table["xp_per_level"] * level * (level - 1) // 2
+
+def get_level_for_xp(table, total_xp):
+    """
+    Highest level reachable with total_xp experience earned since level 1
+    
+    Binary search over xp_to_reach, or the closed-form root of
+    xp_per_level * L(L-1)/2 <= total_xp past the end of the table.
+    
+    Returns: Integer level (0 if total_xp is negative)
+    """
+    xp_to_reach = table["xp_to_reach"]
+    if total_xp < xp_to_reach[-1]:
+        return bisect.bisect_right(xp_to_reach, total_xp, 1) - 1
+    
+    budget = total_xp // table["xp_per_level"]
+    level = (1 + math.isqrt(1 + 8 * budget)) // 2
+    # isqrt floors, so nudge the level onto the exact boundary
+    while (level + 1) * level // 2 <= budget:
+        level += 1
+    while level * (level - 1) // 2 > budget:
+        level -= 1
+    return level
+
+def get_stat_at_level(table, stat, level):
+    """
+    Base value of max_health, strength or magic at a level
+    
+    Returns: Integer stat value (O(1): array lookup, linear past the table)
+    """
+    values = table[f"{stat}_at"]
+    if 1 <= level < len(values):
+        return values[level]
+    base = table["health"] if stat == "max_health" else table[stat]
+    per_level = table["health_per_level"] if stat == "max_health" else table[f"{stat}_per_level"]
+    return base + per_level * (level - 1)
+
 def validate_quest_data(quest_dict):
     """
     Validate that quest dictionary has all required fields
@@ -241,6 +645,155 @@ def validate_item_data(item_dict):
 
     return True
 
+def validate_class_data(class_dict):
+    """
+    Validate that class progression dictionary has all required fields
+    
+    Required fields: class, health, strength, magic, health_per_level,
+                    strength_per_level, magic_per_level, xp_per_level
+    
+    Returns: True if valid
+    Raises: InvalidDataFormatError if missing fields or invalid values
+    """
+    if "class" not in class_dict:
+        raise InvalidDataFormatError("Missing required class field: class")
+    
+    for key in CLASS_NUMERIC_FIELDS:
+        if key not in class_dict:
+            raise InvalidDataFormatError(f"Missing required class field: {key}")
+        if not isinstance(class_dict[key], int):
+            raise InvalidDataFormatError(f"{key} must be an integer, got {class_dict[key]}")
+    
+    if class_dict["health"] <= 0:
+        raise InvalidDataFormatError(f"health must be positive, got {class_dict['health']}")
+    if class_dict["xp_per_level"] <= 0:
+        raise InvalidDataFormatError(f"xp_per_level must be positive, got {class_dict['xp_per_level']}")
+    
+    return True
+
+def validate_enemy_data(enemy_dict):
+    """
+    Validate that enemy dictionary has all required fields
+    
+    Required fields: enemy_id, name, health, strength, magic, xp_reward,
+                    gold_reward, min_level, max_level (weight defaults to 1;
+                    strategy is optional)
+    
+    Returns: True if valid
+    Raises: InvalidDataFormatError if missing fields or invalid values
+    """
+    enemy_dict.setdefault("weight", 1)
+    if enemy_dict.get("strategy") is not None and enemy_dict["strategy"] not in ENEMY_STRATEGIES:
+        raise InvalidDataFormatError(f"Invalid enemy strategy: {enemy_dict['strategy']}")
+    for key in ["enemy_id", "name"] + ENEMY_NUMERIC_FIELDS:
+        if key not in enemy_dict:
+            raise InvalidDataFormatError(f"Missing required enemy field: {key}")
+    
+    for key in ENEMY_NUMERIC_FIELDS:
+        if key == "max_level" and enemy_dict[key] is None:
+            continue
+        if not isinstance(enemy_dict[key], int):
+            raise InvalidDataFormatError(f"{key} must be an integer, got {enemy_dict[key]}")
+    
+    if enemy_dict["health"] <= 0:
+        raise InvalidDataFormatError(f"health must be positive, got {enemy_dict['health']}")
+    if enemy_dict["weight"] < 0:
+        raise InvalidDataFormatError(f"weight cannot be negative, got {enemy_dict['weight']}")
+    if enemy_dict["max_level"] is not None and enemy_dict["max_level"] < enemy_dict["min_level"]:
+        raise InvalidDataFormatError(
+            f"max_level {enemy_dict['max_level']} is below min_level {enemy_dict['min_level']}")
+    
+    return True
+
+def validate_ability_data(ability_dict):
+    """
+    Validate that ability dictionary has all required fields
+    
+    Required fields: ability_id, class, name (cooldown defaults to
+    DEFAULT_ABILITY_COOLDOWN, effects to none)
+    
+    Returns: True if valid
+    Raises: InvalidDataFormatError if missing fields or invalid values
+    """
+    ability_dict.setdefault("cooldown", DEFAULT_ABILITY_COOLDOWN)
+    ability_dict.setdefault("effects", [])
+    for key in ["ability_id", "class", "name"]:
+        if key not in ability_dict:
+            raise InvalidDataFormatError(f"Missing required ability field: {key}")
+    
+    if not isinstance(ability_dict["cooldown"], int) or ability_dict["cooldown"] < 0:
+        raise InvalidDataFormatError(f"cooldown must be a non-negative integer, got {ability_dict['cooldown']}")
+    
+    for effect in ability_dict["effects"]:
+        if effect.get("type") not in EFFECT_TYPES:
+            raise InvalidDataFormatError(f"Invalid effect type: {effect.get('type')}")
+        if effect.get("target") not in EFFECT_TARGETS:
+            raise InvalidDataFormatError(f"Invalid effect target: {effect.get('target')}")
+        if not isinstance(effect.get("turns"), int) or effect["turns"] <= 0:
+            raise InvalidDataFormatError(f"Effect turns must be a positive integer, got {effect.get('turns')}")
+        if not isinstance(effect.get("amount"), int):
+            raise InvalidDataFormatError(f"Effect amount must be an integer, got {effect.get('amount')}")
+        if effect["type"] == "buff" and effect.get("stat") not in BUFF_STATS:
+            raise InvalidDataFormatError(f"Invalid buff stat: {effect.get('stat')}")
+    
+    return True
+
+def validate_policy_data(strategy, table):
+    """
+    Validate an enemy AI policy table
+    
+    Returns: True if valid
+    Raises: InvalidDataFormatError if the strategy is unknown, a band is
+            missing or an action is not allowed for the strategy
+    """
+    if strategy not in ENEMY_STRATEGIES:
+        raise InvalidDataFormatError(f"Invalid enemy strategy: {strategy}")
+    if len(table) != len(POLICY_HP_BANDS) * 2 or None in table:
+        raise InvalidDataFormatError(f"Policy for {strategy} needs two actions for each of "
+                                     f"{', '.join(f'HP_{band}' for band in POLICY_HP_BANDS)}")
+    for action in table:
+        if action not in STRATEGY_ACTIONS[strategy]:
+            raise InvalidDataFormatError(f"Action '{action}' is not allowed for {strategy} enemies")
+    return True
+
+def validate_loot_data(loot_dict):
+    """
+    Validate a loot table dictionary
+    
+    Required fields: enemy_id, gold_min, gold_max (drop_chance defaults to
+    100, rolls to 1, tiers to DEFAULT_RARITY_WEIGHTS, drops to none)
+    
+    Returns: True if valid
+    Raises: InvalidDataFormatError if missing fields or invalid values
+    """
+    loot_dict.setdefault("drop_chance", 100)
+    loot_dict.setdefault("rolls", 1)
+    loot_dict.setdefault("tiers", dict(DEFAULT_RARITY_WEIGHTS))
+    loot_dict.setdefault("drops", [])
+    for key in ["enemy_id", "gold_min", "gold_max"]:
+        if key not in loot_dict:
+            raise InvalidDataFormatError(f"Missing required loot field: {key}")
+    
+    if not 0 <= loot_dict["gold_min"] <= loot_dict["gold_max"]:
+        raise InvalidDataFormatError(f"Invalid gold range: {loot_dict['gold_min']}-{loot_dict['gold_max']}")
+    if not 0 <= loot_dict["drop_chance"] <= 100:
+        raise InvalidDataFormatError(f"drop_chance must be 0-100, got {loot_dict['drop_chance']}")
+    if loot_dict["rolls"] < 0:
+        raise InvalidDataFormatError(f"rolls cannot be negative, got {loot_dict['rolls']}")
+    
+    for tier, weight in loot_dict["tiers"].items():
+        if tier not in RARITY_TIERS:
+            raise InvalidDataFormatError(f"Invalid rarity tier: {tier}")
+        if weight < 0:
+            raise InvalidDataFormatError(f"Tier weight cannot be negative, got {weight}")
+    for item_id, tier, weight in loot_dict["drops"]:
+        if tier not in loot_dict["tiers"]:
+            raise InvalidDataFormatError(f"Drop {item_id} has unknown rarity tier: {tier}")
+        if weight <= 0:
+            raise InvalidDataFormatError(f"Drop weight must be positive, got {weight}")
+    
+    return True
+
 def create_default_data_files():
     """
     Create default data files if they don't exist
@@ -253,6 +806,11 @@ def create_default_data_files():
     data_dir = "data"
     quests_file = os.path.join(data_dir, "quests.txt")
     items_file = os.path.join(data_dir, "items.txt")
+    classes_file = os.path.join(data_dir, "classes.txt")
+    enemies_file = os.path.join(data_dir, "enemies.txt")
+    abilities_file = os.path.join(data_dir, "abilities.txt")
+    policies_file = os.path.join(data_dir, "enemy_policies.txt")
+    loot_file = os.path.join(data_dir, "loot.txt")
     
     try:
         # Create data directory if it doesn't exist
@@ -300,6 +858,37 @@ COST: 25
 DESCRIPTION: Restores 20 HP.
 """
                 )
+        
+        # Create default classes.txt
+        if not os.path.exists(classes_file):
+            with open(classes_file, "w") as f:
+                blocks = []
+                for class_data in DEFAULT_CLASS_PROGRESSION.values():
+                    lines = [f"CLASS: {class_data['class']}"]
+                    for key in CLASS_NUMERIC_FIELDS:
+                        lines.append(f"{key.upper()}: {class_data[key]}")
+                    blocks.append("\n".join(lines) + "\n")
+                f.write("\n".join(blocks))
+        
+        # Create default enemies.txt
+        if not os.path.exists(enemies_file):
+            with open(enemies_file, "w") as f:
+                f.write(format_enemy_blocks(DEFAULT_ENEMIES.values()))
+        
+        # Create default abilities.txt
+        if not os.path.exists(abilities_file):
+            with open(abilities_file, "w") as f:
+                f.write(format_ability_blocks(DEFAULT_ABILITIES.values()))
+        
+        # Create default enemy_policies.txt
+        if not os.path.exists(policies_file):
+            with open(policies_file, "w") as f:
+                f.write(format_policy_blocks(DEFAULT_ENEMY_POLICIES))
+        
+        # Create default loot.txt
+        if not os.path.exists(loot_file):
+            with open(loot_file, "w") as f:
+                f.write(format_loot_blocks(DEFAULT_LOOT_TABLES.values()))
     
     except PermissionError as e:
         raise CorruptedDataError("Cannot create data files due to permission error: " + str(e))
@@ -310,6 +899,273 @@ DESCRIPTION: Restores 20 HP.
 # HELPER FUNCTIONS
 # ============================================================================
 
+def read_data_blocks(filename, kind):
+    """
+    Read a data file into blocks of "KEY: value" lines
+    
+    Blocks are separated by blank lines; lines starting with '#' are comments.
+    
+    Args:
+        filename: Data file to read
+        kind: What the file holds, used in error messages (e.g. "Class")
+    
+    Returns: List of blocks, each a list of lines
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        raise MissingDataFileError(f"{kind} file not found: {filename}")
+    except Exception as e:
+        raise CorruptedDataError(f"Unable to read {kind.lower()} file: {e}")
+    
+    blocks = []
+    block = []
+    for line in lines:
+        cleaned = line.strip()
+        if cleaned == "":
+            if block:
+                blocks.append(block)
+                block = []
+            continue
+        if cleaned.startswith("#"):
+            continue
+        if ": " not in cleaned:
+            raise InvalidDataFormatError(f"Line missing ': ': {line}")
+        block.append(cleaned)
+    
+    if block:
+        blocks.append(block)
+    return blocks
+
+def parse_class_block(lines):
+    """
+    Parse a block of lines into a class progression dictionary
+    
+    Returns: Dictionary with class data
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    class_data = {}
+    for line in lines:
+        key, value = line.split(": ", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        
+        if key in CLASS_NUMERIC_FIELDS:
+            try:
+                value = int(value)
+            except ValueError:
+                raise InvalidDataFormatError(f"Invalid number for {key}: {value}")
+        
+        class_data[key] = value
+    return class_data
+
+def parse_enemy_block(lines):
+    """
+    Parse a block of lines into an enemy dictionary
+    
+    Returns: Dictionary with enemy data
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    enemy_data = {}
+    for line in lines:
+        key, value = line.split(": ", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        
+        if key == "max_level" and value.upper() == "NONE":
+            value = None
+        elif key in ENEMY_NUMERIC_FIELDS:
+            try:
+                value = int(value)
+            except ValueError:
+                raise InvalidDataFormatError(f"Invalid number for {key}: {value}")
+        
+        enemy_data[key] = value
+    return enemy_data
+
+def parse_ability_block(lines):
+    """
+    Parse a block of lines into an ability dictionary
+    
+    Returns: Dictionary with ability data ('effects' is a list of effect dictionaries)
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    ability_data = {"effects": []}
+    for line in lines:
+        key, value = line.split(": ", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        
+        if key == "cooldown":
+            try:
+                value = int(value)
+            except ValueError:
+                raise InvalidDataFormatError(f"Invalid number for {key}: {value}")
+        elif key == "effect":
+            ability_data["effects"].append(parse_effect(value))
+            continue
+        
+        ability_data[key] = value
+    return ability_data
+
+def parse_effect(text):
+    """
+    Parse an EFFECT value such as "poison target=enemy turns=3 amount=5"
+    
+    Returns: Effect dictionary {'type', 'target', 'turns', 'amount', 'stat'}
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    parts = text.split()
+    if not parts:
+        raise InvalidDataFormatError("Empty effect")
+    effect = {"type": parts[0].lower(), "target": "enemy", "turns": 1, "amount": 0, "stat": None}
+    for part in parts[1:]:
+        if "=" not in part:
+            raise InvalidDataFormatError(f"Effect setting missing '=': {part}")
+        key, value = part.split("=", 1)
+        key = key.lower()
+        if key not in effect or key == "type":
+            raise InvalidDataFormatError(f"Unknown effect setting: {key}")
+        if key in ["turns", "amount"]:
+            try:
+                value = int(value)
+            except ValueError:
+                raise InvalidDataFormatError(f"Invalid number for {key}: {value}")
+        else:
+            value = value.lower()
+        effect[key] = value
+    return effect
+
+def format_ability_blocks(abilities):
+    """
+    Format ability dictionaries in the abilities.txt block format
+    
+    Returns: String of blocks separated by blank lines
+    """
+    blocks = []
+    for ability in abilities:
+        lines = [f"ABILITY_ID: {ability['ability_id']}", f"CLASS: {ability['class']}",
+                 f"NAME: {ability['name']}", f"COOLDOWN: {ability['cooldown']}"]
+        for effect in ability["effects"]:
+            settings = [effect["type"], f"target={effect['target']}", f"turns={effect['turns']}",
+                        f"amount={effect['amount']}"]
+            if effect.get("stat"):
+                settings.append(f"stat={effect['stat']}")
+            lines.append(f"EFFECT: {' '.join(settings)}")
+        blocks.append("\n".join(lines) + "\n")
+    return "\n".join(blocks)
+
+def parse_policy_block(lines):
+    """
+    Parse a block of lines into a strategy and its policy table
+    
+    Returns: Tuple of (strategy, table); bands missing from the block are None in the table
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    strategy = None
+    table = [None] * (len(POLICY_HP_BANDS) * 2)
+    for line in lines:
+        key, value = line.split(": ", 1)
+        key = key.strip().upper()
+        value = value.strip()
+        
+        if key == "STRATEGY":
+            strategy = value.lower()
+            continue
+        band = key[len("HP_"):] if key.startswith("HP_") else ""
+        if not band.isdigit() or int(band) not in POLICY_HP_BANDS:
+            raise InvalidDataFormatError(f"Unknown policy field: {key}")
+        actions = value.lower().split()
+        if len(actions) != 2:
+            raise InvalidDataFormatError(f"{key} needs two actions (ability ready, cooling down), got: {value}")
+        position = POLICY_HP_BANDS.index(int(band)) * 2
+        table[position:position + 2] = actions
+    
+    if strategy is None:
+        raise InvalidDataFormatError("Missing required policy field: STRATEGY")
+    return strategy, table
+
+def format_policy_blocks(policies):
+    """
+    Format policy tables in the enemy_policies.txt block format
+    
+    Returns: String of blocks separated by blank lines
+    """
+    blocks = []
+    for strategy, table in policies.items():
+        lines = [f"STRATEGY: {strategy}"]
+        for position, band in enumerate(POLICY_HP_BANDS):
+            lines.append(f"HP_{band}: {table[position * 2]} {table[position * 2 + 1]}")
+        blocks.append("\n".join(lines) + "\n")
+    return "\n".join(blocks)
+
+def parse_loot_block(lines):
+    """
+    Parse a block of lines into a loot table dictionary
+    
+    Returns: Dictionary with loot data ('tiers' {tier: weight}, 'drops'
+             [(item_id, tier, weight)])
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    loot_data = {"drops": []}
+    for line in lines:
+        key, value = line.split(": ", 1)
+        key = key.strip().lower()
+        parts = value.split()
+        
+        try:
+            if key == "gold":
+                low, _, high = value.partition("-")
+                loot_data["gold_min"] = int(low)
+                loot_data["gold_max"] = int(high) if high else int(low)
+            elif key in ["drop_chance", "rolls"]:
+                loot_data[key] = int(value)
+            elif key == "tier" and len(parts) == 2:
+                loot_data.setdefault("tiers", {})[parts[0].lower()] = int(parts[1])
+            elif key == "drop" and len(parts) == 3:
+                loot_data["drops"].append((parts[0], parts[1].lower(), int(parts[2])))
+            elif key == "enemy_id":
+                loot_data[key] = value.strip().lower()
+            else:
+                raise InvalidDataFormatError(f"Invalid loot line: {line}")
+        except ValueError:
+            raise InvalidDataFormatError(f"Invalid number in loot line: {line}")
+    return loot_data
+
+def format_loot_blocks(tables):
+    """
+    Format loot table dictionaries in the loot.txt block format
+    
+    Returns: String of blocks separated by blank lines
+    """
+    blocks = []
+    for table in tables:
+        lines = [f"ENEMY_ID: {table['enemy_id']}", f"GOLD: {table['gold_min']}-{table['gold_max']}",
+                 f"DROP_CHANCE: {table['drop_chance']}", f"ROLLS: {table['rolls']}"]
+        lines += [f"TIER: {tier} {weight}" for tier, weight in table["tiers"].items()]
+        lines += [f"DROP: {item_id} {tier} {weight}" for item_id, tier, weight in table["drops"]]
+        blocks.append("\n".join(lines) + "\n")
+    return "\n".join(blocks)
+
+def format_enemy_blocks(enemies):
+    """
+    Format enemy dictionaries in the enemies.txt block format
+    
+    Returns: String of blocks separated by blank lines
+    """
+    blocks = []
+    for enemy in enemies:
+        lines = [f"ENEMY_ID: {enemy['enemy_id']}", f"NAME: {enemy['name']}"]
+        for key in ENEMY_NUMERIC_FIELDS:
+            value = enemy.get(key, 1 if key == "weight" else None)
+            lines.append(f"{key.upper()}: {'NONE' if value is None else value}")
+        if enemy.get("strategy"):
+            lines.append(f"STRATEGY: {enemy['strategy']}")
+        blocks.append("\n".join(lines) + "\n")
+    return "\n".join(blocks)
+
 def parse_quest_block(lines):
     """
     Parse a block of lines into a quest dictionary
@@ -0,0 +1,374 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Group Battle Module
+
+Name: Devane, Lemanuel
+
+This module runs battles between a party of characters and a group of
+enemies. Turn order comes from an initiative queue (a heap keyed by when each
+combatant next acts), and targets come from per-side pools that answer
+"first", "weakest" and "random" queries without scanning every combatant.
+"""
+
+import heapq
+import random
+import combat_system
+import combat_output
+import reward_pipeline
+from effect_scheduler import EffectScheduler, consume_stun
+import character_manager
+from character_manager import is_character_dead
+from custom_exceptions import CharacterDeadError, AbilityOnCooldownError
+
+# Initiative ticks in one round; a combatant acts every TICKS_PER_ROUND // speed ticks
+TICKS_PER_ROUND = 1000
+DEFAULT_SPEED = 10
+
+# Safety limit on actions in one battle
+MAX_ACTIONS = 100000
+
+TARGET_POLICIES = ["first", "weakest", "random"]
+
+# ============================================================================
+# TARGET POOLS
+# ============================================================================
+
+class TargetPool:
+    """
+    The living combatants on one side of a group battle
+
+    Living members are kept in a list with swap-removal (for random picks)
+    and in two heaps, by position and by health, with lazy deletion: stale
+    heap entries are skipped when they reach the top, so every query and
+    update is O(log n).
+    """
+
+    def __init__(self, combatants):
+        self.combatants = combatants
+        self.living = []
+        self.position = {}
+        self.by_index = []
+        self.by_health = []
+        for index, combatant in enumerate(combatants):
+            if combatant['health'] > 0:
+                self.position[index] = len(self.living)
+                self.living.append(index)
+                self.by_index.append(index)
+                self.by_health.append((combatant['health'], index))
+        heapq.heapify(self.by_index)
+        heapq.heapify(self.by_health)
+
+    def __len__(self):
+        return len(self.living)
+
+    def is_alive(self, index):
+        return index in self.position
+
+    def update(self, index):
+        """Record a member's new health, removing them if they died"""
+        if index not in self.position:
+            return
+        health = self.combatants[index]['health']
+        if health <= 0:
+            # Swap the last living member into the dead member's slot
+            slot = self.position.pop(index)
+            last = self.living.pop()
+            if last != index:
+                self.living[slot] = last
+                self.position[last] = slot
+        else:
+            heapq.heappush(self.by_health, (health, index))
+
+    def first(self):
+        """Living member with the lowest position, or None"""
+        while self.by_index and self.by_index[0] not in self.position:
+            heapq.heappop(self.by_index)
+        return self.by_index[0] if self.by_index else None
+
+    def weakest(self):
+        """Living member with the least health (lowest position on ties), or None"""
+        while self.by_health:
+            health, index = self.by_health[0]
+            if index in self.position and self.combatants[index]['health'] == health:
+                return index
+            heapq.heappop(self.by_health)
+        return None
+
+    def random(self, rng):
+        """Random living member, or None"""
+        if not self.living:
+            return None
+        return self.living[int(rng.random() * len(self.living))]
+
+    def pick(self, policy, rng):
+        """
+        Pick a target by policy name
+
+        Raises: ValueError if policy is not recognized
+        """
+        if policy == "first":
+            return self.first()
+        if policy == "weakest":
+            return self.weakest()
+        if policy == "random":
+            return self.random(rng)
+        raise ValueError(f"Unknown target policy '{policy}'. Must be one of: {', '.join(TARGET_POLICIES)}")
+
+# ============================================================================
+# GROUP BATTLE
+# ============================================================================
+
+class GroupBattle(combat_system.SimpleBattle):
+    """
+    Turn-based combat between a party of characters and a group of enemies
+
+    Each combatant acts when their initiative comes up: every action pushes
+    them back TICKS_PER_ROUND // speed ticks (speed comes from an optional
+    'speed' key, default DEFAULT_SPEED), with the party acting first on ties.
+    Characters pick an action with a policy (battle, character) -> "attack"
+    or "special" and a target with party_targets; enemies always attack a
+    target chosen by enemy_targets.
+
+    Damage and ability rules are SimpleBattle's: calculate_damage,
+    apply_damage and the special ability functions. Each character has an
+    EffectScheduler advanced after their own turns, so cooldowns and the
+    effects they cause count the caster's turns; stuns are shared and make
+    the target skip its next turns.
+    """
+
+    def __init__(self, characters, enemies, policy=None, party_targets="weakest", enemy_targets="random",
+                 sink=None, rng=None, verbosity=None, rewards=None):
+        """
+        Initialize battle with a party and a group of enemies
+
+        Args:
+            characters: List of character dictionaries
+            enemies: List of enemy dictionaries
+            policy: Character action callable (default: special when ready)
+            party_targets: Target policy for characters ("first", "weakest" or "random")
+            enemy_targets: Target policy for enemies
+            sink: Event callable (default: no output)
+            rng: Random generator with a random() method (default: the random module)
+            verbosity: "silent", "summary" or "full" (default: "full" with a sink, else "silent")
+            rewards: reward_pipeline.RewardQueue to queue the survivors' rewards on
+                     (default: apply them when the battle ends)
+        
+        Raises: ValueError if a target policy or verbosity is not recognized
+        """
+        for target_policy in (party_targets, enemy_targets):
+            if target_policy not in TARGET_POLICIES:
+                raise ValueError(f"Unknown target policy '{target_policy}'. "
+                                 f"Must be one of: {', '.join(TARGET_POLICIES)}")
+
+        self.characters = characters
+        self.enemies = enemies
+        self.policy = policy if policy is not None else group_special_when_ready_policy
+        self.party_targets = party_targets
+        self.enemy_targets = enemy_targets
+        if verbosity is None:
+            verbosity = "full" if sink is not None else "silent"
+        combat_output.check_verbosity(verbosity)
+        self.verbosity = verbosity
+        self.sink = sink if verbosity != "silent" else None
+        self.log_turns = self.sink is not None and verbosity == "full"
+        self.rng = rng if rng is not None else random
+        self.rewards = rewards
+        self.battle_log = None
+        self.combat_active = True
+        self.turns = 0
+        self.actions = 0
+
+    def start_battle(self):
+        """
+        Run the battle until one side is defeated
+
+        Survivors share the rewards of every defeated enemy: each gets an
+        equal share of the XP and gold (rounded down).
+
+        Returns: Dictionary with battle results:
+                {'winner': 'party'|'enemies'|None, 'actions': int,
+                 'xp_gained': int, 'gold_gained': int (per survivor),
+                 'survivors': [character names], 'enemies_left': int}
+                winner is None if MAX_ACTIONS ran out
+        Raises: CharacterDeadError if every character is already dead
+        """
+        for character in self.characters:
+            character.setdefault('experience', 0)
+            character.setdefault('gold', 0)
+            character.setdefault('cooldowns', {})
+        if all(is_character_dead(character) for character in self.characters):
+            raise CharacterDeadError("Every character in the party is already dead!")
+
+        self.party = TargetPool(self.characters)
+        self.foes = TargetPool(self.enemies)
+        # Status counts are shared so any character's stun or poison shows on its target
+        self.statuses = {}
+        self.positions = {id(character): (0, index) for index, character in enumerate(self.characters)}
+        self.positions.update({id(enemy): (1, index) for index, enemy in enumerate(self.enemies)})
+        self.schedulers = {}
+        for index in self.party.living:
+            scheduler = EffectScheduler(self.effect_damage, self.statuses)
+            scheduler.track_cooldowns(self.characters[index])
+            self.schedulers[index] = scheduler
+        self.display_battle_log(f"Battle started: {len(self.party)} heroes against {len(self.foes)} enemies!",
+                                summary=True)
+
+        # Initiative queue entries: (next action tick, side, position); side 0
+        # (the party) acts before side 1 (enemies) on the same tick
+        queue = [(0, 0, index) for index in self.party.living]
+        queue += [(0, 1, index) for index in self.foes.living]
+        heapq.heapify(queue)
+
+        winner = None
+        while queue and self.actions < MAX_ACTIONS:
+            tick, side, index = heapq.heappop(queue)
+            own, combatants = (self.party, self.characters) if side == 0 else (self.foes, self.enemies)
+            if not own.is_alive(index):
+                continue
+
+            self.actions += 1
+            if self.log_turns:
+                self.sink({"type": "turn", "turn": self.actions})
+            if side == 0:
+                self.character_turn(index)
+            else:
+                self.group_enemy_turn(index)
+
+            winner = self.check_battle_end()
+            if winner:
+                break
+            speed = max(combatants[index].get('speed', DEFAULT_SPEED), 1)
+            heapq.heappush(queue, (tick + max(TICKS_PER_ROUND // speed, 1), side, index))
+        self.combat_active = False
+        for scheduler in self.schedulers.values():
+            scheduler.settle()
+
+        defeated = [enemy for enemy in self.enemies if enemy['health'] <= 0]
+        survivors = [self.characters[index] for index in sorted(self.party.living)]
+        xp_share = gold_share = 0
+        level_ups = []
+        if survivors:
+            xp_share = sum(enemy['xp_reward'] for enemy in defeated) // len(survivors)
+            gold_share = sum(enemy['gold_reward'] for enemy in defeated) // len(survivors)
+            rewards = self.rewards if self.rewards is not None else reward_pipeline.RewardQueue()
+            for character in survivors:
+                rewards.grant(character, xp_share, gold_share)
+            if self.rewards is None:
+                for summary in rewards.apply():
+                    level_ups.append(summary['level_up'])
+
+        if winner == "party":
+            self.display_battle_log(f"The party won! Each survivor gained {xp_share} XP and {gold_share} gold.",
+                                    summary=True)
+        elif winner == "enemies":
+            self.display_battle_log("The party was defeated...", summary=True)
+        if self.sink is not None:
+            for level_up in level_ups:
+                message = character_manager.format_level_up_message(level_up)
+                if message:
+                    self.display_battle_log(message, summary=True)
+        if self.sink is not None:
+            self.sink({"type": "end", "winner": winner, "turns": self.actions})
+        return {'winner': winner, 'actions': self.actions, 'xp_gained': xp_share, 'gold_gained': gold_share,
+                'survivors': [character['name'] for character in survivors], 'enemies_left': len(self.foes)}
+
+    def character_turn(self, index):
+        """Let one character act against a target from the enemy group"""
+        character = self.characters[index]
+        scheduler = self.schedulers[index]
+        target = self.foes.pick(self.party_targets, self.rng)
+        enemy = self.enemies[target]
+
+        if scheduler.consume_stun(character):
+            choice = "stunned"
+            if self.log_turns:
+                self.display_battle_log(f"{character['name']} is stunned and cannot act!")
+        else:
+            choice = self.policy(self, character)
+            choice = combat_system.PLAYER_ACTIONS.get(choice, choice)
+        if choice == "stunned":
+            pass
+        elif choice == "special":
+            try:
+                self.display_battle_log(combat_system.use_special_ability(character, enemy, self.rng, scheduler))
+            except AbilityOnCooldownError as e:
+                if self.log_turns:
+                    self.display_battle_log(f"{e} Turn skipped.")
+            # Abilities can heal the user as well as hurt the target
+            self.party.update(index)
+        else:
+            damage = self.calculate_damage(character, enemy)
+            self.apply_damage(enemy, damage)
+        self.foes.update(target)
+
+        for message in scheduler.advance():
+            self.display_battle_log(message)
+
+    def group_enemy_turn(self, index):
+        """Let one enemy attack a target from the party"""
+        enemy = self.enemies[index]
+        if consume_stun(self.statuses, enemy):
+            if self.log_turns:
+                self.display_battle_log(f"{enemy['name']} is stunned and cannot act!")
+            return
+        target = self.party.pick(self.enemy_targets, self.rng)
+        character = self.characters[target]
+        damage = self.calculate_damage(enemy, character)
+        self.apply_damage(character, damage)
+        self.party.update(target)
+
+    def effect_damage(self, target, damage):
+        """Apply poison damage and keep the target's side up to date"""
+        self.apply_damage(target, damage)
+        side, index = self.positions[id(target)]
+        (self.party if side == 0 else self.foes).update(index)
+
+    def check_battle_end(self):
+        """
+        Check if battle is over
+
+        Returns: 'party' if every enemy is dead, 'enemies' if every character
+                 is dead, None if ongoing
+        """
+        if not self.foes:
+            return 'party'
+        if not self.party:
+            return 'enemies'
+        return None
+
+# ============================================================================
+# CHARACTER POLICIES
+# ============================================================================
+
+def group_attack_policy(battle, character):
+    """Always use a basic attack"""
+    return "attack"
+
+def group_special_when_ready_policy(battle, character):
+    """Use the special ability whenever it is off cooldown, otherwise attack"""
+    if character['cooldowns'].get('special', 0) > 0:
+        return "attack"
+    return "special"
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    import time
+    from battle_simulator import build_character
+
+    print("=== GROUP BATTLE TEST ===")
+
+    classes = ["Warrior", "Mage", "Rogue", "Cleric"]
+    party = [build_character(classes[index % 4], 8) for index in range(40)]
+    for index, character in enumerate(party):
+        character['name'] = f"Hero {index + 1}"
+    horde = [combat_system.create_enemy("orc") for _ in range(100)]
+
+    start = time.perf_counter()
+    battle = GroupBattle(party, horde, rng=random.Random(1))
+    result = battle.start_battle()
+    elapsed = time.perf_counter() - start
+    print(f"Winner: {result['winner']} after {result['actions']} actions in {elapsed * 1000:.1f} ms")
+    print(f"{len(result['survivors'])} survivors, {result['enemies_left']} enemies left")
@@ -0,0 +1,249 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Loot System Module
+
+Name: Devane, Lemanuel
+
+This module rolls the loot enemies drop on defeat. Each enemy's table from
+data/loot.txt (drop chance, rarity tiers and weighted items) is flattened
+into one alias table (Walker's alias method), so a roll costs one random
+number and one lookup however many items the table has.
+"""
+
+import random
+import game_data
+from custom_exceptions import MissingDataFileError
+
+# NumPy is optional: with it, draw_many is vectorized; without it each
+# draw is made in a loop using the same table
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Built loot tables by lowercase enemy id, from data/loot.txt
+loot_tables = None
+
+# ============================================================================
+# ALIAS TABLES
+# ============================================================================
+
+class AliasTable:
+    """
+    Weighted random choice in O(1) per draw (Walker's alias method)
+
+    The weights are spread over n equal columns; column i keeps its own
+    outcome with probability prob[i] and hands the rest to alias[i]. A draw
+    picks a column and a side of it from a single uniform number. Built in
+    O(n) with Vose's worklist algorithm.
+    """
+
+    def __init__(self, outcomes, weights):
+        """
+        Build the table
+
+        Args:
+            outcomes: List of outcomes
+            weights: Matching list of non-negative weights (any total)
+
+        Raises: ValueError if the lists differ in length, a weight is
+                negative, or no weight is positive
+        """
+        if len(outcomes) != len(weights):
+            raise ValueError("outcomes and weights must be the same length")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("Weights cannot be negative")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("At least one weight must be positive")
+
+        n = len(weights)
+        self.outcomes = list(outcomes)
+        self.n = n
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # Anything left over is 1.0 up to rounding error and keeps prob 1.0
+
+        self.arrays = None
+
+    def __len__(self):
+        return self.n
+
+    def draw_index(self, rng=None):
+        """
+        Draw one outcome's index
+
+        Args:
+            rng: Anything with a random() method (default: the random module)
+
+        Returns: Index into outcomes
+        """
+        if rng is None:
+            rng = random
+        u = rng.random() * self.n
+        column = int(u)
+        if column >= self.n:
+            column = self.n - 1
+        return column if u - column < self.prob[column] else self.alias[column]
+
+    def draw(self, rng=None):
+        """Draw one outcome (see draw_index)"""
+        return self.outcomes[self.draw_index(rng)]
+
+    def draw_indices(self, count, rng=None):
+        """
+        Draw many outcome indices at once
+
+        Args:
+            count: Number of draws
+            rng: NumPy Generator (random.Random without NumPy; default: new unseeded one)
+
+        Returns: NumPy int array of indices (list without NumPy)
+        """
+        if np is None:
+            if rng is None:
+                rng = random.Random()
+            return [self.draw_index(rng) for _ in range(count)]
+        if rng is None:
+            rng = np.random.default_rng()
+        if self.arrays is None:
+            self.arrays = (np.array(self.prob), np.array(self.alias))
+        prob, alias = self.arrays
+        u = rng.random(count) * self.n
+        columns = np.minimum(u.astype(np.int64), self.n - 1)
+        return np.where(u - columns < prob[columns], columns, alias[columns])
+
+    def draw_many(self, count, rng=None):
+        """
+        Draw many outcomes at once (see draw_indices)
+
+        Returns: List of outcomes
+        """
+        outcomes = self.outcomes
+        return [outcomes[index] for index in self.draw_indices(count, rng)]
+
+# ============================================================================
+# LOOT TABLES
+# ============================================================================
+
+def build_loot_table(loot_data):
+    """
+    Flatten a loot table into an alias table over drops
+
+    A roll misses with probability 100 - drop_chance percent; otherwise a
+    rarity tier is picked by tier weight and an item within it by item
+    weight. Tiers with no items are left out and the others share their
+    weight.
+
+    Args:
+        loot_data: Loot table dictionary (see game_data.load_loot_tables)
+
+    Returns: Dictionary with enemy_id, gold_min, gold_max, rolls and
+             'drops' (AliasTable over (item_id, tier) pairs, None for a miss)
+    """
+    tier_totals = {}
+    for item_id, tier, weight in loot_data["drops"]:
+        tier_totals[tier] = tier_totals.get(tier, 0) + weight
+    tier_weight = sum(loot_data["tiers"].get(tier, 0) for tier in tier_totals)
+
+    outcomes = [None]
+    weights = [100 - loot_data["drop_chance"]]
+    if tier_weight > 0:
+        for item_id, tier, weight in loot_data["drops"]:
+            outcomes.append((item_id, tier))
+            weights.append(loot_data["drop_chance"] * loot_data["tiers"].get(tier, 0) / tier_weight
+                           * weight / tier_totals[tier])
+    if sum(weights) <= 0:
+        # 100% drop chance but nothing droppable: every roll misses
+        weights[0] = 1
+
+    return {"enemy_id": loot_data["enemy_id"], "gold_min": loot_data["gold_min"],
+            "gold_max": loot_data["gold_max"], "rolls": loot_data["rolls"],
+            "drops": AliasTable(outcomes, weights)}
+
+def get_loot_tables():
+    """
+    Get the built loot tables, loading data/loot.txt on first use
+
+    Falls back to game_data.DEFAULT_LOOT_TABLES if the file is missing.
+
+    Returns: Dictionary {lowercase enemy id: built table} (see build_loot_table)
+    """
+    global loot_tables
+    if loot_tables is None:
+        try:
+            tables = game_data.load_loot_tables()
+        except MissingDataFileError:
+            tables = game_data.DEFAULT_LOOT_TABLES
+        set_loot_tables(tables)
+    return loot_tables
+
+def set_loot_tables(tables):
+    """
+    Replace the loot tables, e.g. with a rebalanced file
+
+    Args:
+        tables: Dictionary {enemy_id: loot data} (see game_data.load_loot_tables)
+    """
+    global loot_tables
+    loot_tables = {enemy_id.lower(): build_loot_table(data) for enemy_id, data in tables.items()}
+
+def get_enemy_loot(enemy):
+    """
+    Get the built loot table for an enemy
+
+    Returns: Built table, or None if the enemy has no loot table
+    """
+    enemy_id = enemy.get('enemy_id')
+    if enemy_id is None:
+        return None
+    return get_loot_tables().get(enemy_id.lower())
+
+# ============================================================================
+# DROPS
+# ============================================================================
+
+def roll_loot(enemy, rng=None):
+    """
+    Roll what a defeated enemy drops
+
+    Uses one random number for the bonus gold (if the range is not a single
+    value) and one per roll of the table.
+
+    Args:
+        enemy: Enemy dictionary
+        rng: Anything with a random() method (default: the random module)
+
+    Returns: Dictionary with 'gold' (bonus gold on top of the enemy's
+             gold_reward) and 'items' (list of (item_id, tier) pairs)
+    """
+    table = get_enemy_loot(enemy)
+    if table is None:
+        return {'gold': 0, 'items': []}
+    if rng is None:
+        rng = random
+
+    gold = table["gold_min"]
+    span = table["gold_max"] - table["gold_min"]
+    if span > 0:
+        gold += min(int(rng.random() * (span + 1)), span)
+
+    drops = table["drops"]
+    items = []
+    for _ in range(table["rolls"]):
+        drop = drops.draw(rng)
+        if drop is not None:
+            items.append(drop)
+    return {'gold': gold, 'items': items}
@@ -16,6 +16,7 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import reward_pipeline
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
@@ -103,17 +104,18 @@ def load_game():
     print("\n=== LOAD SAVED GAME ===")
     
     try:
-        saved_list = character_manager.list_saved_characters()
+        # Summaries come from the save index, so no save file is opened here
+        saved_list = character_manager.list_saved_character_summaries()
         if not saved_list:
             print("No saved characters found.")
             return
         print("Saved characters:")
-        for i, name in enumerate(saved_list, start=1):
-            print(f"{i}. {name}")
+        for i, summary in enumerate(saved_list, start=1):
+            print(f"{i}. {summary['name']} (Level {summary['level']} {summary['class']})")
         
         choice = input("Select a character to load: ").strip()
         index = int(choice) - 1
-        selected_name = saved_list[index]
+        selected_name = saved_list[index]['name']
         current_character = character_manager.load_character(selected_name)
 
         current_character.setdefault('level', 1) #ensures character loads at at least level 1
@@ -279,7 +281,11 @@ def quest_menu():
                 quest_handler.abandon_quest(current_character, quest_id)
             elif choice == "6":
                 quest_id = input("Enter quest ID to complete: ").strip()
-                quest_handler.complete_quest(current_character, quest_id)
+                rewards = quest_handler.complete_quest(current_character, quest_id, all_quests)
+                print(f"Quest complete! Gained {rewards['xp_gained']} XP and {rewards['gold_gained']} gold.")
+                level_message = character_manager.format_level_up_message(rewards['level_up'])
+                if level_message:
+                    print(level_message)
             elif choice == "7":
                 break
             else:
@@ -296,11 +302,23 @@ def explore():
     try:
         enemy = combat_system.generate_enemy(current_character)
         print(f"A wild {enemy['name']} appears!")
-        result = combat_system.SimpleBattle(current_character, enemy)
-        if result == "victory":
+        # Fights the character can't realistically lose are settled instantly
+        result = combat_system.auto_resolve_battle(current_character, enemy)
+        if result is not None:
+            print(f"The {enemy['name']} is badly outmatched; the fight is auto-resolved in {result['turns']} turns. "
+                  f"(HP {result['character_health']}/{current_character['max_health']})")
+            if result.get('rewards'):
+                for message in reward_pipeline.format_reward_summary(result['rewards']):
+                    print(message)
+        else:
+            battle = combat_system.SimpleBattle(current_character, enemy)
+            result = battle.start_battle()
+        if result['winner'] == "player":
             print(f"You defeated {enemy['name']}!")
-        elif result == "defeat":
+        elif result['winner'] == "enemy":
             handle_character_death()
+        else:
+            print(f"You escaped from the {enemy['name']}.")
     except Exception as e:
         print(f"Exploration error: {e}")
 
@@ -9,6 +9,7 @@ AI Usage: I used Chatgpt and Google Ai to help me with the structure or the code
 This module handles quest management, dependencies, and completion.
 """
 
+import reward_pipeline
 from custom_exceptions import (
     QuestNotFoundError,
     QuestRequirementsNotMetError,
@@ -64,7 +65,7 @@ def accept_quest(character, quest_id, quest_data_dict):
     character.setdefault('active_quests', []).append(quest_id)
     return True
 
-def complete_quest(character, quest_id, quest_data_dict):
+def complete_quest(character, quest_id, quest_data_dict, rewards=None):
     """
     Complete an active quest and grant rewards
     
@@ -72,15 +73,20 @@ def complete_quest(character, quest_id, quest_data_dict):
         character: Character dictionary
         quest_id: Quest to complete
         quest_data_dict: Dictionary of all quest data
+        rewards: reward_pipeline.RewardQueue to queue the rewards on
+                 (default: apply them now, with level ups)
     
     Rewards:
     - Experience points (reward_xp)
     - Gold (reward_gold)
     
-    Returns: Dictionary with reward information
+    Returns: Dictionary with reward information ('level_up' holds the
+             apply_experience summary, or None if the rewards were queued)
     Raises:
         QuestNotFoundError if quest_id not in quest_data_dict
-        QuestNotActiveError if quest not in active_quests"""
+        QuestNotActiveError if quest not in active_quests
+        CharacterDeadError if the character is dead (rewards applied now only;
+        the quest stays active)"""
     
     character.setdefault('experience', 0)
     character.setdefault('gold', 0)
@@ -91,14 +97,21 @@ def complete_quest(character, quest_id, quest_data_dict):
         raise QuestNotActiveError(f"Quest '{quest_id}' is not active!")
 
     quest = quest_data_dict[quest_id]
+    
+    # Grant rewards first: a dead character can't receive them, and the
+    # quest then stays active instead of completing with its rewards lost
+    level_up = None
+    if rewards is not None:
+        rewards.grant_quest(character, quest)
+    else:
+        level_up = reward_pipeline.apply_reward(character, quest.get('reward_xp', 0),
+                                                quest.get('reward_gold', 0))['level_up']
+    
     character['active_quests'].remove(quest_id)
     character.setdefault('completed_quests', []).append(quest_id)
     
-    # Grant rewards
-    character['experience'] += quest.get('reward_xp', 0)
-    character['gold'] += quest.get('reward_gold', 0)
-    
-    return {'xp_gained': quest.get('reward_xp', 0), 'gold_gained': quest.get('reward_gold', 0)}
+    return {'xp_gained': quest.get('reward_xp', 0), 'gold_gained': quest.get('reward_gold', 0),
+            'level_up': level_up}
 
 def abandon_quest(character, quest_id):
     """
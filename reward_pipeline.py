@@ -0,0 +1,148 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Reward Pipeline Module
+
+Name: Devane, Lemanuel
+
+This module hands out XP, gold and items from battles and quests. Rewards
+are queued per character and applied together through the real progression
+rules (apply_experience, add_gold, add_item_to_inventory), so a run of many
+fights costs one level-up check per character and ends in one summary
+instead of a message per fight.
+"""
+
+import character_manager
+import inventory_system
+from custom_exceptions import CharacterDeadError, InventoryFullError
+
+# ============================================================================
+# REWARD QUEUE
+# ============================================================================
+
+class RewardQueue:
+    """
+    Pending rewards, totalled per character until applied
+
+    grant() only adds to the character's running totals; apply() (or
+    apply_character()) turns each character's totals into a single
+    apply_experience call, a single add_gold call and the item adds.
+    """
+
+    def __init__(self):
+        # id(character) -> [character, xp, gold, items, grants]
+        self.pending = {}
+
+    def __len__(self):
+        """Number of grants waiting to be applied"""
+        return sum(batch[4] for batch in self.pending.values())
+
+    def grant(self, character, xp=0, gold=0, items=()):
+        """
+        Queue a reward for a character
+
+        Args:
+            character: Character dictionary
+            xp: Experience to add
+            gold: Gold to add
+            items: Item ids to add to the inventory
+
+        Raises: ValueError if xp or gold is negative
+        """
+        if xp < 0 or gold < 0:
+            raise ValueError(f"Rewards cannot be negative (xp={xp}, gold={gold})")
+        batch = self.pending.get(id(character))
+        if batch is None:
+            batch = self.pending[id(character)] = [character, 0, 0, [], 0]
+        batch[1] += xp
+        batch[2] += gold
+        batch[3].extend(items)
+        batch[4] += 1
+
+    def grant_quest(self, character, quest):
+        """Queue a quest's reward_xp and reward_gold"""
+        self.grant(character, quest.get('reward_xp', 0), quest.get('reward_gold', 0))
+
+    def apply_character(self, character):
+        """
+        Apply everything queued for one character
+
+        Returns: Summary dictionary:
+                {'name': str, 'grants': int, 'xp': int, 'gold': int,
+                 'items': [item ids added], 'left_behind': [item ids that did not fit],
+                 'level_up': apply_experience summary}
+                or None if nothing was queued for the character
+        Raises: CharacterDeadError if the character is dead (the rewards stay queued)
+        """
+        batch = self.pending.get(id(character))
+        if batch is None:
+            return None
+        if character['health'] <= 0:
+            raise CharacterDeadError(f"{character['name']} is dead and cannot receive rewards!")
+        del self.pending[id(character)]
+        _, xp, gold, items, grants = batch
+
+        character.setdefault('experience', 0)
+        character.setdefault('gold', 0)
+        level_up = character_manager.apply_experience(character, xp)
+        character_manager.add_gold(character, gold)
+        added = []
+        left_behind = []
+        for item_id in items:
+            try:
+                inventory_system.add_item_to_inventory(character, item_id)
+                added.append(item_id)
+            except InventoryFullError:
+                left_behind.append(item_id)
+        return {'name': character['name'], 'grants': grants, 'xp': xp, 'gold': gold,
+                'items': added, 'left_behind': left_behind, 'level_up': level_up}
+
+    def apply(self):
+        """
+        Apply everything queued, one batch per character
+
+        Dead characters are skipped and keep their rewards queued (e.g.
+        until they are revived).
+
+        Returns: List of summaries (see apply_character), in the order the
+                 characters were first granted a reward
+        """
+        summaries = []
+        for batch in list(self.pending.values()):
+            character = batch[0]
+            if character['health'] > 0:
+                summaries.append(self.apply_character(character))
+        return summaries
+
+def apply_reward(character, xp=0, gold=0, items=()):
+    """
+    Grant and immediately apply one reward
+
+    Returns: Summary dictionary (see RewardQueue.apply_character)
+    Raises: CharacterDeadError if the character is dead
+    """
+    queue = RewardQueue()
+    queue.grant(character, xp, gold, items)
+    return queue.apply_character(character)
+
+def format_reward_summary(summary, totals=True):
+    """
+    Turn an applied batch into messages for the player
+
+    Args:
+        summary: Result of RewardQueue.apply_character
+        totals: Start with the XP and gold totals (False when they were already shown)
+
+    Returns: List of message strings (one line each)
+    """
+    messages = []
+    if totals:
+        fights = f" from {summary['grants']} rewards" if summary['grants'] > 1 else ""
+        messages.append(f"{summary['name']} gained {summary['xp']} XP and {summary['gold']} gold{fights}.")
+    if summary['items']:
+        messages.append(f"Found: {', '.join(summary['items'])}")
+    if summary['left_behind']:
+        messages.append(f"Inventory full! Left behind: {', '.join(summary['left_behind'])}")
+    level_message = character_manager.format_level_up_message(summary['level_up'])
+    if level_message:
+        messages.append(level_message)
+    return messages
@@ -0,0 +1,446 @@
+"""
+Test Combat Engine
+Tests enemy spawning and AI, status effects, the batch resolver, auto-resolve, replays and the battle server
+"""
+
+import pytest
+import sys
+import os
+import copy
+import json
+import random
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combat_system
+import battle_resolver
+import game_data
+import battle_server
+import enemy_ai
+from battle_simulator import build_character
+from effect_scheduler import EffectScheduler
+from custom_exceptions import InvalidCharacterClassError, InvalidSaveDataError, InvalidTargetError
+
+WINNER_CODES = {"player": battle_resolver.PLAYER_WON, "enemy": battle_resolver.ENEMY_WON,
+                None: battle_resolver.UNRESOLVED}
+
+def basic_enemy(enemy_type):
+    """Create an enemy without its AI strategy, as the resolver models it"""
+    enemy = combat_system.create_enemy(enemy_type)
+    enemy.pop("strategy", None)
+    return enemy
+
+def matchups(classes):
+    """Characters at several levels and health values against every enemy type"""
+    characters = []
+    enemies = []
+    for character_class in classes:
+        for level in [1, 3, 6, 9]:
+            for enemy_type in ["goblin", "orc", "dragon"]:
+                for health_fraction in [1.0, 0.5, 0.1]:
+                    character = build_character(character_class, level)
+                    character['health'] = max(int(character['max_health'] * health_fraction), 1)
+                    characters.append(character)
+                    enemies.append(basic_enemy(enemy_type))
+    return characters, enemies
+
+# ============================================================================
+# ENEMY CATALOG TESTS
+# ============================================================================
+
+def test_enemies_spawn_by_level_band():
+    """Test that each level spawns the enemy whose band contains it"""
+    rng = random.Random(0)
+    expected = {0: "goblin", 1: "goblin", 2: "goblin", 3: "orc", 5: "orc", 6: "dragon", 40: "dragon"}
+    for level, enemy_id in expected.items():
+        for _ in range(5):
+            assert combat_system.get_random_enemy_for_level(level, rng)['enemy_id'] == enemy_id
+
+def test_level_index_matches_brute_force():
+    """Test that banded weighted picks match scanning every enemy"""
+    enemies = {
+        "rat": {"min_level": 1, "max_level": 4, "weight": 3},
+        "wolf": {"min_level": 3, "max_level": 8, "weight": 1},
+        "bear": {"min_level": 6, "max_level": None, "weight": 2},
+        "ghost": {"min_level": 2, "max_level": 2, "weight": 0},
+        "troll": {"min_level": 12, "max_level": None, "weight": 5}}
+    for enemy_id, enemy in enemies.items():
+        enemy["enemy_id"] = enemy_id
+    index = game_data.build_enemy_level_index(enemies)
+
+    for level in range(0, 16):
+        spawning = [enemy_id for enemy_id, enemy in enemies.items()
+                    if enemy["weight"] > 0 and enemy["min_level"] <= level
+                    and (enemy["max_level"] is None or level <= enemy["max_level"])]
+        band = game_data.get_enemy_band(index, level)
+        if not spawning:
+            assert band is None or not band["enemy_ids"]
+            continue
+        assert sorted(band["enemy_ids"]) == sorted(spawning)
+        total = sum(enemies[enemy_id]["weight"] for enemy_id in spawning)
+        for roll in [0.0, 0.25, 0.5, 0.75, 0.999]:
+            # The pick is the enemy whose share of the total weight contains the roll
+            running = 0
+            for enemy_id in band["enemy_ids"]:
+                running += enemies[enemy_id]["weight"]
+                if roll * total < running:
+                    break
+            assert game_data.pick_enemy_id(band, roll) == enemy_id
+
+def test_create_enemy_returns_a_copy():
+    """Test that damaging a spawned enemy leaves its type's template alone"""
+    enemy = combat_system.create_enemy("Orc")
+    enemy['health'] = 0
+    assert combat_system.create_enemy("orc")['health'] == 80
+    with pytest.raises(InvalidTargetError):
+        combat_system.create_enemy("hydra")
+
+# ============================================================================
+# ENEMY AI TESTS
+# ============================================================================
+
+def test_built_in_enemies_have_no_strategy():
+    """Test that the built-in enemies keep the plain always-attack behaviour"""
+    for enemy_type in ["goblin", "orc", "dragon"]:
+        assert enemy_ai.get_enemy_policy(combat_system.create_enemy(enemy_type)) is None
+
+def test_strategy_enemy_follows_its_policy_table():
+    """Test that an enemy given a STRATEGY acts on its policy table"""
+    plain = combat_system.create_enemy("orc")
+    aggressive = dict(plain, strategy="aggressive")
+    first_action = enemy_ai.choose_action(enemy_ai.get_enemy_policy(aggressive), aggressive)
+    assert first_action == "ability"
+
+    for enemy, expected in [(plain, "attack"), (aggressive, first_action)]:
+        battle = combat_system.SimpleBattle(build_character("Warrior", 6), dict(enemy),
+                                            policy=combat_system.attack_policy,
+                                            headless=True, rng=random.Random(0))
+        battle.start_battle()
+        actions = [event['action'] for event in battle.battle_log if event['actor'] == "enemy"]
+        assert actions[0] == expected
+
+    with pytest.raises(ValueError):
+        enemy_ai.get_enemy_policy(dict(plain, strategy="berserk"))
+
+# ============================================================================
+# EFFECT SCHEDULER TESTS
+# ============================================================================
+
+def test_cooldown_expires_on_its_turn():
+    """Test that a cooldown counts down and is cleared only when it runs out"""
+    effects = EffectScheduler()
+    character = {'name': "Aria", 'cooldowns': {}}
+    effects.set_cooldown(character, 'special', 3)
+    for remaining in [2, 1]:
+        effects.advance()
+        assert effects.remaining(character, 'special') == remaining
+        assert character['cooldowns']['special'] > 0
+    effects.advance()
+    assert character['cooldowns']['special'] == 0
+
+def test_reset_cooldown_outlives_its_old_timer():
+    """Test that a cooldown set again is not cleared by the earlier timer"""
+    effects = EffectScheduler()
+    character = {'name': "Aria", 'cooldowns': {}}
+    effects.set_cooldown(character, 'special', 1)
+    effects.set_cooldown(character, 'special', 3)
+    effects.advance()
+    assert character['cooldowns']['special'] > 0
+    effects.settle()
+    assert character['cooldowns']['special'] == 2
+
+def test_poison_buff_and_stun_run_their_course():
+    """Test that each status effect lasts exactly its number of turns"""
+    effects = EffectScheduler()
+    target = {'name': "Orc", 'health': 20, 'strength': 12}
+    effects.apply_effect(target, {'type': "poison", 'turns': 3, 'amount': 4})
+    effects.apply_effect(target, {'type': "buff", 'turns': 2, 'stat': "strength", 'amount': 5})
+    effects.apply_effect(target, {'type': "stun", 'turns': 1})
+    assert target['strength'] == 17
+
+    assert effects.consume_stun(target) is True
+    assert effects.consume_stun(target) is False
+    for _ in range(4):
+        effects.advance()
+    assert target['health'] == 8
+    assert target['strength'] == 12
+    assert not effects.has_effect(target, "poison")
+    assert not effects.has_effect(target, "buff")
+
+def test_settle_undoes_active_buffs():
+    """Test that a buff still running when the battle ends is taken back"""
+    effects = EffectScheduler()
+    target = {'name': "Aria", 'health': 20, 'magic': 10}
+    effects.apply_effect(target, {'type': "buff", 'turns': 5, 'stat': "magic", 'amount': 4})
+    effects.advance()
+    effects.settle()
+    assert target['magic'] == 10
+    assert not effects.has_effect(target, "buff")
+
+# ============================================================================
+# BATCH RESOLVER TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("policy, player_policy, classes", [
+    ("attack", combat_system.attack_policy, ["Warrior", "Mage", "Rogue", "Cleric"]),
+    ("special", combat_system.special_when_ready_policy, ["Warrior", "Mage", "Cleric"])])
+def test_resolver_matches_simple_battle(policy, player_policy, classes):
+    """Test that batch-resolved battles end exactly like played-out ones"""
+    characters, enemies = matchups(classes)
+    results = battle_resolver.resolve_battles(characters, enemies, policy=policy)
+
+    for i, (character, enemy) in enumerate(zip(characters, enemies)):
+        played = combat_system.SimpleBattle(copy.deepcopy(character), dict(enemy), policy=player_policy,
+                                            headless=True, rng=random.Random(i)).start_battle()
+        resolved = tuple(int(results[field][i]) for field in
+                         ["winner", "turns", "character_health", "enemy_health", "xp_gained"])
+        assert resolved == (WINNER_CODES[played['winner']], played['turns'], played['character_health'],
+                            played['enemy_health'], played['xp_gained'])
+
+def test_resolver_dead_character_loses_at_once():
+    """Test that a character who starts dead loses in 0 turns"""
+    character = build_character("Warrior", 1)
+    character['health'] = 0
+    results = battle_resolver.resolve_battles([character], basic_enemy("goblin"))
+    assert int(results['winner'][0]) == battle_resolver.ENEMY_WON
+    assert int(results['turns'][0]) == 0
+
+@pytest.mark.parametrize("policy", ["attack", "special"])
+def test_resolver_fallback_matches_numpy(policy, monkeypatch):
+    """Test that the loop used without NumPy gives the same results"""
+    if battle_resolver.np is None:
+        pytest.skip("NumPy is not installed")
+    characters, enemies = matchups(["Warrior", "Mage", "Cleric"])
+    vectorized = battle_resolver.resolve_battles(characters, enemies, policy=policy)
+    monkeypatch.setattr(battle_resolver, "np", None)
+    looped = battle_resolver.resolve_battles(characters, enemies, policy=policy)
+    for field, values in looped.items():
+        assert [int(value) for value in vectorized[field]] == list(values)
+
+# ============================================================================
+# AUTO-RESOLVE TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("cooldown", [0, 1, 3, 10])
+def test_auto_resolve_matches_simple_battle(cooldown):
+    """Test that an auto-resolved fight leaves the same state as playing it"""
+    checked = 0
+    characters, enemies = matchups(["Warrior", "Mage", "Rogue", "Cleric"])
+    for i, (character, enemy) in enumerate(zip(characters, enemies)):
+        # A cooldown still running from an earlier battle
+        character['cooldowns']['special'] = cooldown
+        prediction = combat_system.predict_battle(character, enemy)
+        if prediction['win_probability'] < 1.0:
+            continue
+        player_policy = (combat_system.attack_policy if prediction['policy'] == "attack"
+                         else combat_system.special_when_ready_policy)
+
+        played_character, played_enemy = copy.deepcopy(character), dict(enemy)
+        played = combat_system.SimpleBattle(played_character, played_enemy, policy=player_policy,
+                                            headless=True, rng=random.Random(i), record=False).start_battle()
+        resolved_character, resolved_enemy = copy.deepcopy(character), dict(enemy)
+        resolved = combat_system.auto_resolve_battle(resolved_character, resolved_enemy, rng=random.Random(i))
+
+        assert resolved.pop('win_probability') == 1.0
+        assert resolved == played
+        assert resolved_character == played_character
+        assert resolved_enemy == played_enemy
+        checked += 1
+    assert checked > 0
+
+def test_auto_resolve_skips_close_and_strategy_fights():
+    """Test that fights that are not certain wins are left to be played"""
+    weak = build_character("Mage", 1)
+    assert combat_system.auto_resolve_battle(weak, basic_enemy("dragon")) is None
+    assert weak['health'] == weak['max_health']
+
+    strong = build_character("Warrior", 9)
+    assert combat_system.predict_battle(strong, basic_enemy("orc"))['win_probability'] == 1.0
+    assert combat_system.auto_resolve_battle(strong, dict(basic_enemy("orc"), strategy="defensive")) is None
+    assert strong['health'] == strong['max_health']
+
+# ============================================================================
+# REPLAY TESTS
+# ============================================================================
+
+def test_replay_matches_recorded_battle():
+    """Test that a recorded battle replays to the same events and results"""
+    character = build_character("Rogue", 3)
+    enemy = combat_system.create_enemy("orc")
+    battle = combat_system.SimpleBattle(copy.deepcopy(character), dict(enemy),
+                                        policy=combat_system.special_when_ready_policy,
+                                        headless=True, rng=random.Random(7))
+    results = battle.start_battle()
+
+    replayed = combat_system.replay_battle(character, enemy, battle.battle_log.to_bytes())
+    assert replayed.pop('matches') is True
+    # The replay queues its rewards instead of applying them, so it has no summary
+    assert replayed.pop('rewards') is None
+    results.pop('rewards')
+    assert replayed == results
+
+def test_replay_leaves_caller_state_alone():
+    """Test that replaying a won battle pays no rewards to the caller's character"""
+    character = build_character("Warrior", 9)
+    character['inventory'] = ["health_potion"]
+    enemy = combat_system.create_enemy("goblin")
+    battle = combat_system.SimpleBattle(copy.deepcopy(character), dict(enemy), headless=True,
+                                        policy=combat_system.attack_policy, rng=random.Random(3))
+    assert battle.start_battle()['winner'] == "player"
+
+    before = copy.deepcopy(character)
+    assert combat_system.replay_battle(character, enemy, battle.battle_log)['matches'] is True
+    assert character == before
+    assert enemy == combat_system.create_enemy("goblin")
+
+def test_replay_detects_tampered_log():
+    """Test that a log whose rolls were changed no longer matches"""
+    character = build_character("Rogue", 3)
+    enemy = combat_system.create_enemy("orc")
+    battle = combat_system.SimpleBattle(copy.deepcopy(character), dict(enemy),
+                                        policy=combat_system.special_when_ready_policy,
+                                        headless=True, rng=random.Random(7))
+    battle.start_battle()
+
+    battle_log = combat_system.BattleLog(battle.battle_log.events, battle.battle_log.rolls)
+    battle_log.rolls[0] = (battle_log.rolls[0] + 0.5) % 1.0
+    assert combat_system.replay_battle(character, enemy, battle_log)['matches'] is False
+
+    with pytest.raises(ValueError):
+        combat_system.replay_battle(character, enemy, battle.battle_log.to_bytes()[:-1])
+
+def test_battle_log_round_trip():
+    """Test that a battle log survives serialization event for event"""
+    battle = combat_system.SimpleBattle(build_character("Mage", 2), combat_system.create_enemy("goblin"),
+                                        policy=combat_system.special_when_ready_policy,
+                                        headless=True, rng=random.Random(1))
+    battle.start_battle()
+
+    data = battle.battle_log.to_bytes()
+    restored = combat_system.BattleLog.from_bytes(data)
+    assert len(restored) == len(battle.battle_log) > 0
+    assert list(restored) == list(battle.battle_log)
+    assert list(restored.rolls) == list(battle.battle_log.rolls)
+    assert restored.to_bytes() == data
+
+# ============================================================================
+# BATTLE SERVER TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("message, error", [
+    ({"type": "start", "enemy": 5}, InvalidTargetError),
+    ({"type": "start", "enemy": "hydra"}, InvalidTargetError),
+    ({"type": "start", "class": "Bard"}, InvalidCharacterClassError),
+    ({"type": "start", "character": "Aria"}, InvalidSaveDataError),
+    ({"type": "start", "character": {"name": "Aria", "class": "Mage"}}, InvalidSaveDataError),
+    ({"type": "start", "level": "high"}, ValueError)])
+def test_battle_from_message_rejects_malformed_starts(message, error):
+    """Test that bad start messages raise the errors the server reports"""
+    with pytest.raises(error):
+        battle_server.battle_from_message(message)
+
+def test_battle_from_message_checks_client_health():
+    """Test that a client character must have health within its maximum"""
+    character = build_character("Warrior", 2)
+    for health, max_health in [(500, 140), (10, 0), (-5, 140)]:
+        message = {"type": "start", "character": dict(character, health=health, max_health=max_health)}
+        with pytest.raises(InvalidSaveDataError):
+            battle_server.battle_from_message(message)
+
+    character_from_message, enemy = battle_server.battle_from_message(
+        {"type": "start", "character": character, "enemy": "goblin"})
+    assert character_from_message['name'] == character['name']
+    assert enemy['enemy_id'] == "goblin"
+
+async def collect_events(session, action="attack"):
+    """Answer every prompt with action and gather the session's events"""
+    events = []
+    while True:
+        event = await session.next_event()
+        events.append(event)
+        if event["type"] == "prompt":
+            session.submit(action, event["turn"])
+        elif event["type"] == "closed":
+            return events
+
+def test_session_reports_battle_errors():
+    """Test that a battle that fails ends with an error event, not a crashed task"""
+    async def run():
+        server = battle_server.BattleServer(turn_timeout=1.0)
+        broken = build_character("Warrior", 1)
+        del broken['health']
+        session = server.open_session(broken, combat_system.create_enemy("goblin"))
+        events = await collect_events(session)
+        assert await session.task is None
+        return events
+
+    events = asyncio.run(run())
+    assert events[-1] == {"type": "closed"}
+    assert events[-2]["type"] == "error"
+    assert "KeyError" in events[-2]["message"]
+
+def test_session_drops_late_and_duplicate_actions():
+    """Test that a repeated answer or one sent after its turn timed out never plays on a later turn"""
+    async def run():
+        server = battle_server.BattleServer(turn_timeout=0.05)
+        session = server.open_session(build_character("Warrior", 9), combat_system.create_enemy("dragon"))
+        escapes = []
+        session.battle.attempt_escape = lambda: escapes.append(session.battle.turns) or False
+        timeouts = []
+        while True:
+            event = await session.next_event()
+            if event["type"] == "prompt" and event["turn"] == 1:
+                # A duplicate answer, untagged, would otherwise be read on turn 2
+                session.submit("attack", 1)
+                session.submit("run")
+            elif event["type"] == "prompt" and event["turn"] != 2:
+                session.submit("attack", event["turn"])
+            elif event["type"] == "timeout":
+                timeouts.append(event["turn"])
+                # Too late: turn 3 is already waiting for its own answer
+                session.submit("run", event["turn"])
+            elif event["type"] == "closed":
+                return escapes, timeouts, session.results
+
+    escapes, timeouts, results = asyncio.run(run())
+    assert escapes == []
+    assert timeouts == [2]
+    assert results['turns'] >= 3
+
+def test_tcp_server_survives_malformed_messages():
+    """Test that a TCP client gets errors for bad lines and can still battle"""
+    async def run():
+        server = battle_server.BattleServer(turn_timeout=1.0)
+        tcp = await server.serve_tcp()
+        port = tcp.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        replies = []
+        for line in [b"not json", b"[1, 2]", json.dumps({"type": "start", "enemy": 5}).encode(),
+                     json.dumps({"type": "start", "character": {"name": "Aria"}}).encode(),
+                     json.dumps({"type": "action", "action": "attack"}).encode()]:
+            writer.write(line + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+
+        writer.write(json.dumps({"type": "start", "class": "Warrior", "level": 5,
+                                 "enemy": "goblin"}).encode() + b"\n")
+        events = []
+        while not events or events[-1]["type"] != "closed":
+            events.append(json.loads(await reader.readline()))
+            if events[-1]["type"] == "prompt":
+                writer.write(json.dumps({"type": "action", "action": "attack",
+                                         "turn": events[-1]["turn"]}).encode() + b"\n")
+
+        writer.close()
+        await server.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return replies, events
+
+    replies, events = asyncio.run(run())
+    assert [reply["type"] for reply in replies] == ["error"] * 5
+    assert replies[2]["message"].startswith("Cannot start battle")
+    assert replies[3]["message"].startswith("Cannot start battle")
+    assert any(event["type"] == "result" and event["winner"] == "player" for event in events)
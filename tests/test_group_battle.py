@@ -0,0 +1,111 @@
+"""
+Test Group Battle
+Tests party-vs-group battles, initiative and target pools
+"""
+
+import pytest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import combat_system
+import group_battle
+from group_battle import GroupBattle, TargetPool
+from custom_exceptions import CharacterDeadError
+
+def goblin():
+    """A goblin without an AI strategy (group battle enemies always attack)"""
+    enemy = combat_system.create_enemy("goblin")
+    enemy.pop("strategy", None)
+    return enemy
+
+# ============================================================================
+# TARGET POOL TESTS
+# ============================================================================
+
+def test_target_pool_matches_brute_force():
+    """Test that pool queries agree with scanning every combatant"""
+    rng = random.Random(4)
+    combatants = [{'health': rng.randint(0, 40)} for _ in range(30)]
+    pool = TargetPool(combatants)
+
+    for _ in range(200):
+        living = [index for index, combatant in enumerate(combatants) if combatant['health'] > 0]
+        assert len(pool) == len(living)
+        if not living:
+            assert pool.first() is None and pool.weakest() is None and pool.random(rng) is None
+            break
+        assert pool.first() == min(living)
+        assert pool.weakest() == min(living, key=lambda index: (combatants[index]['health'], index))
+        assert pool.random(rng) in living
+
+        target = rng.choice(living)
+        combatants[target]['health'] -= rng.randint(1, 15)
+        pool.update(target)
+
+def test_target_pool_rejects_unknown_policy():
+    """Test that an unknown target policy is refused"""
+    with pytest.raises(ValueError):
+        TargetPool([{'health': 5}]).pick("strongest", random.Random(0))
+    with pytest.raises(ValueError):
+        GroupBattle([character_manager.create_character("Hero", "Warrior")], [goblin()], party_targets="strongest")
+
+# ============================================================================
+# GROUP BATTLE TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("character_class", ["Warrior", "Mage", "Rogue", "Cleric"])
+def test_one_on_one_matches_simple_battle(character_class):
+    """Test that a one-on-one group battle plays out like SimpleBattle"""
+    solo = character_manager.create_character("Solo", character_class)
+    party_member = character_manager.create_character("Solo", character_class)
+    solo_enemy, group_enemy = goblin(), goblin()
+
+    expected = combat_system.SimpleBattle(solo, solo_enemy, policy=combat_system.attack_policy,
+                                          headless=True, record=False).start_battle()
+    result = GroupBattle([party_member], [group_enemy], policy=group_battle.group_attack_policy).start_battle()
+
+    assert result['winner'] == {"player": "party", "enemy": "enemies"}[expected['winner']]
+    assert result['actions'] == 2 * expected['turns'] - (expected['winner'] == "player")
+    assert party_member['health'] == solo['health']
+    assert group_enemy['health'] == solo_enemy['health']
+    assert party_member['experience'] == solo['experience']
+
+def test_survivors_share_rewards():
+    """Test that survivors split the defeated enemies' XP and gold equally"""
+    party = [character_manager.create_character("Tank", "Warrior"),
+             character_manager.create_character("Fallen", "Mage")]
+    party[1]['health'] = 1
+    enemies = [goblin(), goblin(), goblin()]
+
+    result = GroupBattle(party, enemies, policy=group_battle.group_attack_policy, party_targets="first",
+                         enemy_targets="weakest", rng=random.Random(2)).start_battle()
+
+    assert result['winner'] == "party"
+    assert result['survivors'] == ["Tank"]
+    assert result['xp_gained'] == 3 * 25
+    assert result['gold_gained'] == 3 * 10
+    assert party[0]['experience'] == 75
+    assert party[1]['experience'] == 0
+
+def test_faster_combatants_act_more_often():
+    """Test that doubling speed doubles how often a character acts"""
+    normal = character_manager.create_character("Normal", "Warrior")
+    fast = dict(character_manager.create_character("Fast", "Warrior"), speed=20)
+
+    GroupBattle([normal], [goblin()], policy=group_battle.group_attack_policy).start_battle()
+    GroupBattle([fast], [goblin()], policy=group_battle.group_attack_policy).start_battle()
+
+    # Four hits kill a goblin: the goblin strikes three times against normal speed, twice against double
+    assert normal['health'] == normal['max_health'] - 3 * 5
+    assert fast['health'] == fast['max_health'] - 2 * 5
+
+def test_dead_party_cannot_fight():
+    """Test that a party with no living character is refused"""
+    party = [character_manager.create_character("Ghost", "Cleric")]
+    party[0]['health'] = 0
+    with pytest.raises(CharacterDeadError):
+        GroupBattle(party, [goblin()]).start_battle()
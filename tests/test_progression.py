@@ -0,0 +1,183 @@
+"""
+Test Progression
+Tests closed-form leveling, the character population and special ability lookup
+"""
+
+import pytest
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import ability_registry
+from character_population import CharacterPopulation, np
+from custom_exceptions import CharacterDeadError
+
+def level_up_one_at_a_time(character, xp_amount):
+    """Reference leveling: the original loop, one level per pass"""
+    table = character_manager.get_class_progression(character['class'])
+    character['experience'] += xp_amount
+    while character['experience'] >= character['level'] * table['xp_per_level']:
+        character['experience'] -= character['level'] * table['xp_per_level']
+        character['level'] += 1
+        character['max_health'] += table['health_per_level']
+        character['strength'] += table['strength_per_level']
+        character['magic'] += table['magic_per_level']
+        character['health'] = character['max_health']
+
+# ============================================================================
+# CLOSED-FORM LEVELING TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("character_class", ["Warrior", "Mage", "Rogue", "Cleric"])
+@pytest.mark.parametrize("xp_amount", [0, 50, 99, 100, 250, 1000, 12345, 250000])
+def test_gain_experience_matches_loop(character_class, xp_amount):
+    """Test that jumping to the final level matches leveling one at a time"""
+    character = character_manager.create_character("Closed", character_class)
+    expected = dict(character)
+    character['health'] = 1
+    expected['health'] = 1
+
+    summary = character_manager.apply_experience(character, xp_amount)
+    level_up_one_at_a_time(expected, xp_amount)
+
+    for field in ["level", "experience", "health", "max_health", "strength", "magic"]:
+        assert character[field] == expected[field]
+    assert summary['levels_gained'] == expected['level'] - 1
+
+def test_gain_experience_in_steps_matches_loop():
+    """Test that many small gains add up like the loop"""
+    character = character_manager.create_character("Steps", "Warrior")
+    expected = dict(character)
+    for xp_amount in [30, 70, 150, 1, 399, 5000, 0, 2]:
+        character_manager.gain_experience(character, xp_amount)
+        level_up_one_at_a_time(expected, xp_amount)
+        assert (character['level'], character['experience']) == (expected['level'], expected['experience'])
+
+def test_level_up_message():
+    """Test the level-up messages for one and several levels"""
+    character = character_manager.create_character("Hero", "Mage")
+    assert character_manager.format_level_up_message(character_manager.apply_experience(character, 10)) is None
+    assert character_manager.format_level_up_message(
+        character_manager.apply_experience(character, 90)) == "Hero leveled up to level 2!"
+    assert character_manager.format_level_up_message(
+        character_manager.apply_experience(character, 900)) == "Hero gained 3 levels and is now level 5!"
+
+def test_gain_experience_returns_character(capsys):
+    """Test that gain_experience keeps returning the character and prints one message"""
+    character = character_manager.create_character("Hero", "Warrior")
+    assert character_manager.gain_experience(character, 50) is character
+    assert capsys.readouterr().out == ""
+
+    assert character_manager.gain_experience(character, 950) is character
+    assert capsys.readouterr().out == "Hero gained 4 levels and is now level 5!\n"
+
+# ============================================================================
+# POPULATION TESTS
+# ============================================================================
+
+BACKENDS = [False, True] if np is not None else [False]
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_population_gain_experience_matches_characters(use_numpy):
+    """Test that batch leveling matches gain_experience per character"""
+    classes = ["Warrior", "Mage", "Rogue", "Cleric"]
+    amounts = [0, 100, 350, 1200, 99, 5000, 20, 100000]
+    characters = [character_manager.create_character(f"Pop{i}", classes[i % 4]) for i in range(len(amounts))]
+    expected = [dict(character) for character in characters]
+
+    population = CharacterPopulation.from_characters(characters, use_numpy)
+    gained = population.gain_experience(amounts)
+    population.write_back()
+
+    for character, reference, xp_amount, levels in zip(characters, expected, amounts, gained):
+        summary = character_manager.apply_experience(reference, xp_amount)
+        assert levels == summary['levels_gained']
+        for field in ["level", "experience", "health", "max_health", "strength", "magic"]:
+            assert character[field] == reference[field]
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_population_heal_gold_revive_match_characters(use_numpy):
+    """Test that batch healing, gold and revival match the single-character functions"""
+    characters = [character_manager.create_character(f"Pop{i}", "Warrior") for i in range(4)]
+    for character, health in zip(characters, [0, 5, 100, 120]):
+        character['health'] = health
+    expected = [dict(character) for character in characters]
+
+    population = CharacterPopulation.from_characters(characters, use_numpy)
+    healed = list(population.heal_character(30))
+    gold = list(population.add_gold(-40, [1, 3]))
+    revived = list(population.revive_character())
+    population.write_back()
+
+    assert healed == [character_manager.heal_character(reference, 30) for reference in expected]
+    assert gold == [character_manager.add_gold(expected[slot], -40) for slot in [1, 3]]
+    assert revived == [character_manager.revive_character(reference) for reference in expected]
+    for character, reference in zip(characters, expected):
+        assert (character['health'], character['gold']) == (reference['health'], reference['gold'])
+
+    # Overspending is all-or-nothing
+    with pytest.raises(ValueError):
+        population.add_gold(-80)
+    assert list(population.column("gold")) == [100, 60, 100, 60]
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_population_rejects_dead_characters(use_numpy):
+    """Test that a dead character stops the whole batch"""
+    characters = [character_manager.create_character(f"Pop{i}", "Warrior") for i in range(3)]
+    characters[1]['health'] = 0
+    population = CharacterPopulation.from_characters(characters, use_numpy)
+
+    with pytest.raises(CharacterDeadError):
+        population.gain_experience(500)
+    assert list(population.column("experience")) == [0, 0, 0]
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_population_rejects_duplicate_slots(use_numpy):
+    """Test that selecting a slot twice is an error instead of a silent miscount"""
+    characters = [character_manager.create_character(f"Pop{i}", "Cleric") for i in range(3)]
+    for character in characters:
+        character['health'] = 10
+    population = CharacterPopulation.from_characters(characters, use_numpy)
+
+    for operation in [lambda: population.heal_character(20, [0, 0]),
+                      lambda: population.add_gold(5, [2, 1, 2]),
+                      lambda: population.revive_character([1, 1])]:
+        with pytest.raises(ValueError):
+            operation()
+    assert list(population.column("health")) == [10, 10, 10]
+    assert list(population.column("gold")) == [100, 100, 100]
+
+# ============================================================================
+# CHARACTER ABILITY TESTS
+# ============================================================================
+
+def test_plain_character_stays_serializable():
+    """Test that plain characters look their ability up instead of storing it"""
+    character = character_manager.create_character("Plain", "Mage")
+
+    assert "ability" not in character
+    assert json.loads(json.dumps(character)) == character
+    assert ability_registry.resolve_ability(character) is ability_registry.get_ability("Mage")
+    assert "ability" not in character
+
+def test_typed_character_keeps_ability_out_of_saves():
+    """Test that the cached ability has a slot but is never exported"""
+    character = character_manager.create_character("Typed", "Rogue", typed=True)
+
+    assert character['ability'] is ability_registry.get_ability("Rogue")
+    assert character.extra is None
+    assert character.to_dict() == character_manager.create_character("Typed", "Rogue")
+
+def test_typed_character_ability_refreshed_after_registry_change():
+    """Test that a cached ability is rebuilt once the registry changes"""
+    character = character_manager.create_character("Typed", "Warrior", typed=True)
+    cached = character['ability']
+
+    ability_registry.invalidate()
+    refreshed = ability_registry.resolve_ability(character)
+    assert refreshed is not cached
+    assert refreshed.ability_id == cached.ability_id
+    assert character['ability'] is refreshed
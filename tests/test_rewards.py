@@ -0,0 +1,242 @@
+"""
+Test Rewards
+Tests loot rolls and batched battle and quest rewards, including dead characters
+"""
+
+import pytest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import combat_system
+import quest_handler
+import game_data
+import loot_system
+from reward_pipeline import RewardQueue, apply_reward, format_reward_summary
+from custom_exceptions import CharacterDeadError
+
+def alias_probabilities(table):
+    """Exact chance of each outcome index, read off the table's columns"""
+    chances = [0.0] * len(table)
+    for column in range(len(table)):
+        chances[column] += table.prob[column] / len(table)
+        chances[table.alias[column]] += (1.0 - table.prob[column]) / len(table)
+    return chances
+
+# ============================================================================
+# ALIAS TABLE TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("weights", [[1], [1, 1], [3, 1, 0, 6], [0.5, 0.25, 0.125, 0.125], [1, 99, 0.01]])
+def test_alias_table_matches_weights(weights):
+    """Test that each outcome's chance is exactly its share of the weight"""
+    table = loot_system.AliasTable(list(range(len(weights))), weights)
+    total = sum(weights)
+    for chance, weight in zip(alias_probabilities(table), weights):
+        assert chance == pytest.approx(weight / total)
+
+def test_alias_table_draws_follow_weights():
+    """Test that single draws follow the weights and never pick a zero weight"""
+    table = loot_system.AliasTable(["a", "b", "c"], [6, 0, 2])
+    rng = random.Random(5)
+    draws = [table.draw(rng) for _ in range(20000)]
+    assert "b" not in draws
+    assert draws.count("a") / len(draws) == pytest.approx(0.75, abs=0.02)
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_draw_many_follows_weights(use_numpy, monkeypatch):
+    """Test that batch draws follow the weights with or without NumPy"""
+    if use_numpy and loot_system.np is None:
+        pytest.skip("NumPy is not installed")
+    if not use_numpy:
+        monkeypatch.setattr(loot_system, "np", None)
+    rng = loot_system.np.random.default_rng(5) if use_numpy else random.Random(5)
+    table = loot_system.AliasTable(["a", "b", "c"], [6, 0, 2])
+    draws = table.draw_many(20000, rng)
+    assert len(draws) == 20000
+    assert "b" not in draws
+    assert draws.count("a") / len(draws) == pytest.approx(0.75, abs=0.02)
+
+@pytest.mark.parametrize("outcomes, weights", [(["a", "b"], [1]), (["a"], [-1]), (["a", "b"], [0, 0])])
+def test_alias_table_rejects_bad_weights(outcomes, weights):
+    """Test that mismatched, negative or all-zero weights are rejected"""
+    with pytest.raises(ValueError):
+        loot_system.AliasTable(outcomes, weights)
+
+# ============================================================================
+# LOOT TESTS
+# ============================================================================
+
+def test_loot_table_splits_drop_chance_by_tier():
+    """Test that a flattened loot table keeps the miss chance and tier shares"""
+    data = game_data.DEFAULT_LOOT_TABLES["goblin"]
+    table = loot_system.build_loot_table(data)
+    chances = dict(zip(table["drops"].outcomes, alias_probabilities(table["drops"])))
+
+    # Epic and rare tiers have no goblin items, so common and uncommon share the drops
+    assert chances[None] == pytest.approx(0.6)
+    assert chances[("health_potion", "common")] == pytest.approx(0.4 * 70 / 94)
+    assert chances[("leather_armor", "uncommon")] == pytest.approx(0.4 * 24 / 94 / 2)
+
+def test_roll_loot_stays_in_table_bounds():
+    """Test that rolled gold and items come from the enemy's table"""
+    rng = random.Random(2)
+    data = loot_system.get_loot_tables()["dragon"]
+    droppable = set(data["drops"].outcomes) - {None}
+    for _ in range(200):
+        loot = loot_system.roll_loot(combat_system.create_enemy("dragon"), rng)
+        assert data["gold_min"] <= loot['gold'] <= data["gold_max"]
+        assert len(loot['items']) == data["rolls"]
+        assert set(loot['items']) <= droppable
+
+def test_enemy_without_loot_table_drops_nothing():
+    """Test that enemies with no loot table only give their gold reward"""
+    assert loot_system.roll_loot({'enemy_id': "slime"}) == {'gold': 0, 'items': []}
+    assert loot_system.roll_loot({'name': "Nameless"}) == {'gold': 0, 'items': []}
+
+# ============================================================================
+# REWARD QUEUE TESTS
+# ============================================================================
+
+def test_queue_totals_rewards_per_character():
+    """Test that queued rewards are applied once per character"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    sidekick = character_manager.create_character("Sidekick", "Mage")
+    queue = RewardQueue()
+    for _ in range(3):
+        queue.grant(hero, xp=40, gold=5)
+    queue.grant(sidekick, xp=10, gold=1, items=["health_potion"])
+    assert len(queue) == 4
+    assert hero['experience'] == 0
+
+    summaries = queue.apply()
+    assert len(queue) == 0
+    assert [summary['name'] for summary in summaries] == ["Hero", "Sidekick"]
+    assert summaries[0]['grants'] == 3
+    assert (summaries[0]['xp'], summaries[0]['gold']) == (120, 15)
+    assert hero['level'] == 2
+    assert hero['experience'] == 20
+    assert hero['gold'] == 115
+    assert sidekick['inventory'] == ["health_potion"]
+
+def test_queue_levels_up_once_for_a_run_of_fights():
+    """Test that many fights end in a single level-up summary"""
+    hero = character_manager.create_character("Hero", "Rogue")
+    queue = RewardQueue()
+    for _ in range(40):
+        queue.grant(hero, xp=25)
+
+    summary = queue.apply_character(hero)
+    assert summary['level_up']['levels_gained'] == 4
+    assert hero['level'] == 5
+    messages = format_reward_summary(summary)
+    assert messages[0] == "Hero gained 1000 XP and 0 gold from 40 rewards."
+    assert messages[-1] == "Hero gained 4 levels and is now level 5!"
+
+def test_queue_matches_immediate_rewards():
+    """Test that batching gives the same result as applying each reward"""
+    batched = character_manager.create_character("Batched", "Cleric")
+    immediate = character_manager.create_character("Immediate", "Cleric")
+    queue = RewardQueue()
+    for xp, gold in [(30, 2), (170, 9), (0, 40), (555, 1)]:
+        queue.grant(batched, xp, gold)
+        apply_reward(immediate, xp, gold)
+    queue.apply()
+
+    for field in ["level", "experience", "gold", "health", "max_health", "strength", "magic"]:
+        assert batched[field] == immediate[field]
+
+def test_queue_rejects_negative_rewards():
+    """Test that negative XP or gold cannot be granted"""
+    with pytest.raises(ValueError):
+        RewardQueue().grant(character_manager.create_character("Hero", "Mage"), xp=-1)
+
+# ============================================================================
+# DEAD CHARACTER TESTS
+# ============================================================================
+
+def test_dead_character_keeps_rewards_queued():
+    """Test that a dead character's rewards wait until they are revived"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    queue = RewardQueue()
+    queue.grant(hero, xp=150, gold=20)
+    hero['health'] = 0
+
+    with pytest.raises(CharacterDeadError):
+        queue.apply_character(hero)
+    assert queue.apply() == []
+    assert len(queue) == 1
+
+    character_manager.revive_character(hero)
+    queue.apply()
+    assert hero['level'] == 2
+    assert hero['gold'] == 120
+    assert len(queue) == 0
+
+def test_dead_character_quest_stays_active():
+    """Test that a dead character cannot complete a quest and lose its rewards"""
+    quests = game_data.load_quests("data/quests.txt")
+    hero = character_manager.create_character("Hero", "Warrior")
+    quest_handler.accept_quest(hero, "first_steps", quests)
+    hero['health'] = 0
+
+    with pytest.raises(CharacterDeadError):
+        quest_handler.complete_quest(hero, "first_steps", quests)
+    assert "first_steps" in hero['active_quests']
+    assert "first_steps" not in hero['completed_quests']
+    assert hero['experience'] == 0
+
+    character_manager.revive_character(hero)
+    result = quest_handler.complete_quest(hero, "first_steps", quests)
+    assert result['xp_gained'] == quests["first_steps"]['reward_xp']
+    assert hero['experience'] == quests["first_steps"]['reward_xp']
+    assert "first_steps" in hero['completed_quests']
+
+def test_queued_quest_rewards_apply_later():
+    """Test that a quest completed onto a queue pays out when the queue is applied"""
+    quests = game_data.load_quests("data/quests.txt")
+    hero = character_manager.create_character("Hero", "Mage")
+    quest_handler.accept_quest(hero, "first_steps", quests)
+    queue = RewardQueue()
+
+    result = quest_handler.complete_quest(hero, "first_steps", quests, rewards=queue)
+    assert result['level_up'] is None
+    assert hero['gold'] == 100
+    queue.apply()
+    assert hero['gold'] == 100 + quests["first_steps"]['reward_gold']
+
+# ============================================================================
+# VICTORY REWARD TESTS
+# ============================================================================
+
+def test_battle_rewards_match_enemy_and_loot():
+    """Test that a won battle pays the enemy's rewards plus its loot"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    goblin = combat_system.create_enemy("goblin")
+    results = combat_system.SimpleBattle(hero, goblin, headless=True, rng=random.Random(3)).start_battle()
+
+    assert results['winner'] == "player"
+    assert results['xp_gained'] == goblin['xp_reward']
+    assert results['gold_gained'] == goblin['gold_reward'] + results['loot']['gold']
+    assert hero['gold'] == 100 + results['gold_gained']
+    assert hero['inventory'] == [item_id for item_id, tier in results['loot']['items']]
+
+def test_battle_rewards_can_be_queued():
+    """Test that battles given a queue leave the character untouched until applied"""
+    hero = character_manager.create_character("Hero", "Warrior")
+    queue = RewardQueue()
+    gold = 0
+    for seed in range(5):
+        hero['health'] = hero['max_health']
+        results = combat_system.SimpleBattle(hero, combat_system.create_enemy("goblin"), headless=True,
+                                             rng=random.Random(seed), rewards=queue).start_battle()
+        gold += results['gold_gained']
+    assert hero['experience'] == 0
+    assert len(queue) == 5
+
+    summary = queue.apply_character(hero)
+    assert summary['xp'] == 5 * 25
+    assert hero['gold'] == 100 + gold
@@ -0,0 +1,242 @@
+"""
+Test Save System
+Tests the save index, sharded layout, key collisions and export/import
+"""
+
+import pytest
+import sys
+import os
+import io
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import CharacterNotFoundError, InvalidSaveDataError
+
+def write_legacy_save(directory, filename, name, level=1):
+    """Write a save file by hand, as older versions named them"""
+    with open(os.path.join(directory, filename), "w") as f:
+        f.write(f"NAME: {name}\nCLASS: Warrior\nLEVEL: {level}\nHEALTH: 120\nMAX_HEALTH: 120\n"
+                "STRENGTH: 15\nMAGIC: 5\nEXPERIENCE: 0\nGOLD: 100\nINVENTORY: \n"
+                "ACTIVE_QUESTS: \nCOMPLETED_QUESTS: \n")
+
+# ============================================================================
+# SAVE INDEX TESTS
+# ============================================================================
+
+def test_save_index_tracks_saves_and_deletes(tmp_path):
+    """Test that saving, listing and deleting keep the index current"""
+    directory = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Aria", "Mage"), directory)
+    character_manager.save_character(character_manager.create_character("Bran", "Warrior"), directory)
+
+    assert sorted(character_manager.list_saved_characters(directory)) == ["Aria", "Bran"]
+    summaries = character_manager.list_saved_character_summaries(directory)
+    assert {"name": "Aria", "level": 1, "class": "Mage"} in summaries
+
+    character_manager.delete_character("Aria", directory)
+    assert character_manager.list_saved_characters(directory) == ["Bran"]
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Aria", directory)
+
+def test_delete_keeps_index_without_rescan(tmp_path, monkeypatch):
+    """Test that deleting saves updates the index instead of rereading every save"""
+    directory = str(tmp_path)
+    names = [f"Hero{i}" for i in range(6)]
+    for name in names:
+        character_manager.save_character(character_manager.create_character(name, "Rogue"), directory)
+    character_manager.list_saved_characters(directory)
+
+    rebuilds = []
+    rebuild = character_manager.rebuild_save_index
+    monkeypatch.setattr(character_manager, "rebuild_save_index",
+                        lambda save_directory: rebuilds.append(save_directory) or rebuild(save_directory))
+    for name in names[:5]:
+        character_manager.delete_character(name, directory)
+    assert character_manager.list_saved_characters(directory) == ["Hero5"]
+    assert rebuilds == []
+
+    # The manifest on disk agrees with the index in memory
+    character_manager.save_index_cache.clear()
+    assert character_manager.list_saved_characters(directory) == ["Hero5"]
+    assert rebuilds == []
+
+def test_save_index_matches_canonical_names(tmp_path):
+    """Test that names differing in case or spacing are one character"""
+    directory = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Aria", "Mage"), directory)
+
+    loaded = character_manager.load_character(" ARIA ", directory)
+    assert loaded['name'] == "Aria"
+
+    # Saving under another spelling replaces the save instead of adding one
+    renamed = character_manager.create_character("aria", "Mage")
+    character_manager.save_character(renamed, directory)
+    assert character_manager.list_saved_characters(directory) == ["aria"]
+    assert len([f for f in os.listdir(directory) if f.endswith("_save.txt")]) == 1
+
+def test_save_index_rebuilt_after_outside_change(tmp_path):
+    """Test that a save added behind the index's back is picked up"""
+    directory = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Aria", "Mage"), directory)
+    write_legacy_save(directory, "bran_save.txt", "Bran")
+
+    assert sorted(character_manager.list_saved_characters(directory)) == ["Aria", "Bran"]
+    assert character_manager.load_character("Bran", directory)['name'] == "Bran"
+
+# ============================================================================
+# KEY COLLISION TESTS
+# ============================================================================
+
+def test_colliding_legacy_saves_stay_separate(tmp_path):
+    """Test that legacy saves sharing a canonical key are all kept"""
+    directory = str(tmp_path)
+    write_legacy_save(directory, "aria_save.txt", "Aria", level=2)
+    write_legacy_save(directory, "ARIA_legacy_save.txt", "ARIA", level=5)
+
+    assert sorted(character_manager.list_saved_characters(directory)) == ["ARIA", "Aria"]
+    assert character_manager.load_character("Aria", directory)['level'] == 2
+    assert character_manager.load_character("ARIA", directory)['level'] == 5
+
+    # Saving one of them never overwrites the other
+    shouty = character_manager.load_character("ARIA", directory)
+    shouty['gold'] = 999
+    character_manager.save_character(shouty, directory)
+    assert character_manager.load_character("Aria", directory)['gold'] == 100
+    assert character_manager.load_character("ARIA", directory)['gold'] == 999
+
+    character_manager.delete_character("ARIA", directory)
+    assert character_manager.list_saved_characters(directory) == ["Aria"]
+    assert character_manager.load_character("Aria", directory)['level'] == 2
+
+def test_same_save_file_detection(tmp_path):
+    """Test that paths to one file are recognized as the same save"""
+    path = os.path.join(str(tmp_path), "aria_save.txt")
+    write_legacy_save(str(tmp_path), "aria_save.txt", "Aria")
+
+    assert character_manager.is_same_save_file(path, os.path.join(str(tmp_path), ".", "aria_save.txt"))
+    assert not character_manager.is_same_save_file(path, os.path.join(str(tmp_path), "other_save.txt"))
+
+# ============================================================================
+# SHARDED LAYOUT TESTS
+# ============================================================================
+
+def test_sharded_layout_save_and_load(tmp_path):
+    """Test that saves in a sharded directory go into shard folders"""
+    directory = str(tmp_path)
+    character_manager.set_save_layout(directory, "sharded")
+    character_manager.save_character(character_manager.create_character("Aria", "Mage"), directory)
+
+    path = character_manager.get_save_path("Aria", directory)
+    assert os.path.dirname(path) != directory
+    assert os.path.exists(path)
+    assert character_manager.load_character("aria", directory)['name'] == "Aria"
+
+def test_migrate_to_sharded_layout(tmp_path):
+    """Test that migration moves flat saves without losing any"""
+    directory = str(tmp_path)
+    for name in ["Aria", "Bran", "Cass"]:
+        character_manager.save_character(character_manager.create_character(name, "Rogue"), directory)
+
+    assert character_manager.migrate_to_sharded_layout(directory) == 3
+    assert character_manager.get_save_layout(directory) == "sharded"
+    assert not [f for f in os.listdir(directory) if f.endswith("_save.txt")]
+    assert sorted(character_manager.list_saved_characters(directory)) == ["Aria", "Bran", "Cass"]
+
+    # Re-running finds nothing left to move
+    assert character_manager.migrate_to_sharded_layout(directory) == 0
+
+def test_migrate_keeps_colliding_saves(tmp_path):
+    """Test that migration never overwrites a save on a key collision"""
+    directory = str(tmp_path)
+    write_legacy_save(directory, "aria_save.txt", "Aria", level=2)
+    write_legacy_save(directory, "ARIA_legacy_save.txt", "ARIA", level=5)
+    write_legacy_save(directory, "bran_save.txt", "Bran", level=3)
+
+    assert character_manager.migrate_to_sharded_layout(directory) == 2
+    assert sorted(character_manager.list_saved_characters(directory)) == ["ARIA", "Aria", "Bran"]
+    assert character_manager.load_character("Aria", directory)['level'] == 2
+    assert character_manager.load_character("ARIA", directory)['level'] == 5
+
+# ============================================================================
+# BULK VERIFICATION TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_verify_saved_characters_reports_every_save(tmp_path, parse_workers):
+    """Test that bulk verification checks every save, in index order"""
+    directory = str(tmp_path)
+    for i in range(10):
+        character_manager.save_character(character_manager.create_character(f"Hero{i}", "Cleric"), directory)
+    write_legacy_save(directory, "broken_save.txt", "Broken")
+    with open(os.path.join(directory, "broken_save.txt"), "a") as f:
+        f.write("LEVEL: lots\n")
+
+    stats = {}
+    results = list(character_manager.verify_saved_characters(directory, io_workers=2, parse_workers=parse_workers,
+                                                             chunk_size=3, stats=stats))
+    assert [result["name"] for result in results] == character_manager.list_saved_characters(directory)
+    assert [result["name"] for result in results if result["status"] != "ok"] == ["Broken"]
+    assert (stats["checked"], stats["ok"], stats["failed"]) == (11, 10, 1)
+
+# ============================================================================
+# EXPORT / IMPORT TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_import_round_trip(tmp_path, compress):
+    """Test that an exported archive restores every character"""
+    source = str(tmp_path / "source")
+    target = str(tmp_path / "target")
+    for name, character_class in [("Aria", "Mage"), ("Bran", "Warrior")]:
+        character = character_manager.create_character(name, character_class)
+        character['inventory'] = ["health_potion"]
+        character['completed_quests'] = ["first_steps"]
+        character_manager.save_character(character, source)
+
+    archive = io.BytesIO()
+    assert character_manager.export_all(archive, source, compress=compress) == {"exported": 2, "failed": []}
+    archive.seek(0)
+    assert character_manager.import_all(archive, target, compress=compress) == {"imported": 2, "failed": []}
+
+    for name in ["Aria", "Bran"]:
+        original = character_manager.load_character(name, source)
+        restored = character_manager.load_character(name, target)
+        assert restored == original
+
+def test_import_rejects_bad_records_without_damage(tmp_path):
+    """Test that a bad record is reported and leaves the existing save intact"""
+    directory = str(tmp_path)
+    character = character_manager.create_character("Aria", "Mage")
+    character['inventory'] = ["health_potion"]
+    character_manager.save_character(character, directory)
+
+    bad = dict(character)
+    bad['inventory'] = ["health_potion", 5]
+    archive = io.BytesIO(b"not json\n" + json.dumps(bad).encode("utf-8") + b"\n")
+    report = character_manager.import_all(archive, directory)
+
+    assert report["imported"] == 0
+    assert [record for record, message in report["failed"]] == [1, 2]
+    assert character_manager.load_character("Aria", directory)['inventory'] == ["health_potion"]
+
+def test_validate_rejects_unsaveable_list_entries():
+    """Test that list entries that cannot be saved comma-separated are rejected"""
+    character = character_manager.create_character("Aria", "Mage")
+    for entry in [5, "a,b", "a\nb"]:
+        character['inventory'] = [entry]
+        with pytest.raises(InvalidSaveDataError):
+            character_manager.validate_character_data(character)
+
+def test_failed_save_keeps_previous_file(tmp_path):
+    """Test that a save that fails partway leaves the old save readable"""
+    directory = str(tmp_path)
+    character = character_manager.create_character("Aria", "Mage")
+    character_manager.save_character(character, directory)
+
+    character['inventory'] = [None]
+    with pytest.raises(TypeError):
+        character_manager.save_character(character, directory)
+    assert character_manager.load_character("Aria", directory)['inventory'] == []
+    assert not [f for f in os.listdir(directory) if f.endswith(".tmp")]
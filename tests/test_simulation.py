@@ -0,0 +1,101 @@
+"""
+Test Simulation
+Tests the Monte Carlo battle simulator and the balance report
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combat_system
+import battle_simulator
+import reward_pipeline
+import balance_report
+
+MATCHUPS = [("Warrior", "goblin", 1), ("Mage", "orc", 3), ("Rogue", "dragon", 6)]
+
+# ============================================================================
+# SIMULATOR TESTS
+# ============================================================================
+
+def test_simulation_same_with_any_worker_count():
+    """Test that results depend on the seed, not on how shards are spread over processes"""
+    inline = battle_simulator.simulate(MATCHUPS, 60, seed=3, workers=0, shard_size=25)
+    pooled = battle_simulator.simulate(MATCHUPS, 60, seed=3, workers=2, shard_size=25)
+    assert pooled == inline
+
+    for stats in inline.values():
+        assert stats["battles"] == 60
+        assert stats["wins"] + stats["losses"] + stats["escapes"] == 60
+        assert sum(stats["turns_histogram"].values()) == 60
+
+def test_simulation_changes_with_seed():
+    """Test that a different seed gives different battles"""
+    first = battle_simulator.simulate([("Rogue", "orc", 3)], 200, seed=1, workers=0)
+    second = battle_simulator.simulate([("Rogue", "orc", 3)], 200, seed=2, workers=0)
+    assert first != second
+
+def test_shard_battle_can_be_replayed_alone():
+    """Test that any battle of a shard can be rerun from its seed and index"""
+    task = ("Rogue", "orc", 3, 1, 99, "special")
+    _, stats = battle_simulator.run_shard(task)
+
+    character = battle_simulator.build_character("Rogue", 3)
+    result = combat_system.SimpleBattle(character, combat_system.create_enemy("orc"),
+                                        policy=combat_system.special_when_ready_policy, headless=True,
+                                        rng=combat_system.battle_rng(99, 0)).start_battle()
+    assert stats["turns_histogram"] == {result["turns"]: 1}
+    assert stats["health_total"] == result["character_health"]
+
+def test_shard_does_not_keep_battle_rewards(monkeypatch):
+    """Test that no reward queue outlives its battle with characters piling up in it"""
+    queues = []
+
+    class TrackedQueue(reward_pipeline.RewardQueue):
+        def __init__(self):
+            super().__init__()
+            queues.append(self)
+
+    monkeypatch.setattr(reward_pipeline, "RewardQueue", TrackedQueue)
+    _, stats = battle_simulator.run_shard(("Warrior", "goblin", 5, 50, 0, "attack"))
+
+    assert stats["wins"] == 50
+    assert max(len(queue) for queue in queues) == 1
+
+def test_unknown_policy_rejected():
+    """Test that a simulation with an unknown player policy is refused"""
+    with pytest.raises(ValueError):
+        battle_simulator.plan_shards(MATCHUPS, 10, policy="berserk")
+
+# ============================================================================
+# BALANCE REPORT TESTS
+# ============================================================================
+
+def test_balance_report_reuses_cached_cells(tmp_path):
+    """Test that only cells missing from the cache are simulated again"""
+    cache_file = str(tmp_path / "cache.json")
+    settings = {"classes": ["Warrior", "Mage"], "enemy_types": ["goblin", "orc"], "battles": 20,
+                "workers": 0, "cache_file": cache_file}
+    first = balance_report.build_report(max_level=2, **settings)
+    assert (first["simulated"], first["cached"]) == (8, 0)
+
+    again = balance_report.build_report(max_level=2, **settings)
+    assert (again["simulated"], again["cached"]) == (0, 8)
+    assert again["rows"] == first["rows"]
+
+    # A higher level only adds that level's cells
+    grown = balance_report.build_report(max_level=3, **settings)
+    assert (grown["simulated"], grown["cached"]) == (4, 8)
+    assert [row for row in grown["rows"] if row["level"] <= 2] == first["rows"]
+
+def test_balance_report_writes_csv_or_json(tmp_path):
+    """Test that the report format follows the file extension"""
+    rows = balance_report.build_report(["Rogue"], ["goblin"], max_level=1, battles=10, workers=0,
+                                       cache_file=None)["rows"]
+    balance_report.write_report(rows, str(tmp_path / "report.csv"))
+    with open(tmp_path / "report.csv") as f:
+        assert f.readline().strip() == ",".join(balance_report.REPORT_FIELDS)
+    with pytest.raises(ValueError):
+        balance_report.write_report(rows, str(tmp_path / "report.txt"))